@@ -0,0 +1,37 @@
+"""Add detection_count and last_detected_at for issue deduplication
+
+Revision ID: c41e7a9d2b13
+Revises: 8f616a4b699f
+Create Date: 2026-10-17 09:12:44.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7a9d2b13'
+down_revision: Union[str, Sequence[str], None] = '8f616a4b699f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('infrastructure_issues', sa.Column('detection_count', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('infrastructure_issues', sa.Column('last_detected_at', sa.DateTime(), nullable=True))
+    # Dedup only ever looks at open issues; a partial GiST index keeps that probe
+    # small no matter how many resolved issues pile up.
+    op.execute(
+        "CREATE INDEX ix_infrastructure_issues_open_location ON infrastructure_issues "
+        "USING gist (location) WHERE status IN ('detected', 'verified', 'in_progress')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_infrastructure_issues_open_location")
+    op.drop_column('infrastructure_issues', 'last_detected_at')
+    op.drop_column('infrastructure_issues', 'detection_count')
@@ -0,0 +1,53 @@
+"""Add issue_daily_rollups table for analytics
+
+Revision ID: d7a2f5c8e391
+Revises: c41e7a9d2b13
+Create Date: 2026-10-17 10:03:21.554870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2f5c8e391'
+down_revision: Union[str, Sequence[str], None] = 'c41e7a9d2b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _existing_enum(name: str):
+    return postgresql.ENUM(name=name, create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('issue_daily_rollups',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('resolved_day', sa.Date(), nullable=True),
+    sa.Column('issue_type', _existing_enum('issuetypeenum'), nullable=False),
+    sa.Column('status', _existing_enum('issuestatusenum'), nullable=True),
+    sa.Column('priority', _existing_enum('issuepriorityenum'), nullable=True),
+    sa.Column('department', _existing_enum('departmenttypeenum'), nullable=True),
+    sa.Column('area', sa.String(), nullable=False),
+    sa.Column('issue_count', sa.Integer(), nullable=False),
+    sa.Column('resolution_seconds_sum', sa.Float(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_issue_daily_rollups_day'), 'issue_daily_rollups', ['day'], unique=False)
+    op.create_index(op.f('ix_issue_daily_rollups_resolved_day'), 'issue_daily_rollups', ['resolved_day'], unique=False)
+    # The refresh job finds changed issues through updated_at.
+    op.create_index(op.f('ix_infrastructure_issues_updated_at'), 'infrastructure_issues', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_infrastructure_issues_updated_at'), table_name='infrastructure_issues')
+    op.drop_index(op.f('ix_issue_daily_rollups_resolved_day'), table_name='issue_daily_rollups')
+    op.drop_index(op.f('ix_issue_daily_rollups_day'), table_name='issue_daily_rollups')
+    op.drop_table('issue_daily_rollups')
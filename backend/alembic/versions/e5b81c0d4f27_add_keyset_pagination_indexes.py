@@ -0,0 +1,32 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: e5b81c0d4f27
+Revises: d7a2f5c8e391
+Create Date: 2026-10-17 11:20:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b81c0d4f27'
+down_revision: Union[str, Sequence[str], None] = 'd7a2f5c8e391'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_infrastructure_issues_detected_at_id', 'infrastructure_issues', ['detected_at', 'id'], unique=False)
+    op.create_index('ix_infrastructure_issues_reporter_detected_at_id', 'infrastructure_issues', ['reported_by_id', 'detected_at', 'id'], unique=False)
+    op.create_index('ix_user_profiles_created_at_id', 'user_profiles', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_profiles_created_at_id', table_name='user_profiles')
+    op.drop_index('ix_infrastructure_issues_reporter_detected_at_id', table_name='infrastructure_issues')
+    op.drop_index('ix_infrastructure_issues_detected_at_id', table_name='infrastructure_issues')
@@ -0,0 +1,41 @@
+"""Add reporter_issue_counts for the community leaderboard
+
+Revision ID: f90c3e6a1b58
+Revises: e5b81c0d4f27
+Create Date: 2026-10-17 12:02:47.660931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f90c3e6a1b58'
+down_revision: Union[str, Sequence[str], None] = 'e5b81c0d4f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reporter_issue_counts',
+    sa.Column('reporter_id', sa.UUID(), nullable=False),
+    sa.Column('issue_type', postgresql.ENUM(name='issuetypeenum', create_type=False), nullable=False),
+    sa.Column('report_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['reporter_id'], ['user_profiles.id'], ),
+    sa.PrimaryKeyConstraint('reporter_id', 'issue_type')
+    )
+    # Backfill from existing issues; afterwards the counters are maintained on insert.
+    op.execute(
+        "INSERT INTO reporter_issue_counts (reporter_id, issue_type, report_count) "
+        "SELECT reported_by_id, issue_type, count(*) FROM infrastructure_issues "
+        "WHERE reported_by_id IS NOT NULL GROUP BY reported_by_id, issue_type"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('reporter_issue_counts')
@@ -1,19 +1,41 @@
 # backend/app/crud.py
+import uuid
+from datetime import datetime
+from collections import Counter
+from sqlalchemy import insert, bindparam, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from . import models, schemas, security
+from geoalchemy2.elements import WKTElement
+from . import models, schemas, security, pagination
+from .services.tile_cache import tile_cache
+from .services.dedup import OPEN_STATUSES
 
 def get_user_by_email(db: Session, email: str):
     """Fetches a single user by their email address."""
     return db.query(models.UserProfile).filter(models.UserProfile.email == email).first()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    """Fetches all users with pagination."""
-    return db.query(models.UserProfile).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    """
+    Fetches users newest first, keyset-paginated on (created_at, id).
+    Returns (users, next_cursor). `skip` is still honoured for old clients but
+    gets slower the deeper it goes; prefer `cursor`.
+    """
+    user = models.UserProfile
+    query = db.query(user)
+    if skip and not cursor:
+        query = query.order_by(user.created_at.desc(), user.id.desc()).offset(skip)
+        users = query.limit(limit + 1).all()
+        if len(users) <= limit:
+            return users, None
+        users = users[:limit]
+        return users, pagination.encode_cursor(users[-1].created_at, users[-1].id)
+    return pagination.keyset_page(query, user.created_at, user.id, cursor, limit)
 
 
-def create_user(db: Session, user: schemas.UserProfileCreate):
-    """Creates a new user, hashes the password, and saves to the database."""
-    hashed_password = security.get_password_hash(user.password)
+def create_user(db: Session, user: schemas.UserProfileCreate, hashed_password: str = None):
+    """Creates a new user, hashes the password (unless already hashed), and saves to the database."""
+    if hashed_password is None:
+        hashed_password = security.get_password_hash(user.password)
     db_user = models.UserProfile(
         email=user.email,
         full_name=user.full_name,
@@ -29,7 +51,169 @@ def create_user(db: Session, user: schemas.UserProfileCreate):
 def create_infrastructure_issue(db: Session, issue: schemas.InfrastructureIssueCreate):
     """Creates a new infrastructure issue and saves it to the database."""
     db_issue = models.InfrastructureIssue(**issue.model_dump())
+    if issue.latitude is not None and issue.longitude is not None:
+        db_issue.location = WKTElement(f'POINT({issue.longitude} {issue.latitude})', srid=4326)
     db.add(db_issue)
+    increment_reporter_counts(db, Counter([(issue.reported_by_id, issue.issue_type)]))
+    db.commit()
+    db.refresh(db_issue)
+    tile_cache.invalidate_point(db_issue.longitude, db_issue.latitude)
+    return db_issue
+
+def bulk_create_issues(db: Session, issues: list) -> list:
+    """
+    Inserts many InfrastructureIssueCreate items with one multi-row INSERT and a
+    single commit (used for bulk text imports). Returns the new issue ids in order.
+    """
+    now = datetime.utcnow()
+    rows = []
+    for issue in issues:
+        row = issue.model_dump()
+        row.update(id=uuid.uuid4(), location=None, created_at=now, updated_at=now, detected_at=now)
+        if issue.latitude is not None and issue.longitude is not None:
+            row["location"] = WKTElement(f'POINT({issue.longitude} {issue.latitude})', srid=4326)
+        rows.append(row)
+    if not rows:
+        return []
+    db.execute(insert(models.InfrastructureIssue), rows)
+    increment_reporter_counts(db, Counter((row["reported_by_id"], row["issue_type"]) for row in rows))
+    db.commit()
+    tile_cache.invalidate_points((row["longitude"], row["latitude"]) for row in rows)
+    return [row["id"] for row in rows]
+
+def bulk_create_ai_detections(db: Session, detections: list, priorities: list, targets: list = None):
+    """
+    Stores a batch of AI detections using one multi-row INSERT per table and a
+    single commit. `targets` (see services/dedup.assign_duplicates) says, per
+    detection, whether it opens a new issue or is another sighting of an existing
+    one; sightings only add an AIDetection row and bump the issue's detection_count.
+    Returns (issue_id, detection_id, merged) tuples in input order.
+    """
+    now = datetime.utcnow()
+    targets = targets or [None] * len(detections)
+    issue_rows, detection_rows, results = [], [], []
+    new_issue_ids = {}  # batch index of a leader -> its issue row
+    existing_bumps = {}  # existing issue id -> [count, last_detected_at]
+
+    for i, (detection, priority, target) in enumerate(zip(detections, priorities, targets)):
+        detected_at = detection.detected_at or now
+        if target is None:
+            issue_id = uuid.uuid4()
+            location = None
+            if detection.latitude is not None and detection.longitude is not None:
+                location = WKTElement(f'POINT({detection.longitude} {detection.latitude})', srid=4326)
+            issue_row = {
+                "id": issue_id,
+                "title": f"AI Detected: {detection.issue_type.value.replace('_', ' ').title()}",
+                "description": detection.description,
+                "issue_type": detection.issue_type,
+                "status": models.IssueStatusEnum.detected,
+                "priority": priority,
+                "latitude": detection.latitude,
+                "longitude": detection.longitude,
+                "location": location,
+                "address": detection.address,
+                "detection_source": detection.detection_source,
+                "video_feed_id": detection.video_feed_id,
+                "reported_by_id": detection.reported_by_id,
+                "detection_count": 1,
+                "detected_at": detected_at,
+                "last_detected_at": detected_at,
+                "created_at": now,
+                "updated_at": now,
+            }
+            issue_rows.append(issue_row)
+            new_issue_ids[i] = issue_row
+        elif isinstance(target, int):
+            # Merges into an issue opened earlier in this same batch.
+            issue_row = new_issue_ids[target]
+            issue_id = issue_row["id"]
+            issue_row["detection_count"] += 1
+            issue_row["last_detected_at"] = max(issue_row["last_detected_at"], detected_at)
+        else:
+            issue_id = target
+            bump = existing_bumps.setdefault(issue_id, [0, detected_at])
+            bump[0] += 1
+            bump[1] = max(bump[1], detected_at)
+
+        detection_id = uuid.uuid4()
+        detection_rows.append({
+            "id": detection_id,
+            "issue_id": issue_id,
+            "video_feed_id": detection.video_feed_id,
+            "detection_type": detection.issue_type,
+            "confidence_score": detection.confidence_score,
+            "bounding_box": detection.bounding_box,
+            "image_url": detection.image_url,
+            "detected_at": detected_at,
+            "created_at": now,
+        })
+        results.append((issue_id, detection_id, target is not None))
+
+    if issue_rows:
+        db.execute(insert(models.InfrastructureIssue), issue_rows)
+        increment_reporter_counts(db, Counter((row["reported_by_id"], row["issue_type"]) for row in issue_rows))
+    if detection_rows:
+        db.execute(insert(models.AIDetection), detection_rows)
+    if existing_bumps:
+        issues = models.InfrastructureIssue.__table__
+        db.execute(
+            issues.update()
+            .where(issues.c.id == bindparam("b_id"))
+            .values(
+                detection_count=issues.c.detection_count + bindparam("b_count"),
+                last_detected_at=func.greatest(func.coalesce(issues.c.last_detected_at, issues.c.detected_at), bindparam("b_at")),
+                updated_at=now,
+            ),
+            [{"b_id": issue_id, "b_count": count, "b_at": at} for issue_id, (count, at) in existing_bumps.items()]
+        )
+    db.commit()
+    # Merged sightings don't change what the map tiles show; new issues do.
+    tile_cache.invalidate_points((row["longitude"], row["latitude"]) for row in issue_rows)
+    return results
+
+def increment_reporter_counts(db: Session, counts: Counter):
+    """
+    Adds {(reporter_id, issue_type): n} to reporter_issue_counts with one upsert,
+    in the caller's transaction. Issues without a reporter are ignored.
+    """
+    rows = [
+        {"reporter_id": reporter_id, "issue_type": issue_type, "report_count": n}
+        for (reporter_id, issue_type), n in counts.items() if reporter_id is not None
+    ]
+    if not rows:
+        return
+    stmt = pg_insert(models.ReporterIssueCount).values(rows)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["reporter_id", "issue_type"],
+        set_={"report_count": models.ReporterIssueCount.report_count + stmt.excluded.report_count}
+    ))
+
+def add_detection_to_issue(db: Session, issue_id, detection):
+    """
+    Records another sighting of an already open issue instead of creating a new one.
+    Returns None if the issue was deleted or closed since it was matched; the caller
+    should then create a new issue.
+    """
+    now = datetime.utcnow()
+    detected_at = getattr(detection, "detected_at", None) or now
+    db_issue = db.query(models.InfrastructureIssue).filter(
+        models.InfrastructureIssue.id == issue_id,
+        models.InfrastructureIssue.status.in_(OPEN_STATUSES),
+    ).first()
+    if db_issue is None:
+        return None
+    db.add(models.AIDetection(
+        issue_id=issue_id,
+        video_feed_id=getattr(detection, "video_feed_id", None),
+        detection_type=detection.issue_type,
+        confidence_score=getattr(detection, "confidence_score", 1.0),
+        bounding_box=getattr(detection, "bounding_box", None),
+        image_url=getattr(detection, "image_url", None),
+        detected_at=detected_at,
+    ))
+    db_issue.detection_count = (db_issue.detection_count or 1) + 1
+    db_issue.last_detected_at = max(db_issue.last_detected_at or db_issue.detected_at, detected_at)
     db.commit()
     db.refresh(db_issue)
     return db_issue
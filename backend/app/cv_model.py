@@ -2,11 +2,19 @@ import os
 import cv2
 import numpy as np
 from ultralytics import YOLO
-import requests # Use the requests library for API calls
+import time
+
+from .services.yolo_batcher import YoloBatcher
+from .services.prediction_cache import prediction_cache, model_fingerprint
 
 # --- Global Model Cache ---
 model_cache = {}
 
+# --- Batching Configuration ---
+# Frames from concurrent requests are grouped into a single forward pass.
+YOLO_BATCH_MAX_SIZE = int(os.getenv("YOLO_BATCH_MAX_SIZE", "8"))
+YOLO_BATCH_MAX_WAIT_MS = float(os.getenv("YOLO_BATCH_MAX_WAIT_MS", "10"))
+
 def load_models():
     """
     Loads the YOLOv8 model from the specified path.
@@ -21,25 +29,77 @@ def load_models():
         
         model_cache['yolo'] = YOLO(model_path)
         print("[INFO] YOLOv8 model loaded successfully.")
+        # Results cached for a previous best.pt are dropped when the weights change.
+        prediction_cache.set_model(model_fingerprint(model_path))
+
+        batcher = YoloBatcher(
+            model_cache['yolo'],
+            max_batch_size=YOLO_BATCH_MAX_SIZE,
+            max_wait_ms=YOLO_BATCH_MAX_WAIT_MS
+        )
+        batcher.start()
+        model_cache['batcher'] = batcher
+        print(f"[INFO] YOLO batcher started (max_batch_size={YOLO_BATCH_MAX_SIZE}, max_wait_ms={YOLO_BATCH_MAX_WAIT_MS}).")
     except Exception as e:
         print(f"[CRITICAL ERROR] Failed to load YOLOv8 model: {e}")
         # Re-raise the exception to prevent the application from starting in a broken state.
         raise RuntimeError(f"YOLOv8 model could not be loaded. Error: {e}")
 
 
-def predict_image(image_bytes: bytes):
+def shutdown_models():
+    """Stops the batching worker. Called on application shutdown."""
+    batcher = model_cache.pop('batcher', None)
+    if batcher:
+        batcher.stop()
+
+
+def get_inference_stats() -> dict:
+    """Returns queue depth, batch-size histogram and per-stage latency of the batcher."""
+    batcher = model_cache.get('batcher')
+    if not batcher:
+        return {"status": "not_loaded"}
+    return batcher.stats()
+
+
+def infer_frames(frames: list) -> list:
+    """
+    Runs already-decoded frames through the shared batcher and returns one YOLO
+    result per frame, in order. All model access goes through the batcher thread.
+    """
+    batcher = model_cache.get('batcher')
+    if not batcher:
+        raise RuntimeError("YOLO model is not loaded.")
+    futures = [batcher.submit(frame) for frame in frames]
+    return [future.result() for future in futures]
+
+
+def predict_image(image_bytes: bytes, annotate: bool = True):
     """
     Runs YOLOv8 prediction on an image and returns both the detections
-    and the annotated image as bytes.
+    and the annotated image as bytes. Byte-identical images are answered
+    from the prediction cache without touching the model. With annotate=False
+    no annotated image is drawn or encoded, and None is returned in its place.
     """
+    cached = prediction_cache.get(image_bytes, annotated=annotate)
+    if cached is not None:
+        return cached if annotate else (cached[0], None)
+
     yolo_model = model_cache.get('yolo')
-    if not yolo_model:
+    batcher = model_cache.get('batcher')
+    if not yolo_model or not batcher:
         raise RuntimeError("YOLO model is not loaded.")
 
+    started = time.perf_counter()
     nparr = np.frombuffer(image_bytes, np.uint8)
     img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
-    results = yolo_model(img)
+    if img is None:
+        raise ValueError("Could not decode image bytes.")
+    batcher.metrics.observe_stage("decode", time.perf_counter() - started)
+
+    # The batcher groups this frame with any others submitted concurrently.
+    results = [batcher.infer(img)]
+
+    started = time.perf_counter()
     
     detections = []
     for result in results:
@@ -55,6 +115,11 @@ def predict_image(image_bytes: bytes):
                 }
             })
     
+    if not annotate:
+        batcher.metrics.observe_stage("postprocess", time.perf_counter() - started)
+        prediction_cache.put(image_bytes, detections, None)
+        return detections, None
+
     # Generate the annotated image with bounding boxes
     annotated_image_bytes = image_bytes # Default to original if annotation fails
     if results:
@@ -63,50 +128,7 @@ def predict_image(image_bytes: bytes):
         success, buffer = cv2.imencode('.jpg', annotated_img_array)
         if success:
             annotated_image_bytes = buffer.tobytes()
+    batcher.metrics.observe_stage("postprocess", time.perf_counter() - started)
 
+    prediction_cache.put(image_bytes, detections, annotated_image_bytes)
     return detections, annotated_image_bytes
-
-def get_ai_summary(detections: list) -> str:
-    """
-    Generates a text summary for a list of detections using a Hugging Face summarization model.
-    """
-    hf_token = os.getenv("HUGGINGFACE_API_TOKEN")
-    if not hf_token:
-        return "Could not generate summary: Hugging Face API token not set."
-
-    # Use a reliable summarization model
-    model_url = "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
-    headers = {"Authorization": f"Bearer {hf_token}"}
-
-    try:
-        if not detections:
-            return "No issues were detected in the image."
-
-        # Create a simple text input for the summarization model
-        detection_names = [d["class_name"].replace("_", " ") for d in detections]
-        text_to_summarize = (
-            f"The following infrastructure issues were detected by an AI camera in Chennai: "
-            f"{', '.join(detection_names)}. These issues could pose risks to public safety and traffic flow. "
-            "A report should be generated to address these findings promptly."
-        )
-
-        # Call the Hugging Face API for summarization
-        response = requests.post(model_url, headers=headers, json={"inputs": text_to_summarize}, timeout=20)
-        response.raise_for_status()
-
-        result = response.json()
-        
-        # Summarization models typically return 'summary_text'
-        if result and isinstance(result, list) and result[0].get('summary_text'):
-            return result[0]['summary_text'].strip()
-        else:
-            # Fallback for unexpected response structure
-            print(f"[HUGGING FACE API WARNING] Unexpected response format: {result}")
-            return "AI summary could not be generated from the model's response."
-
-    except requests.exceptions.RequestException as e:
-        error_details = e.response.json() if e.response else str(e)
-        print(f"[HUGGING FACE API ERROR] An error occurred: {error_details}")
-        if "is currently loading" in str(error_details):
-             return "The AI summary model is starting up. Please try again in 20 seconds."
-        return "AI summary is temporarily unavailable."
\ No newline at end of file
@@ -11,10 +11,21 @@ from pydantic import ValidationError # Import ValidationError
 
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
+from dotenv import load_dotenv, find_dotenv
+
+# Load .env before the project modules below read their settings at import
+load_dotenv(find_dotenv(usecwd=True))
 
 # Import your project modules
 from . import models, schemas, cv_model
 from .database import engine, get_db
+from .services.inference_executor import inference_executor
+from .services.password_hasher import password_hasher
+from .services.detection_sink import detection_sink
+from .services.rollups import rollup_refresher
+from .services.alert_dispatcher import alert_dispatcher
+from .services.summary_client import summary_client
+from .services import nlp_service
 
 # Import all your routers
 from .routers import (
@@ -44,9 +55,21 @@ async def lifespan(app: FastAPI):
     print("--- Loading CV Model ---")
     cv_model.load_models()
     print("--- CV Model Loaded Successfully ---")
+    nlp_service.load_models()
+    inference_executor.start()
+    detection_sink.start()
+    rollup_refresher.start()
+    alert_dispatcher.start()
     yield
     # Code to run on shutdown (optional)
     print("--- Application Shutting Down ---")
+    alert_dispatcher.stop()
+    rollup_refresher.stop()
+    detection_sink.stop()
+    inference_executor.shutdown()
+    password_hasher.shutdown()
+    await summary_client.aclose()
+    cv_model.shutdown_models()
 
 # Initialize the FastAPI app
 app = FastAPI(
@@ -73,6 +96,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Keyset pagination cursor, see pagination.py
 )
 
 # Custom exception handler for RequestValidationError (422 errors)
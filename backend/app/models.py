@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, Enum, Numeric, JSON, Date
+    Column, String, Integer, Float, Boolean, DateTime, Text, ForeignKey, Enum, Numeric, JSON, Date, Index, text
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -59,6 +59,9 @@ class WorkOrderStatusEnum(str, enum.Enum):
 # --- MODELS ---
 class UserProfile(Base):
     __tablename__ = 'user_profiles'
+    __table_args__ = (
+        Index('ix_user_profiles_created_at_id', 'created_at', 'id'),  # keyset pagination
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # <-- CHANGED
     email = Column(String, unique=True, nullable=False, index=True)  # <-- CHANGED
     full_name = Column(String, nullable=False)
@@ -100,6 +103,17 @@ class VideoFeed(Base):
 
 class InfrastructureIssue(Base):
     __tablename__ = 'infrastructure_issues'
+    __table_args__ = (
+        # keyset pagination on (detected_at, id), see pagination.py
+        Index('ix_infrastructure_issues_detected_at_id', 'detected_at', 'id'),
+        Index('ix_infrastructure_issues_reporter_detected_at_id', 'reported_by_id', 'detected_at', 'id'),
+        # duplicate detection only probes open issues, see services/dedup.py
+        Index(
+            'ix_infrastructure_issues_open_location', 'location',
+            postgresql_using='gist',
+            postgresql_where=text("status IN ('detected', 'verified', 'in_progress')"),
+        ),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # <-- CHANGED
     title = Column(String, nullable=False)
     description = Column(Text)
@@ -116,10 +130,12 @@ class InfrastructureIssue(Base):
     assigned_to_id = Column(UUID(as_uuid=True), ForeignKey('user_profiles.id'), index=True)  # <-- CHANGED
     department = Column(Enum(DepartmentTypeEnum), index=True)  # <-- CHANGED
     estimated_cost = Column(Numeric(10, 2))
+    detection_count = Column(Integer, default=1, server_default='1', nullable=False)
     detected_at = Column(DateTime, default=datetime.utcnow)
+    last_detected_at = Column(DateTime)
     resolved_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # <-- CHANGED
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # indexed for the rollup refresh
 
     video_feed = relationship('VideoFeed', back_populates='issues')
     reporter = relationship('UserProfile', foreign_keys=[reported_by_id], back_populates='reported_issues')
@@ -196,4 +212,26 @@ class Notification(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship('UserProfile', back_populates='notifications')
-    issue = relationship('InfrastructureIssue', back_populates='notifications')
\ No newline at end of file
+    issue = relationship('InfrastructureIssue', back_populates='notifications')
+
+class IssueDailyRollup(Base):
+    """Issue counts per detection day and dimension, rebuilt from infrastructure_issues by services/rollups.py."""
+    __tablename__ = 'issue_daily_rollups'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    day = Column(Date, nullable=False, index=True)  # date(detected_at)
+    resolved_day = Column(Date, index=True)  # date(resolved_at) for resolved issues
+    issue_type = Column(Enum(IssueTypeEnum), nullable=False)
+    status = Column(Enum(IssueStatusEnum))
+    priority = Column(Enum(IssuePriorityEnum))
+    department = Column(Enum(DepartmentTypeEnum))
+    area = Column(String, nullable=False, default='')
+    issue_count = Column(Integer, nullable=False, default=0)
+    resolution_seconds_sum = Column(Float, nullable=False, default=0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow)
+
+class ReporterIssueCount(Base):
+    """Issues reported per user and issue type, incremented on insert; feeds the community leaderboard."""
+    __tablename__ = 'reporter_issue_counts'
+    reporter_id = Column(UUID(as_uuid=True), ForeignKey('user_profiles.id'), primary_key=True)
+    issue_type = Column(Enum(IssueTypeEnum), primary_key=True)
+    report_count = Column(Integer, nullable=False, default=0)
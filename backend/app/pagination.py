@@ -0,0 +1,98 @@
+# backend/app/pagination.py
+
+import json
+import uuid
+import base64
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_, and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Page size for endpoints that return everything unless asked to paginate.
+DEFAULT_PAGE_SIZE = 100
+# Never selectable through `fields=`, whatever model they appear on.
+PRIVATE_COLUMNS = {"password", "reset_token", "reset_token_expires"}
+# Selectable in principle but not JSON-serialisable as-is.
+_UNPROJECTABLE_COLUMNS = {"location"}
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id) -> str:
+    payload = json.dumps([sort_value.isoformat() if sort_value else None, str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_fields(fields: Optional[str], model) -> Optional[list]:
+    """Turns `fields=id,title,status` into model columns, rejecting unknown names."""
+    if not fields:
+        return None
+    hidden = PRIVATE_COLUMNS | _UNPROJECTABLE_COLUMNS
+    allowed = {c.key: c for c in model.__table__.columns if c.key not in hidden}
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(sorted(allowed))}"
+        )
+    return [getattr(model, name) for name in names]
+
+
+def keyset_page(query, sort_column, id_column, cursor: Optional[str], limit: Optional[int]) -> tuple:
+    """
+    Newest-first keyset pagination on (sort_column, id_column). Each page is an
+    index range scan starting right after the cursor, so page 1000 costs the same
+    as page 1. Returns (rows, next_cursor); next_cursor is None on the last page.
+    Rows with a NULL sort value come first, as in Postgres' default DESC order.
+    With limit=None every remaining row is returned.
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if sort_value is None:
+            # Still inside the NULL block: its remaining ids, then every non-NULL row.
+            query = query.filter(or_(and_(sort_column.is_(None), id_column < last_id), sort_column.isnot(None)))
+        else:
+            query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, last_id))
+    query = query.order_by(sort_column.desc().nulls_first(), id_column.desc())
+    if limit is None:
+        return query.all(), None
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def projected_query(db, model, columns: list, sort_column, id_column):
+    """Selects only `columns` (plus the keyset columns, which the cursor needs)."""
+    selected = list(columns)
+    for column in (id_column, sort_column):
+        if column not in selected:
+            selected.append(column)
+    return db.query(*selected)
+
+
+def projected_response(rows: list, columns: list, next_cursor: Optional[str]) -> JSONResponse:
+    keys = [c.key for c in columns]
+    content = jsonable_encoder([{key: getattr(row, key) for key in keys} for row in rows])
+    response = JSONResponse(content=content)
+    set_next_cursor(response, next_cursor)
+    return response
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import os
 from datetime import datetime, timedelta
@@ -27,20 +28,37 @@ async def send_password_reset_email(email: str, token: str):
     print(f"Reset Link: {reset_link}")
     print("----------------------\n")
 
+def _hasher_busy_exception(e: security.PasswordHasherBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in attempts in progress. Please retry shortly.",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
 # --- Authentication Endpoints ---
 
 @router.post("/register", response_model=schemas.UserProfile, status_code=status.HTTP_201_CREATED)
-def register_user(user: schemas.UserProfileCreate, db: Session = Depends(database.get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def register_user(user: schemas.UserProfileCreate, db: Session = Depends(database.get_db)):
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email is already registered")
-    return crud.create_user(db=db, user=user)
+    try:
+        hashed_password = await security.password_hasher.hash(user.password)
+    except security.PasswordHasherBusy as e:
+        raise _hasher_busy_exception(e)
+    return await run_in_threadpool(crud.create_user, db=db, user=user, hashed_password=hashed_password)
 
 
 @router.post("/token", response_model=schemas.Token)
-def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not security.verify_password(form_data.password, user.password):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
+    user = await run_in_threadpool(crud.get_user_by_email, db, email=form_data.username)
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await security.password_hasher.verify_and_update(form_data.password, user.password)
+        except security.PasswordHasherBusy as e:
+            raise _hasher_busy_exception(e)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -48,8 +66,12 @@ def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db:
         )
     
     access_token = security.create_access_token(
-        data={"sub": user.email, "role": user.role.value, "full_name": user.full_name}
+        data=security.token_claims(user)
     )
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made; store it at the current cost.
+        user.password = new_hash
+        await run_in_threadpool(db.commit)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
@@ -80,7 +102,7 @@ def google_auth(token_request: schemas.GoogleToken, db: Session = Depends(databa
             user = crud.create_user(db, user=user_data)
         
         access_token = security.create_access_token(
-            data={"sub": user.email, "role": user.role.value, "full_name": user.full_name}
+            data=security.token_claims(user)
         )
         return {"access_token": access_token, "token_type": "bearer"}
 
@@ -117,14 +139,16 @@ async def recover_password(
 
 
 @router.post("/reset-password", status_code=status.HTTP_200_OK)
-def reset_password(request: schemas.PasswordResetRequest, db: Session = Depends(database.get_db)):
+async def reset_password(request: schemas.PasswordResetRequest, db: Session = Depends(database.get_db)):
     """
     Resets the user's password using a valid reset token.
     """
-    user = db.query(models.UserProfile).filter(
-        models.UserProfile.reset_token == request.token,
-        models.UserProfile.reset_token_expires > datetime.utcnow()
-    ).first()
+    user = await run_in_threadpool(
+        db.query(models.UserProfile).filter(
+            models.UserProfile.reset_token == request.token,
+            models.UserProfile.reset_token_expires > datetime.utcnow()
+        ).first
+    )
 
     if not user:
         raise HTTPException(
@@ -133,10 +157,14 @@ def reset_password(request: schemas.PasswordResetRequest, db: Session = Depends(
         )
 
     # Update password and invalidate the token
-    user.password = security.get_password_hash(request.new_password)
+    try:
+        user.password = await security.password_hasher.hash(request.new_password)
+    except security.PasswordHasherBusy as e:
+        raise _hasher_busy_exception(e)
     user.reset_token = None
     user.reset_token_expires = None
-    db.commit()
+    await run_in_threadpool(db.commit)
+    security.invalidate_user(user.email)
 
     return {"message": "Your password has been successfully reset."}
 
@@ -1,63 +1,45 @@
 # backend/app/routers/community.py
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, extract
+import os
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime
 from geoalchemy2.shape import to_shape
 
-from .. import models, schemas, database
+from .. import models, schemas, database, pagination
+from ..services.ttl_cache import get_cache
 
 router = APIRouter(
     prefix="/community",
     tags=["Community"]
 )
 
-def get_all_issues(db: Session):
-    """Gets all issues for the community map."""
-    all_issues = db.query(models.InfrastructureIssue).options(joinedload(models.InfrastructureIssue.reporter)).order_by(
-        models.InfrastructureIssue.detected_at.desc()
-    ).all()
-    
-    results = []
-    for issue in all_issues:
-        issue_data = {
-            "id": issue.id,
-            "title": issue.title,
-            "description": issue.description,
-            "issue_type": issue.issue_type,
-            "status": issue.status,
-            "priority": issue.priority,
-            "latitude": issue.latitude,
-            "longitude": issue.longitude,
-            "address": issue.address,
-            "detection_source": issue.detection_source,
-            "detected_at": issue.detected_at,
-            "updated_at": issue.updated_at,
-            "reporter": issue.reporter,
-        }
-        results.append(schemas.InfrastructureIssue.model_validate(issue_data))
+# Each hub section is cached on its own, with a TTL that matches how fast it changes.
+COMMUNITY_STATS_TTL_SECONDS = float(os.getenv("COMMUNITY_STATS_TTL_SECONDS", "60"))
+COMMUNITY_LEADERBOARD_TTL_SECONDS = float(os.getenv("COMMUNITY_LEADERBOARD_TTL_SECONDS", "300"))
+COMMUNITY_SPOTLIGHT_TTL_SECONDS = float(os.getenv("COMMUNITY_SPOTLIGHT_TTL_SECONDS", "600"))
+COMMUNITY_ISSUES_TTL_SECONDS = float(os.getenv("COMMUNITY_ISSUES_TTL_SECONDS", "15"))
+# Most issues the hub returns at once; older ones are fetched page by page
+COMMUNITY_ISSUES_LIMIT = int(os.getenv("COMMUNITY_ISSUES_LIMIT", "200"))
 
-    return results
+stats_cache = get_cache("community_stats", ttl=COMMUNITY_STATS_TTL_SECONDS, maxsize=1)
+leaderboard_cache = get_cache("community_leaderboard", ttl=COMMUNITY_LEADERBOARD_TTL_SECONDS, maxsize=1)
+spotlight_cache = get_cache("community_spotlight", ttl=COMMUNITY_SPOTLIGHT_TTL_SECONDS, maxsize=1)
+issues_cache = get_cache("community_issues", ttl=COMMUNITY_ISSUES_TTL_SECONDS, maxsize=1)
 
 # --- Individual Data Functions (kept for clarity) ---
 
 def get_community_stats(db: Session):
-    current_month = datetime.utcnow().month
-    current_year = datetime.utcnow().year
-
-    stats = db.query(
-        func.count(models.InfrastructureIssue.id).filter(
-            models.InfrastructureIssue.status == schemas.IssueStatusEnum.resolved,
-            extract('month', models.InfrastructureIssue.resolved_at) == current_month,
-            extract('year', models.InfrastructureIssue.resolved_at) == current_year
-        ),
-        func.count(func.distinct(models.InfrastructureIssue.reported_by_id))
-    ).one()
-
-    issues_resolved_this_month = stats[0] or 0
-    active_reporters = stats[1] or 0
+    month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    issues_resolved_this_month = db.query(func.count(models.InfrastructureIssue.id)).filter(
+        models.InfrastructureIssue.status == schemas.IssueStatusEnum.resolved,
+        models.InfrastructureIssue.resolved_at >= month_start
+    ).scalar() or 0
+    # Every reporter has at least one counter row, so this avoids scanning all issues.
+    active_reporters = db.query(func.count(func.distinct(models.ReporterIssueCount.reporter_id))).scalar() or 0
     
     community_impact_score = round((issues_resolved_this_month * 1.5) + (active_reporters * 1.2))
 
@@ -84,27 +66,44 @@ def get_development_news():
     ]
 
 def get_leaderboard(db: Session):
-    leaderboard_data = (
-        db.query(
-            models.UserProfile.full_name,
-            models.UserProfile.avatar_url,
-            func.count(models.InfrastructureIssue.id).label('report_count')
-        )
-        .join(models.InfrastructureIssue, models.UserProfile.id == models.InfrastructureIssue.reported_by_id)
-        .group_by(models.UserProfile.id)
-        .order_by(func.count(models.InfrastructureIssue.id).desc())
+    """Top reporters, read from the reporter_issue_counts counters instead of grouping all issues."""
+    counts = models.ReporterIssueCount
+    totals = (
+        db.query(counts.reporter_id, func.sum(counts.report_count).label('report_count'))
+        .group_by(counts.reporter_id)
+        .order_by(func.sum(counts.report_count).desc())
         .limit(5)
+        .subquery()
+    )
+    leaderboard_data = (
+        db.query(models.UserProfile.id, models.UserProfile.full_name, models.UserProfile.avatar_url, totals.c.report_count)
+        .join(totals, totals.c.reporter_id == models.UserProfile.id)
+        .order_by(totals.c.report_count.desc())
         .all()
     )
+
+    # Most reported issue type for just these five users
+    top_types = {}
+    user_ids = [row[0] for row in leaderboard_data]
+    if user_ids:
+        type_rows = (
+            db.query(counts.reporter_id, counts.issue_type, counts.report_count)
+            .filter(counts.reporter_id.in_(user_ids))
+            .order_by(counts.report_count.desc())
+            .all()
+        )
+        for reporter_id, issue_type, _ in type_rows:
+            top_types.setdefault(reporter_id, issue_type.value.replace('_', ' ').title())
+
     return [
         schemas.LeaderboardEntry(
             username=name,
             avatarUrl=avatar,
             reportCount=count,
             location="Chennai",
-            mostReportedIssueType="Potholes"
+            mostReportedIssueType=top_types.get(user_id)
         )
-        for name, avatar, count in leaderboard_data
+        for user_id, name, avatar, count in leaderboard_data
     ]
 
 def get_events():
@@ -125,7 +124,7 @@ def get_events():
 
 def get_spotlight(db: Session):
     resolved_issues_with_media = db.query(models.InfrastructureIssue).options(
-        joinedload(models.InfrastructureIssue.media),
+        selectinload(models.InfrastructureIssue.media),
         joinedload(models.InfrastructureIssue.reporter)
     ).filter(
         models.InfrastructureIssue.status == schemas.IssueStatusEnum.resolved,
@@ -136,17 +135,15 @@ def get_spotlight(db: Session):
     for issue in resolved_issues_with_media:
         if len(spotlight_stories) >= 2: break
         
-        sorted_media = sorted(issue.media, key=lambda m: m.uploaded_at)
+        sorted_media = sorted(issue.media, key=lambda m: m.created_at)
         
         if len(sorted_media) >= 2:
             reporter_name = issue.reporter.full_name if issue.reporter else "An Active Citizen"
             story = schemas.SpotlightStory(
                 issueTitle=f"{issue.issue_type.value.replace('_', ' ').title()} Fixed in {issue.address}",
                 citizenReporter=reporter_name,
-                resolved_date=issue.resolved_at,
-                impact_statement=f"A '{issue.issue_type.value.replace('_', ' ').title()}' issue was resolved, improving the area.",
-                before_image_url=sorted_media[0].file_url,
-                after_image_url=sorted_media[-1].file_url
+                impactStatement=f"A '{issue.issue_type.value.replace('_', ' ').title()}' issue was resolved, improving the area.",
+                imageUrl=sorted_media[-1].file_url
             )
             spotlight_stories.append(story)
 
@@ -158,32 +155,27 @@ def get_spotlight(db: Session):
         )]
     return spotlight_stories
 
-def get_all_issues(db: Session):
-    """Gets all issues for the community map."""
-    all_issues = db.query(models.InfrastructureIssue).options(joinedload(models.InfrastructureIssue.reporter)).order_by(
-        models.InfrastructureIssue.detected_at.desc()
-    ).all()
-    
-    results = []
-    for issue in all_issues:
-        issue_data = {
-            "id": issue.id,
-            "title": issue.title,
-            "description": issue.description,
-            "issue_type": issue.issue_type,
-            "status": issue.status,
-            "priority": issue.priority,
-            "latitude": issue.latitude,
-            "longitude": issue.longitude,
-            "address": issue.address,
-            "detection_source": issue.detection_source,
-            "detected_at": issue.detected_at,
-            "updated_at": issue.updated_at,
-            "reporter": issue.reporter,
-        }
-        results.append(schemas.InfrastructureIssue.model_validate(issue_data))
+def get_recent_issues(db: Session, limit: int = COMMUNITY_ISSUES_LIMIT, cursor: Optional[str] = None):
+    """Newest issues for the community map, capped at `limit`. Returns (issues, next_cursor)."""
+    issue = models.InfrastructureIssue
+    query = db.query(issue).options(joinedload(issue.reporter))
+    rows, next_cursor = pagination.keyset_page(query, issue.detected_at, issue.id, cursor, limit)
+    return [schemas.InfrastructureIssue.model_validate(row) for row in rows], next_cursor
+
+# --- Cached sections ---
 
-    return results
+def cached_stats(db: Session):
+    return stats_cache.get_or_set("stats", lambda: get_community_stats(db))
+
+def cached_leaderboard(db: Session):
+    return leaderboard_cache.get_or_set("leaderboard", lambda: get_leaderboard(db))
+
+def cached_spotlight(db: Session):
+    return spotlight_cache.get_or_set("spotlight", lambda: get_spotlight(db))
+
+def cached_recent_issues(db: Session):
+    # Only the first page is shared between visitors; later pages go straight to the DB.
+    return issues_cache.get_or_set("first_page", lambda: get_recent_issues(db))
 
 # --- Main Endpoint to Consolidate Data ---
 
@@ -191,15 +183,46 @@ def get_all_issues(db: Session):
 def get_community_hub_data(db: Session = Depends(database.get_db)):
     """
     Returns all necessary data for the community hub page in a single request.
+    Every section comes from its own cache; `issues` holds the newest
+    COMMUNITY_ISSUES_LIMIT issues and `issuesNextCursor` points at the rest.
     """
     try:
+        issues, next_cursor = cached_recent_issues(db)
         return {
-            "stats": get_community_stats(db),
+            "stats": cached_stats(db),
             "developmentNews": get_development_news(),
-            "leaderboard": get_leaderboard(db),
+            "leaderboard": cached_leaderboard(db),
             "events": get_events(),
-            "spotlight": get_spotlight(db),
-            "issues": get_all_issues(db)
+            "spotlight": cached_spotlight(db),
+            "issues": issues,
+            "issuesNextCursor": next_cursor
         }
     except Exception as e:
         return {"error": str(e)}
+
+@router.get("/stats")
+def get_community_stats_section(db: Session = Depends(database.get_db)):
+    return cached_stats(db)
+
+@router.get("/leaderboard", response_model=List[schemas.LeaderboardEntry])
+def get_leaderboard_section(db: Session = Depends(database.get_db)):
+    return cached_leaderboard(db)
+
+@router.get("/spotlight", response_model=List[schemas.SpotlightStory])
+def get_spotlight_section(db: Session = Depends(database.get_db)):
+    return cached_spotlight(db)
+
+@router.get("/issues", response_model=List[schemas.InfrastructureIssue])
+def get_community_issues(
+    response: Response,
+    limit: int = Query(COMMUNITY_ISSUES_LIMIT, ge=1, le=COMMUNITY_ISSUES_LIMIT),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    db: Session = Depends(database.get_db)
+):
+    """Pages through community issues, newest first."""
+    if cursor is None and limit == COMMUNITY_ISSUES_LIMIT:
+        issues, next_cursor = cached_recent_issues(db)
+    else:
+        issues, next_cursor = get_recent_issues(db, limit, cursor)
+    pagination.set_next_cursor(response, next_cursor)
+    return issues
@@ -1,16 +1,26 @@
 import os
 import cv2
 import numpy as np
-import requests
 import time
 import uuid # New import for unique job IDs
+import json
 import base64 # New import for base64 encoding
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Depends, BackgroundTasks # Added BackgroundTasks
+from fastapi import APIRouter, File, UploadFile, HTTPException, Form, Depends, BackgroundTasks, Request, Query, Path # Added BackgroundTasks
+from fastapi.responses import Response, FileResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from typing import List
 
 from .. import cv_model
+from ..services.inference_executor import inference_executor, InferenceQueueFull
+from ..services.summary_client import summary_client
+from ..services.prediction_cache import prediction_cache
+from ..services.job_store import create_job_store, JOB_TTL_SECONDS
+from ..services.video_pipeline import VideoPipeline
+from ..services.frame_sampler import AdaptiveFrameSampler
+from ..services.tracker import IoUTracker
+from ..services.detection_sink import detection_sink
 from ..schemas import InfrastructureIssueCreate
 
 router = APIRouter(
@@ -18,157 +28,276 @@ router = APIRouter(
     tags=["CV API"]
 )
 
-# --- Global Job Storage ---
-# In a production environment, this would be a database or a dedicated task queue (e.g., Celery, Redis)
-job_results = {}
+# --- Job Storage ---
+# Bounded, TTL-evicted and (with the sqlite backend) shared across uvicorn workers.
+# Annotated images are kept as blobs and only referenced from the job record.
+job_store = create_job_store()
+
+# --- Response Configuration ---
+# "data_url" embeds the annotated JPEG as base64 (the original behaviour); "url" returns a
+# link to it; "multipart" sends the JSON and the raw JPEG as two parts of one response.
+RESPONSE_MODE_PATTERN = "^(data_url|url|multipart)$"
+# Annotated image URLs include the model fingerprint and the upload's hash, so they never change.
+ANNOTATED_IMAGE_MAX_AGE_SECONDS = int(os.getenv("ANNOTATED_IMAGE_MAX_AGE_SECONDS", "604800"))
+
+# --- Video Configuration ---
+VIDEO_BATCH_SIZE = int(os.getenv("VIDEO_BATCH_SIZE", "8"))
+VIDEO_OUTPUT_DIR = os.getenv("VIDEO_OUTPUT_DIR", "storage/video_outputs")
+# Mean per-pixel change (0-255) on a 64x36 thumbnail below which a frame reuses the last detections
+VIDEO_DIFF_THRESHOLD = float(os.getenv("VIDEO_DIFF_THRESHOLD", "6.0"))
+VIDEO_MAX_SKIP_INTERVAL = int(os.getenv("VIDEO_MAX_SKIP_INTERVAL", "15"))
+# Frames a tracked object may go unseen before its track is closed and emitted
+VIDEO_TRACK_MAX_MISSED_FRAMES = int(os.getenv("VIDEO_TRACK_MAX_MISSED_FRAMES", "30"))
+# Off until camera detections can be attributed to a reporting user in the backend
+VIDEO_SEND_DETECTIONS = os.getenv("VIDEO_SEND_DETECTIONS", "false").lower() == "true"
 
 # --- Pydantic Schemas ---
 class VideoPathRequest(BaseModel):
     file_path: str
+    adaptive_sampling: bool = True
+    diff_threshold: float = VIDEO_DIFF_THRESHOLD
 
 # --- VideoProcessor Class ---
-# This class now correctly initializes using the globally loaded model
+# Frames are decoded, inferred (through the shared YOLO batcher) and encoded on
+# separate threads; see services/video_pipeline.py.
 class VideoProcessor:
-    def __init__(self, confidence_threshold=0.5):
-        if cv_model.model is None:
+    def __init__(self, confidence_threshold=0.5, batch_size=VIDEO_BATCH_SIZE, sink=detection_sink,
+                 send_detections=VIDEO_SEND_DETECTIONS):
+        model = cv_model.model_cache.get('yolo')
+        if model is None:
             raise RuntimeError("CV Model is not loaded. Check the application startup event.")
             
-        self.model = cv_model.model
+        self.model = model
         self.confidence_threshold = confidence_threshold
+        self.batch_size = batch_size
+        self.sink = sink
+        self.send_detections = send_detections
         self.class_names = self.model.names
         print(f"[INFO] VideoProcessor instance created. Detecting classes: {list(self.class_names.values())}")
 
-        self.BACKEND_API_URL = os.getenv("MAIN_BACKEND_URL", "http://backend:8000/api/v1/detections")
         self.FIXED_LOCATION = {
             "lat": 13.0827,  # Chennai Latitude
             "lon": 80.2707   # Chennai Longitude
         }
 
-    def _send_detection_to_backend(self, detection_data):
-        try:
-            response = requests.post(self.BACKEND_API_URL, json=detection_data, timeout=5)
-            response.raise_for_status()
-            print(f"[✓] Sent detection: {detection_data.get('issue_type', 'Unknown')}")
-            return True
-        except requests.exceptions.RequestException as e:
-            print(f"[ERROR] Failed to send detection to backend: {e}")
-            return False
-
-    def process_video_for_issues(self, video_path: str, output_path: str = "output.mp4", frame_skip=0, save_video=True):
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            print(f"[ERROR] Cannot open video file: {video_path}")
-            return 0
-
-        writer = None
-        if save_video:
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-            print(f"[INFO] Saving processed video to: {output_path}")
+    def _handle_result(self, frame_idx, frame, result):
+        # Feed boxes above the threshold to the tracker; detections are emitted per track, not per box.
+        detections = []
+        for box in result.boxes:
+            confidence = float(box.conf[0])
+            if confidence > self.confidence_threshold:
+                class_id = int(box.cls[0])
+                detections.append({
+                    "box": [float(v) for v in box.xyxy[0]],
+                    "confidence": confidence,
+                    "class_name": self.class_names[class_id]
+                })
+        for track in self.tracker.update(frame_idx, detections, frame):
+            self._emit_track(track)
+
+    def _emit_track(self, track):
+        class_name = track.class_name
+        issue_type = class_name.lower().replace(" ", "_")
+        track_data = track.to_dict()
 
-        detections_sent_count = 0
-        frame_idx = 0
+        if track.best_crop is not None and self.crops_dir:
+            crop_path = os.path.join(self.crops_dir, f"track_{track.track_id}.jpg")
+            cv2.imwrite(crop_path, track.best_crop)
+            track_data["crop_path"] = crop_path
+        self.tracks.append(track_data)
+
+        detection_data = {
+            "title": f"{class_name} Detected",
+            "description": (
+                f"{class_name} detected with confidence {track.best_confidence:.2f} "
+                f"across frames {track.first_frame}-{track.last_frame}."
+            ),
+            "issue_type": issue_type,
+            "latitude": self.FIXED_LOCATION["lat"],
+            "longitude": self.FIXED_LOCATION["lon"],
+            "address": "Detected by AI camera in Chennai",
+            "detection_source": "ai_camera",
+            "confidence_score": round(track.best_confidence, 4),
+            "bounding_box": track_data["bounding_box"]
+        }
+        # Queued for the background sink: batching, retries and spooling happen off this thread
+        if self.send_detections:
+            self.sink.submit(detection_data)
+            self.detections_sent_count += 1
+
+    def process_video_for_issues(self, video_path: str, output_path: str = "output.mp4", frame_skip=0,
+                                 save_video=True, progress_callback=None, adaptive_sampling=False,
+                                 diff_threshold=VIDEO_DIFF_THRESHOLD):
+        """
+        Analyses a video file and returns the pipeline stats (frames/s, inference ratio, tracks, ...).
+        With `adaptive_sampling`, near-identical frames reuse the previous detections instead of `frame_skip`.
+        Each tracked object yields one aggregated detection with its best confidence and crop.
+        """
+        self.detections_sent_count = 0
+        self.tracks = []
+        self.tracker = IoUTracker(max_missed_frames=VIDEO_TRACK_MAX_MISSED_FRAMES)
+        self.crops_dir = None
+        if save_video and output_path:
+            self.crops_dir = f"{os.path.splitext(output_path)[0]}_tracks"
+            os.makedirs(self.crops_dir, exist_ok=True)
+
+        sampler = None
+        if adaptive_sampling:
+            sampler = AdaptiveFrameSampler(diff_threshold=diff_threshold, max_interval=VIDEO_MAX_SKIP_INTERVAL)
+        pipeline = VideoPipeline(
+            cv_model.infer_frames,
+            batch_size=self.batch_size,
+            on_result=self._handle_result,
+            on_progress=progress_callback,
+            sampler=sampler
+        )
         print(f"[INFO] Starting analysis for video: {video_path}")
+        if save_video:
+            print(f"[INFO] Saving processed video to: {output_path}")
+        stats = pipeline.run(video_path, output_path if save_video else None, frame_skip=frame_skip)
+        for track in self.tracker.flush():
+            self._emit_track(track)
 
-        while True:
-            success, frame = cap.read()
-            if not success:
-                break
-
-            if frame_idx % (frame_skip + 1) == 0:
-                results = self.model(frame)
-
-                for result in results:
-                    for box in result.boxes:
-                        confidence = float(box.conf[0])
-                        if confidence > self.confidence_threshold:
-                            class_id = int(box.cls[0])
-                            class_name = self.class_names[class_id]
-                            issue_type = class_name.lower().replace(" ", "_")
-
-                            detection_data = {
-                                "title": f"{class_name} Detected",
-                                "description": f"{class_name} detected with confidence {confidence:.2f}.",
-                                "issue_type": issue_type,
-                                "latitude": self.FIXED_LOCATION["lat"],
-                                "longitude": self.FIXED_LOCATION["lon"],
-                                "address": "Detected by AI camera in Chennai",
-                                "source": "ai_camera"
-                            }
-                            # In a real system, you'd associate this with a real user
-                            # For now, this part would need a valid user ID to work with the DB
-                            # if self._send_detection_to_backend(detection_data):
-                            #     detections_sent_count += 1
-
-                if save_video:
-                    annotated_frame = results[0].plot()
-                    writer.write(annotated_frame)
-
-            frame_idx += 1
-
-        cap.release()
-        if writer:
-            writer.release()
-        print(f"[INFO] Video analysis complete. Sent {detections_sent_count} detections.")
-        return detections_sent_count
+        stats["detections_sent"] = self.detections_sent_count
+        stats["tracks"] = self.tracks
+        print(f"[INFO] Video analysis complete at {stats['fps']} frames/s "
+              f"(inference ratio {stats['inference_ratio']}). {len(self.tracks)} tracked objects, "
+              f"sent {self.detections_sent_count} detections.")
+        return stats
 
 # --- Dependency Injection Function ---
 # This function will be called by FastAPI for endpoints that need the processor
 def get_video_processor():
     return VideoProcessor()
 
+def _queue_full_exception(e: InferenceQueueFull) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Inference queue is full. Please retry shortly.",
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def _data_url(image_bytes: bytes) -> str:
+    encoded_image = base64.b64encode(image_bytes).decode('utf-8')
+    return f"data:image/jpeg;base64,{encoded_image}"
+
+def _multipart_response(payload: dict, image_bytes: bytes) -> Response:
+    """JSON part followed by the raw JPEG, without base64 (multipart/mixed)."""
+    boundary = uuid.uuid4().hex
+    body = b"".join([
+        f"--{boundary}\r\nContent-Type: application/json\r\n\r\n".encode(),
+        json.dumps(jsonable_encoder(payload)).encode(),
+        f"\r\n--{boundary}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(image_bytes)}\r\n\r\n".encode(),
+        image_bytes,
+        f"\r\n--{boundary}--\r\n".encode(),
+    ])
+    return Response(content=body, media_type=f"multipart/mixed; boundary={boundary}")
+
 # --- Background Task Function ---
-async def _process_image_in_background(job_id: str, image_bytes: bytes):
+async def _process_image_in_background(job_id: str, image_bytes: bytes, annotate: bool = True):
     try:
-        detections, annotated_image_bytes = cv_model.predict_image(image_bytes)
-        summary = cv_model.get_ai_summary(detections)
-
-        # Encode annotated_image_bytes to Base64 data URL
-        encoded_image = base64.b64encode(annotated_image_bytes).decode('utf-8')
-        data_url = f"data:image/jpeg;base64,{encoded_image}"
+        detections, annotated_image_bytes = await inference_executor.run_inference(cv_model.predict_image, image_bytes, annotate)
+        summary = await summary_client.get_summary(detections)
 
-        job_results[job_id] = {
+        blob_id = job_store.blobs.put(f"{job_id}.jpg", annotated_image_bytes) if annotated_image_bytes else None
+        job_store.set(job_id, {
             "status": "complete",
             "detections": detections,
             "summary": summary,
-            "annotated_image": data_url
-        }
+            "blob_id": blob_id
+        })
         print(f"Job {job_id} completed successfully.")
     except Exception as e:
-        job_results[job_id] = {"status": "failed", "error": str(e)}
+        job_store.set(job_id, {"status": "failed", "error": str(e)})
         print(f"Job {job_id} failed with error: {e}")
 
+def _process_video_in_background(job_id: str, request: VideoPathRequest, video_processor: VideoProcessor):
+    # Plain def: FastAPI runs it in a worker thread, and the pipeline spawns its own stage threads.
+    file_path = request.file_path
+
+    def report_progress(progress):
+        job_store.set(job_id, {
+            "status": "processing",
+            "kind": "video",
+            "file_processed": file_path,
+            "progress": progress.to_dict()
+        })
+
+    try:
+        os.makedirs(VIDEO_OUTPUT_DIR, exist_ok=True)
+        output_path = os.path.join(VIDEO_OUTPUT_DIR, f"{job_id}.mp4")
+        stats = video_processor.process_video_for_issues(
+            file_path,
+            output_path=output_path,
+            progress_callback=report_progress,
+            adaptive_sampling=request.adaptive_sampling,
+            diff_threshold=request.diff_threshold
+        )
+        job_store.set(job_id, {
+            "status": "complete",
+            "kind": "video",
+            "file_processed": file_path,
+            "output_path": output_path,
+            "detections_sent": stats.pop("detections_sent"),
+            "tracks": stats.pop("tracks"),
+            "progress": stats
+        })
+        print(f"Video job {job_id} completed successfully.")
+    except Exception as e:
+        job_store.set(job_id, {"status": "failed", "kind": "video", "error": str(e)})
+        print(f"Video job {job_id} failed with error: {e}")
+
 # --- API Endpoints ---
 
 @router.post("/predict/image")
-async def predict_image_endpoint(file: UploadFile = File(...)):
+async def predict_image_endpoint(
+    request: Request,
+    file: UploadFile = File(...),
+    response_mode: str = Query("data_url", pattern=RESPONSE_MODE_PATTERN),
+    annotate: bool = Query(True, description="Set to false to get detections only, without the annotated image"),
+):
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File provided is not an image.")
     
     image_bytes = await file.read()
     
     try:
-        detections, annotated_image_bytes = cv_model.predict_image(image_bytes)
-        summary = cv_model.get_ai_summary(detections)
+        # Inference runs in the executor; the summary call is async with its own latency budget
+        detections, annotated_image_bytes = await inference_executor.run_inference(cv_model.predict_image, image_bytes, annotate)
+        summary = await summary_client.get_summary(detections)
         
         percentage = 0.0
         if detections:
             percentage = detections[0]["confidence_score"] * 100
         
-        # Encode annotated_image_bytes to Base64 data URL for direct display
-        encoded_image = base64.b64encode(annotated_image_bytes).decode('utf-8')
-        data_url = f"data:image/jpeg;base64,{encoded_image}"
-
-        return {
+        payload = {
             "filename": file.filename,
             "detections": detections,
             "percentage": percentage,
             "summary": summary,
-            "annotated_image": data_url
+            "annotated_image": None
         }
+        if annotated_image_bytes is None:
+            return payload
+        if response_mode == "multipart":
+            return _multipart_response(payload, annotated_image_bytes)
+        if response_mode == "url":
+            # Link to the prediction cache's copy on disk instead of sending the image. It
+            # may be missing (trimmed, or never written here), so write it from this process.
+            image_id = prediction_cache.image_id(image_bytes)
+            if image_id and not prediction_cache.image_path(image_id):
+                await inference_executor.run_io(prediction_cache.put, image_bytes, detections, annotated_image_bytes)
+            if image_id and prediction_cache.image_path(image_id):
+                payload["annotated_image"] = str(request.url_for("get_annotated_image", image_id=image_id))
+                payload["response_mode"] = "url"
+                return payload
+            # No disk tier to link to (e.g. PREDICTION_CACHE_DIR is unset): say so explicitly.
+            payload["response_mode"] = "data_url"
+        # Encode annotated_image_bytes to Base64 data URL for direct display
+        payload["annotated_image"] = _data_url(annotated_image_bytes)
+        return payload
+    except InferenceQueueFull as e:
+        raise _queue_full_exception(e)
     except HTTPException as e: # Catch HTTPException specifically
         print(f"HTTPException in predict_image_endpoint: {e.detail}")
         raise e # Re-raise the exception
@@ -176,44 +305,120 @@ async def predict_image_endpoint(file: UploadFile = File(...)):
         print(f"Error processing image: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing image: {e}")
 
+@router.get("/images/{image_id}", name="get_annotated_image")
+async def get_annotated_image(image_id: str = Path(..., pattern="^[0-9a-f]{16}-[0-9a-f]{64}$")):
+    """Serves an annotated image linked from a response_mode=url prediction."""
+    path = prediction_cache.image_path(image_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Image not found.")
+    return FileResponse(
+        path, media_type="image/jpeg",
+        headers={"Cache-Control": f"public, max-age={ANNOTATED_IMAGE_MAX_AGE_SECONDS}, immutable"}
+    )
+
 @router.post("/predict-async")
-async def predict_async_endpoint(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+async def predict_async_endpoint(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    annotate: bool = Query(True, description="Set to false to get detections only, without the annotated image"),
+):
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File provided is not an image.")
     
+    try:
+        inference_executor.check_capacity()
+    except InferenceQueueFull as e:
+        raise _queue_full_exception(e)
+
     job_id = str(uuid.uuid4())
     image_bytes = await file.read()
     
-    job_results[job_id] = {"status": "processing"}
-    background_tasks.add_task(_process_image_in_background, job_id, image_bytes)
+    job_store.set(job_id, {"status": "processing"})
+    background_tasks.add_task(_process_image_in_background, job_id, image_bytes, annotate)
     
     return {"job_id": job_id}
 
 @router.get("/results/{job_id}")
-async def get_results_endpoint(job_id: str):
-    job_data = job_results.get(job_id)
+async def get_results_endpoint(
+    request: Request,
+    job_id: str,
+    response_mode: str = Query("data_url", pattern=RESPONSE_MODE_PATTERN),
+):
+    job_data = job_store.get(job_id)
     if not job_data:
         raise HTTPException(status_code=404, detail="Job ID not found.")
     
     if job_data["status"] == "processing":
-        return {"status": "processing"}
-    elif job_data["status"] == "complete":
+        return {"status": "processing", "progress": job_data.get("progress")}
+    elif job_data["status"] == "complete" and job_data.get("kind") == "video":
         return job_data
+    elif job_data["status"] == "complete":
+        payload = {
+            "status": "complete",
+            "detections": job_data["detections"],
+            "summary": job_data["summary"],
+            "annotated_image": None
+        }
+        blob_id = job_data.get("blob_id")
+        if blob_id and response_mode == "url":
+            if job_store.blobs.path(blob_id):
+                payload["annotated_image"] = str(request.url_for("get_result_image", job_id=job_id))
+                payload["response_mode"] = "url"
+                return payload
+            # Nothing on disk to link to: fall through and say which mode was used.
+            payload["response_mode"] = "data_url"
+        image_bytes = job_store.blobs.get(blob_id) if blob_id else None
+        if image_bytes is not None:
+            if response_mode == "multipart":
+                return _multipart_response(payload, image_bytes)
+            # Rehydrate the stored image into a data URL for existing clients
+            payload["annotated_image"] = _data_url(image_bytes)
+        elif blob_id:
+            # The job had an image but its blob was evicted or has expired.
+            payload.pop("response_mode", None)
+            payload["image_error"] = "Annotated image is no longer available."
+        return payload
     else: # Handle failed state
         raise HTTPException(status_code=500, detail=f"Job failed: {job_data.get('error', 'Unknown error')}")
 
-@router.post("/predict/video")
+@router.get("/results/{job_id}/image", name="get_result_image")
+async def get_result_image(job_id: str):
+    """Serves a finished job's annotated image, linked from /results/{job_id}?response_mode=url."""
+    job_data = job_store.get(job_id)
+    path = job_store.blobs.path(job_data["blob_id"]) if job_data and job_data.get("blob_id") else None
+    if not path:
+        raise HTTPException(status_code=404, detail="Image not found.")
+    # Results are per-user and expire with the job.
+    return FileResponse(path, media_type="image/jpeg", headers={"Cache-Control": f"private, max-age={JOB_TTL_SECONDS}"})
+
+@router.get("/metrics")
+async def get_inference_metrics():
+    """Exposes batcher queue depth, batch-size histogram, per-stage latency, executor load and cache hit ratios."""
+    return {
+        "batcher": cv_model.get_inference_stats(),
+        "executor": inference_executor.stats(),
+        "job_store": job_store.stats(),
+        "detection_sink": detection_sink.stats(),
+        "prediction_cache": prediction_cache.stats(),
+        "summary": summary_client.stats()
+    }
+
+@router.post("/predict/video", status_code=202)
 async def predict_video_endpoint(
     request: VideoPathRequest,
+    background_tasks: BackgroundTasks,
     video_processor: VideoProcessor = Depends(get_video_processor)
 ):
+    """Starts a video analysis job and returns its id; poll /results/{job_id} for progress."""
     file_path = request.file_path
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail=f"Video file not found at path: {file_path}")
 
-    detections_sent_count = video_processor.process_video_for_issues(file_path)
+    job_id = str(uuid.uuid4())
+    job_store.set(job_id, {"status": "processing", "kind": "video", "file_processed": file_path})
+    background_tasks.add_task(_process_video_in_background, job_id, request, video_processor)
     return {
-        "message": "Video analysis complete.",
-        "file_processed": file_path,
-        "detections_sent": detections_sent_count
-    }
\ No newline at end of file
+        "message": "Video analysis started.",
+        "job_id": job_id,
+        "file_processed": file_path
+    }
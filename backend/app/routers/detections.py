@@ -1,16 +1,25 @@
+import os
+import json
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from geoalchemy2.shape import to_shape
 import uuid
 
-from .. import models, schemas, alerting, database
+from .. import models, schemas, alerting, database, crud
+from ..services import dedup
+from ..services.tile_cache import tile_cache
 
 router = APIRouter(
     prefix="/detections",
     tags=["AI Detections"]
 )
 
+# Rows per multi-row INSERT when ingesting in bulk
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "1000"))
+
 # --- Helper function to convert DB objects to Pydantic schemas ---
 def _convert_db_issue_to_schema(db_issue: models.InfrastructureIssue) -> schemas.InfrastructureIssue:
     """Safely converts the DB model to a Pydantic model, handling relationships."""
@@ -29,22 +38,21 @@ def _convert_db_issue_to_schema(db_issue: models.InfrastructureIssue) -> schemas
 
 
 # --- Helper function for priority calculation ---
-def calculate_priority(detection: schemas.InfrastructureIssueCreate) -> schemas.IssuePriorityEnum:
+# This is a simplified logic. A real system might use confidence scores etc.
+PRIORITY_BY_ISSUE_TYPE = {
+    schemas.IssueTypeEnum.street_flooding: schemas.IssuePriorityEnum.high,
+    schemas.IssueTypeEnum.pothole: schemas.IssuePriorityEnum.medium,
+}
+
+def calculate_priority(detection: schemas.InfrastructureIssueBase) -> schemas.IssuePriorityEnum:
     """Calculates a priority level based on the issue type."""
-    # This is a simplified logic. A real system might use confidence scores etc.
-    score = 1
-    
-    if detection.issue_type in [schemas.IssueTypeEnum.water_leak, schemas.IssueTypeEnum.traffic_signal]:
-        score += 2
-    elif detection.issue_type in [schemas.IssueTypeEnum.pothole, schemas.IssueTypeEnum.streetlight_fault]:
-        score += 1
-    
-    if score >= 3:
-        return schemas.IssuePriorityEnum.high
-    elif score == 2:
-        return schemas.IssuePriorityEnum.medium
-    else:
-        return schemas.IssuePriorityEnum.low
+    return PRIORITY_BY_ISSUE_TYPE.get(detection.issue_type, schemas.IssuePriorityEnum.low)
+
+def calculate_priorities(detections: list) -> list:
+    """Bulk variant of calculate_priority: one dict lookup per detection."""
+    lookup = PRIORITY_BY_ISSUE_TYPE.get
+    low = schemas.IssuePriorityEnum.low
+    return [lookup(detection.issue_type, low) for detection in detections]
 
 # --- API Endpoints ---
 
@@ -55,8 +63,16 @@ def create_ai_detection(
 ):
     """
     Receives a new AI detection, creates a formal InfrastructureIssue,
-    and saves it to the database.
+    and saves it to the database. A detection near an open issue of the same
+    type is recorded as another sighting of that issue instead.
     """
+    duplicate_id = dedup.find_open_duplicates(db, [detection_data]).get(0)
+    if duplicate_id is not None:
+        db_issue = crud.add_detection_to_issue(db, duplicate_id, detection_data)
+        if db_issue is not None:
+            return _convert_db_issue_to_schema(db_issue)
+        # The matched issue was deleted or closed meanwhile: open a new one.
+
     priority = calculate_priority(detection_data)
     location_wkt = f'POINT({detection_data.longitude} {detection_data.latitude})'
     
@@ -75,12 +91,107 @@ def create_ai_detection(
     db.add(db_issue)
     db.commit()
     db.refresh(db_issue)
+    tile_cache.invalidate_point(db_issue.longitude, db_issue.latitude)
     
     response_issue = _convert_db_issue_to_schema(db_issue)
     
-    if response_issue.priority in [schemas.IssuePriorityEnum.high, schemas.IssuePriorityEnum.critical]:
-        # You can re-enable alerting here once alerting.py is updated
-        # alerting.send_alert(response_issue)
-        pass
+    if response_issue.priority in alerting.ALERT_PRIORITIES:
+        alerting.send_alert(response_issue)
+
+    return response_issue
+
+
+def _ingest_batch(db: Session, start_index: int, raw_items: list) -> list:
+    """Validates one batch, inserts the valid items and returns per-item results."""
+    results, valid, valid_indexes = [], [], []
+    for offset, raw in enumerate(raw_items):
+        index = start_index + offset
+        try:
+            valid.append(schemas.AIDetectionCreate.model_validate(raw))
+            valid_indexes.append(index)
+        except ValidationError as e:
+            results.append(schemas.BulkDetectionItemResult(index=index, status="error", error=str(e)))
+
+    if valid:
+        try:
+            priorities = calculate_priorities(valid)
+            targets = dedup.assign_duplicates(valid, dedup.find_open_duplicates(db, valid))
+            ids = crud.bulk_create_ai_detections(db, valid, priorities, targets)
+        except Exception as e:
+            db.rollback()
+            print(f"[ERROR] Bulk detection insert failed: {e}")
+            ids = None
+            for index in valid_indexes:
+                results.append(schemas.BulkDetectionItemResult(index=index, status="error", error="Database insert failed."))
+        if ids is not None:
+            for detection, priority, (_, _, merged) in zip(valid, priorities, ids):
+                if not merged and priority in alerting.ALERT_PRIORITIES:
+                    alerting.alert_dispatcher.submit(detection.issue_type, priority, detection.address)
+            for index, (issue_id, detection_id, merged) in zip(valid_indexes, ids):
+                results.append(schemas.BulkDetectionItemResult(
+                    index=index, status="merged" if merged else "created",
+                    issue_id=issue_id, detection_id=detection_id
+                ))
+    return results
 
-    return response_issue
\ No newline at end of file
+
+async def _iter_ndjson_batches(request: Request):
+    """Parses an NDJSON body incrementally, yielding lists of BULK_INSERT_BATCH_SIZE items."""
+    buffer = b""
+    batch = []
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                batch.append(_parse_ndjson_line(line))
+                if len(batch) >= BULK_INSERT_BATCH_SIZE:
+                    yield batch
+                    batch = []
+    if buffer.strip():
+        batch.append(_parse_ndjson_line(buffer))
+    if batch:
+        yield batch
+
+
+def _parse_ndjson_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        # Kept as an item so it is reported with its index instead of failing the request.
+        return {"__invalid_json__": str(e)}
+
+
+@router.post("/bulk", response_model=schemas.BulkDetectionResponse)
+async def create_ai_detections_bulk(request: Request, db: Session = Depends(database.get_db)):
+    """
+    Ingests many AI detections at once, as a JSON array or an NDJSON stream
+    (Content-Type: application/x-ndjson). Each batch is inserted with one
+    multi-row INSERT per table; detections near an open issue of the same type are
+    merged into it. The response reports an id and status or an error per item.
+    """
+    results = []
+    next_index = 0
+    content_type = request.headers.get("content-type", "")
+
+    if "ndjson" in content_type:
+        async for batch in _iter_ndjson_batches(request):
+            results += await run_in_threadpool(_ingest_batch, db, next_index, batch)
+            next_index += len(batch)
+    else:
+        try:
+            items = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array or NDJSON.")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Request body must be a JSON array of detections.")
+        for start in range(0, len(items), BULK_INSERT_BATCH_SIZE):
+            batch = items[start:start + BULK_INSERT_BATCH_SIZE]
+            results += await run_in_threadpool(_ingest_batch, db, start, batch)
+
+    results.sort(key=lambda r: r.index)
+    created = sum(1 for r in results if r.status == "created")
+    merged = sum(1 for r in results if r.status == "merged")
+    return schemas.BulkDetectionResponse(
+        created=created, merged=merged, failed=len(results) - created - merged, results=results
+    )
@@ -1,22 +1,27 @@
+import os
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import func, and_, extract, cast, Date
 from datetime import datetime, timedelta
 import uuid
 
-from .. import models, schemas, database, security
+from .. import models, schemas, database, security, pagination
+from ..services.ttl_cache import get_cache
+from ..services.tile_cache import tile_cache
 
 router = APIRouter(
     prefix="/issues", # The /api/v1 prefix is handled in main.py
     tags=["Issues & Analytics"]
 )
 
+DASHBOARD_METRICS_TTL_SECONDS = float(os.getenv("DASHBOARD_METRICS_TTL_SECONDS", "5"))
+dashboard_metrics_cache = get_cache("dashboard_metrics", ttl=DASHBOARD_METRICS_TTL_SECONDS, maxsize=1)
+
 # --- Helper function to convert DB objects to Pydantic schemas ---
 def _convert_issue_to_schema(issue: models.InfrastructureIssue) -> schemas.InfrastructureIssue:
     """Safely converts the DB model to a Pydantic model, handling relationships."""
-    issue_data = schemas.InfrastructureIssue.model_validate(issue).model_dump()
-    return schemas.InfrastructureIssue(**issue_data)
+    return schemas.InfrastructureIssue.model_validate(issue)
 
 
 # --- Endpoints ---
@@ -25,154 +30,189 @@ def _convert_issue_to_schema(issue: models.InfrastructureIssue) -> schemas.Infra
 def get_dashboard_metrics(db: Session = Depends(database.get_db)):
     """Get key dashboard metrics for Chennai infrastructure monitoring."""
     try:
-        today_start = datetime.utcnow().date()
-
-        # Count active issues (not 'resolved')
-        active_issues = db.query(models.InfrastructureIssue).filter(
-            models.InfrastructureIssue.status != schemas.IssueStatusEnum.resolved
-        ).count()
-
-        # Calculate resolution rate
-        total_issues = db.query(models.InfrastructureIssue).count()
-        if total_issues > 0:
-            resolved_issues_count = db.query(models.InfrastructureIssue).filter(
-                models.InfrastructureIssue.status == schemas.IssueStatusEnum.resolved
-            ).count()
-            resolution_rate = (resolved_issues_count / total_issues) * 100
-        else:
-            resolution_rate = 0
-
-        # Count AI detections for today
-        ai_detections_today = db.query(models.InfrastructureIssue).filter(
-            and_(
-                cast(models.InfrastructureIssue.detected_at, Date) == today_start,
-                models.InfrastructureIssue.source == schemas.DetectionSourceEnum.ai_camera
-            )
-        ).count()
-
-        # Calculate average response time for resolved issues
-        avg_response_time_delta = db.query(
-            func.avg(
-                func.julianday(models.InfrastructureIssue.resolved_at) - func.julianday(models.InfrastructureIssue.detected_at)
-            )
-        ).filter(
-            models.InfrastructureIssue.status == schemas.IssueStatusEnum.resolved,
-            models.InfrastructureIssue.resolved_at.isnot(None)
-        ).scalar()
-
-        # Convert average days to hours, handle None case
-        avg_response_time_hours = (avg_response_time_delta * 24) if avg_response_time_delta else 0
-
-        return schemas.DashboardMetrics(
-            active_issues=active_issues,
-            resolution_rate=round(resolution_rate, 1),
-            ai_detections_today=ai_detections_today,
-            avg_response_time_hours=round(avg_response_time_hours, 1)
-        )
-
+        # Dashboards poll every few seconds; serve them from a short-lived cache.
+        return dashboard_metrics_cache.get_or_set("metrics", lambda: _compute_dashboard_metrics(db))
     except Exception as e:
-        # It's good practice to log the error `e` here
+        print(f"[ERROR] Failed to calculate dashboard metrics: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to calculate dashboard metrics: {str(e)}")
 
 
+def _compute_dashboard_metrics(db: Session) -> schemas.DashboardMetrics:
+    """All dashboard counters in a single scan, using COUNT(*) FILTER (WHERE ...)."""
+    issue = models.InfrastructureIssue
+    is_resolved = issue.status == schemas.IssueStatusEnum.resolved
+    today_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+
+    row = db.query(
+        func.count().label("total"),
+        func.count().filter(issue.status != schemas.IssueStatusEnum.resolved).label("active"),
+        func.count().filter(is_resolved).label("resolved"),
+        func.count().filter(and_(
+            issue.detected_at >= today_start,
+            issue.detected_at < today_start + timedelta(days=1),
+            issue.detection_source == schemas.DetectionSourceEnum.ai_camera
+        )).label("ai_today"),
+        # Postgres interval math: average resolution time in seconds
+        func.avg(extract('epoch', issue.resolved_at - issue.detected_at)).filter(
+            and_(is_resolved, issue.resolved_at.isnot(None))
+        ).label("avg_response_seconds"),
+    ).one()
+
+    resolution_rate = (row.resolved / row.total * 100) if row.total else 0
+    avg_response_time_hours = float(row.avg_response_seconds) / 3600 if row.avg_response_seconds else 0
+
+    return schemas.DashboardMetrics(
+        active_issues=row.active,
+        resolution_rate=round(resolution_rate, 1),
+        ai_detections_today=row.ai_today,
+        avg_response_time_hours=round(avg_response_time_hours, 1)
+    )
+
+
 @router.get("/analytics", response_model=schemas.AnalyticsSummary)
 def get_analytics_data(
     date_range: schemas.DateRangeEnum = Query(schemas.DateRangeEnum.thirty_days, description="Time range: 7days, 30days, 90days"),
     db: Session = Depends(database.get_db)
 ):
-    """Get comprehensive analytics data for Chennai infrastructure issues."""
+    """
+    Get comprehensive analytics data for Chennai infrastructure issues.
+    Reads the daily rollup table (see services/rollups.py), so the cost depends on
+    the number of days and dimensions, not on the number of issues.
+    """
     try:
         days = {
             schemas.DateRangeEnum.seven_days: 7,
             schemas.DateRangeEnum.thirty_days: 30,
             schemas.DateRangeEnum.ninety_days: 90
         }.get(date_range, 30)
-        start_date = datetime.utcnow() - timedelta(days=days)
-
-        base_query = db.query(models.InfrastructureIssue).filter(models.InfrastructureIssue.detected_at >= start_date)
-
-        total_issues = base_query.count()
-        total_resolved = base_query.filter(models.InfrastructureIssue.status == schemas.IssueStatusEnum.resolved).count()
-
-        # Issues by Type
-        issues_by_type_query = base_query.group_by(models.InfrastructureIssue.issue_type).with_entities(
-            models.InfrastructureIssue.issue_type, func.count(models.InfrastructureIssue.id)
-        ).all()
-        issues_by_type = {str(k.value): v for k, v in issues_by_type_query}
-
-        # Issues by Status
-        issues_by_status_query = base_query.group_by(models.InfrastructureIssue.status).with_entities(
-            models.InfrastructureIssue.status, func.count(models.InfrastructureIssue.id)
-        ).all()
-        issues_by_status = {str(k.value): v for k, v in issues_by_status_query}
-
-        # Issues by Severity (Priority)
-        issues_by_severity_query = base_query.group_by(models.InfrastructureIssue.priority).with_entities(
-            models.InfrastructureIssue.priority, func.count(models.InfrastructureIssue.id)
-        ).all()
-        issues_by_severity = {str(k.value): v for k, v in issues_by_severity_query}
-
-        # Issues by Area (Locality/Address)
-        issues_by_area_query = base_query.group_by(models.InfrastructureIssue.address).with_entities(
-            models.InfrastructureIssue.address, func.count(models.InfrastructureIssue.id)
-        ).order_by(func.count(models.InfrastructureIssue.id).desc()).limit(10).all()
-        issues_by_area = {k: v for k, v in issues_by_area_query}
-        
-        # Calculate average resolution time in days
-        avg_resolution_delta = db.query(
-            func.avg(
-                extract('epoch', models.InfrastructureIssue.resolved_at) - extract('epoch', models.InfrastructureIssue.detected_at)
-            )
-        ).filter(
-            models.InfrastructureIssue.status == schemas.IssueStatusEnum.resolved,
-            models.InfrastructureIssue.resolved_at.isnot(None),
-            models.InfrastructureIssue.detected_at >= start_date
-        ).scalar()
-        avg_resolution_time_days = (avg_resolution_delta / 86400) if avg_resolution_delta else 0
+        start_day = datetime.utcnow().date() - timedelta(days=days)
+
+        rollup = models.IssueDailyRollup
+        is_resolved = rollup.status == schemas.IssueStatusEnum.resolved
+        issue_count = func.sum(rollup.issue_count)
+        resolved_count = func.coalesce(func.sum(rollup.issue_count).filter(is_resolved), 0)
+        in_range = db.query(rollup).filter(rollup.day >= start_day)
+
+        def _breakdown(column, limit=None):
+            query = in_range.with_entities(column, issue_count, resolved_count, func.sum(rollup.resolution_seconds_sum))
+            query = query.group_by(column).order_by(issue_count.desc())
+            return query.limit(limit).all() if limit else query.all()
+
+        def _rate(part, whole):
+            return round(part / whole * 100, 1) if whole else 0
+
+        by_type = _breakdown(rollup.issue_type)
+        total_issues = int(sum(row[1] for row in by_type))
+        total_resolved = int(sum(row[2] for row in by_type))
+        resolution_seconds = sum(row[3] or 0 for row in by_type)
+
+        issues_by_type = [
+            {"category": key.value, "total": int(total), "resolved": int(resolved),
+             "pending": int(total - resolved), "resolution_rate": _rate(resolved, total)}
+            for key, total, resolved, _ in by_type
+        ]
+        issues_by_severity = [
+            {"severity": key.value if key else "unknown", "count": int(total), "percentage": _rate(total, total_issues)}
+            for key, total, _, _ in _breakdown(rollup.priority)
+        ]
+        issues_by_status = [
+            {"status": key.value if key else "unknown", "count": int(total), "percentage": _rate(total, total_issues)}
+            for key, total, _, _ in _breakdown(rollup.status)
+        ]
+        issues_by_area = [
+            {"area": key or "Unknown", "total": int(total), "resolved": int(resolved),
+             "pending": int(total - resolved), "resolution_rate": _rate(resolved, total)}
+            for key, total, resolved, _ in _breakdown(rollup.area, limit=10)
+        ]
+        department_performance = [
+            {"department": key.value, "total_assigned": int(total), "completed": int(resolved),
+             "pending": int(total - resolved), "completion_rate": _rate(resolved, total),
+             "avg_resolution_time_days": round(seconds / resolved / 86400, 1) if resolved else 0}
+            for key, total, resolved, seconds in _breakdown(rollup.department) if key is not None
+        ]
+
+        # Daily trend: issues reported on a day vs. issues resolved on that day.
+        reported_by_day = dict(
+            in_range.with_entities(rollup.day, issue_count).group_by(rollup.day).all()
+        )
+        resolved_by_day = dict(
+            db.query(rollup.resolved_day, issue_count)
+            .filter(rollup.resolved_day >= start_day)
+            .group_by(rollup.resolved_day).all()
+        )
+        resolution_trends = []
+        for offset in range(days + 1):
+            day = start_day + timedelta(days=offset)
+            reported = int(reported_by_day.get(day, 0))
+            resolved = int(resolved_by_day.get(day, 0))
+            resolution_trends.append({
+                "date": day.isoformat(),
+                "reported": reported,
+                "resolved": resolved,
+                "resolution_rate": _rate(resolved, reported)
+            })
+
+        avg_resolution_time_days = (resolution_seconds / total_resolved / 86400) if total_resolved else 0
 
         return schemas.AnalyticsSummary(
             issues_by_type=issues_by_type,
             issues_by_severity=issues_by_severity,
             issues_by_status=issues_by_status,
             issues_by_area=issues_by_area,
-            resolution_trends=[], # Placeholder - requires more complex time-series query
-            department_performance=[], # Placeholder - requires joining with department data
+            resolution_trends=resolution_trends,
+            department_performance=department_performance,
             total_issues=total_issues,
             total_resolved=total_resolved,
-            overall_resolution_rate=(total_resolved / total_issues * 100) if total_issues > 0 else 0,
+            overall_resolution_rate=_rate(total_resolved, total_issues),
             avg_resolution_time_days=round(avg_resolution_time_days, 1)
         )
 
     except Exception as e:
-        # It's good practice to log the error `e` here
+        print(f"[ERROR] Failed to generate analytics data: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate analytics data: {str(e)}")
 
 
 
 @router.get("/", response_model=List[schemas.InfrastructureIssueAdmin])
 def get_all_issues(
+    response: Response,
     status: Optional[schemas.IssueStatusEnum] = Query(None, description="Filter issues by status"),
-    limit: int = Query(100, description="Number of issues to return"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of issues to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,title,status"),
     db: Session = Depends(database.get_db),
     current_user: models.UserProfile = Depends(security.get_current_admin_user) # Protect endpoint
 ):
-    """Get all infrastructure issues, with optional filtering by status."""
+    """
+    Get all infrastructure issues, newest first, with optional filtering by status.
+    Paginated by cursor: pass the X-Next-Cursor response header back as `cursor`.
+    """
+    issue = models.InfrastructureIssue
+    columns = pagination.parse_fields(fields, issue)
     try:
-        query = db.query(models.InfrastructureIssue).options(
-            joinedload(models.InfrastructureIssue.reporter),
-            joinedload(models.InfrastructureIssue.media)
-        )
+        if columns:
+            query = pagination.projected_query(db, issue, columns, issue.detected_at, issue.id)
+        else:
+            query = db.query(issue).options(
+                joinedload(issue.reporter),
+                selectinload(issue.media)
+            )
 
         if status:
-            query = query.filter(models.InfrastructureIssue.status == status)
+            query = query.filter(issue.status == status)
 
-        issues = query.order_by(models.InfrastructureIssue.detected_at.desc()).limit(limit).all()
-        
-        return issues
+        issues, next_cursor = pagination.keyset_page(query, issue.detected_at, issue.id, cursor, limit)
+    except HTTPException:
+        raise
     except Exception as e:
-        # Log the error e
+        print(f"[ERROR] Failed to get issues: {e}")
         raise HTTPException(status_code=500, detail="Failed to get issues")
 
+    if columns:
+        return pagination.projected_response(issues, columns, next_cursor)
+    pagination.set_next_cursor(response, next_cursor)
+    return issues
+
 
 @router.post("/work-orders", response_model=schemas.WorkOrder, status_code=status.HTTP_201_CREATED)
 def create_work_order(
@@ -193,6 +233,7 @@ def create_work_order(
     db.add(db_issue) # Add the updated issue to the session
     db.commit()
     db.refresh(db_work_order)
+    tile_cache.invalidate_point(db_issue.longitude, db_issue.latitude)
     return db_work_order
     
 
@@ -252,4 +293,6 @@ def resolve_issue(
     db_issue.resolved_at = datetime.utcnow()
     db.commit()
     db.refresh(db_issue)
+    dashboard_metrics_cache.invalidate()
+    tile_cache.invalidate_point(db_issue.longitude, db_issue.latitude)
     return _convert_issue_to_schema(db_issue)
\ No newline at end of file
@@ -1,133 +1,271 @@
-from fastapi import APIRouter, HTTPException, Query
-from datetime import datetime, timedelta
-import random
-from typing import List, Optional
-from ..schemas import MapIssue, GeoJSONFeature, GeoJSONFeatureCollection, IssueTypeEnum, IssuePriorityEnum, IssueStatusEnum # Import Enums
+import os
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select, cast, literal_column, null, text, String, Text, JSON
+from sqlalchemy.orm import Session, aliased
+
+from .. import models, database
+from ..services.tile_cache import tile_cache, TILE_MAX_ZOOM
+from ..schemas import GeoJSONFeature, GeoJSONFeatureCollection, MapCluster, MapClusterResponse, IssueTypeEnum, IssuePriorityEnum, IssueStatusEnum # Import Enums
+
+router = APIRouter(prefix="/map", tags=["map"]) # The /api/v1 prefix is handled in main.py
+
+# Upper bound on features in one response
+MAP_MAX_FEATURES = int(os.getenv("MAP_MAX_FEATURES", "100000"))
+
+# Shown when no status filter is given
+ACTIVE_STATUSES = [IssueStatusEnum.detected, IssueStatusEnum.verified, IssueStatusEnum.in_progress]
+
+# Below this zoom level tiles carry clusters instead of individual issues
+MVT_CLUSTER_MAX_ZOOM = int(os.getenv("MVT_CLUSTER_MAX_ZOOM", "13"))
+# Clustering grid: cells per tile side
+MVT_CLUSTER_GRID = int(os.getenv("MVT_CLUSTER_GRID", "64"))
+_WEB_MERCATOR_WIDTH = 40075016.685578488
+
+# /map/clusters: grid cells per 256px tile at the requested zoom, and a hard cap on
+# cells across the bbox so the payload stays bounded however many issues there are
+MAP_CLUSTER_CELLS_PER_TILE = int(os.getenv("MAP_CLUSTER_CELLS_PER_TILE", "4"))
+MAP_CLUSTER_MAX_CELLS = int(os.getenv("MAP_CLUSTER_MAX_CELLS", "48"))
+
+# Only points inside the tile itself are selected (not its render buffer), so an
+# issue lives in exactly one tile per zoom level and per-tile invalidation is exact.
+_TILE_ISSUES_SQL = text("""
+    WITH bounds AS (SELECT ST_TileEnvelope(:z, :x, :y) AS geom),
+    features AS (
+        SELECT ST_AsMVTGeom(ST_Transform(i.location, 3857), bounds.geom) AS geom,
+               i.id::text AS id, i.issue_type::text AS issue_type, i.status::text AS status,
+               i.priority::text AS priority
+        FROM infrastructure_issues i, bounds
+        WHERE i.location && ST_Transform(bounds.geom, 4326)
+          AND i.status IN ('detected', 'verified', 'in_progress')
+    )
+    SELECT ST_AsMVT(features.*, 'issues') FROM features
+""")
+
+_TILE_CLUSTERS_SQL = text("""
+    WITH bounds AS (SELECT ST_TileEnvelope(:z, :x, :y) AS geom),
+    points AS (
+        SELECT ST_Transform(i.location, 3857) AS geom, i.issue_type
+        FROM infrastructure_issues i, bounds
+        WHERE i.location && ST_Transform(bounds.geom, 4326)
+          AND i.status IN ('detected', 'verified', 'in_progress')
+    ),
+    clusters AS (
+        SELECT ST_AsMVTGeom(ST_Centroid(ST_Collect(geom)), (SELECT geom FROM bounds)) AS geom,
+               count(*) AS point_count,
+               count(*) FILTER (WHERE issue_type = 'pothole') AS pothole,
+               count(*) FILTER (WHERE issue_type = 'garbage_piles') AS garbage_piles,
+               count(*) FILTER (WHERE issue_type = 'street_flooding') AS street_flooding,
+               count(*) FILTER (WHERE issue_type = 'illegal_parking') AS illegal_parking,
+               count(*) FILTER (WHERE issue_type = 'debris') AS debris
+        FROM points
+        GROUP BY ST_SnapToGrid(geom, :cell_size)
+    )
+    SELECT ST_AsMVT(clusters.*, 'clusters') FROM clusters
+""")
+
+
+def parse_bbox(bbox: Optional[str]):
+    """Parses 'min_lon,min_lat,max_lon,max_lat' into floats, or returns None."""
+    if not bbox:
+        return None
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'min_lon,min_lat,max_lon,max_lat'")
+    if min_lon >= max_lon or min_lat >= max_lat:
+        raise HTTPException(status_code=400, detail="bbox min values must be smaller than max values")
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def issue_filters(bbox=None, issue_type=None, severity=None, status=None, area=None) -> list:
+    """WHERE clauses shared by the map endpoints. The bbox test uses the GiST index on location."""
+    issue = models.InfrastructureIssue
+    filters = [issue.location.isnot(None)]
+    if bbox:
+        filters.append(issue.location.op("&&")(func.ST_MakeEnvelope(*bbox, 4326)))
+    if issue_type:
+        filters.append(issue.issue_type == issue_type)
+    if severity:
+        filters.append(issue.priority == severity)
+    if status:
+        filters.append(issue.status == status)
+    else:
+        filters.append(issue.status.in_(ACTIVE_STATUSES))
+    if area:
+        # The area is matched literally: % and _ typed by the user are not wildcards.
+        pattern = area.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        filters.append(issue.address.ilike(f"%{pattern}%", escape="\\"))
+    return filters
+
+
+def _feature_query(filters: list, limit: int):
+    """One GeoJSON Feature per row, built by Postgres with ST_AsGeoJSON/json_build_object."""
+    issue = models.InfrastructureIssue
+    reporter = aliased(models.UserProfile)
+    properties = func.json_build_object(
+        "id", cast(issue.id, String),
+        "issueType", issue.issue_type,
+        "severity", issue.priority,
+        "status", issue.status,
+        "area", issue.address,
+        "timestamp", issue.detected_at,
+        "description", func.coalesce(issue.description, issue.title),
+        "reporter", reporter.full_name,
+        "assignedTo", issue.department,
+        "priority", issue.priority,
+        "detectionCount", issue.detection_count,
+        # Kept for existing clients; there is no estimate source for issues yet.
+        "estimatedResolutionTime", null(),
+    )
+    feature = func.json_build_object(
+        "type", "Feature",
+        "geometry", cast(func.ST_AsGeoJSON(issue.location), JSON),
+        "properties", properties,
+    ).label("feature")
+    return (
+        select(feature)
+        .select_from(issue)
+        .outerjoin(reporter, reporter.id == issue.reported_by_id)
+        .where(*filters)
+        .order_by(issue.detected_at.desc())
+        .limit(limit)
+    )
+
+
+def _geojson_response(db: Session, filters: list, limit: int) -> Response:
+    """Aggregates the features into a FeatureCollection and returns Postgres' JSON text as-is."""
+    features = _feature_query(filters, limit).subquery()
+    collection = func.json_build_object(
+        "type", "FeatureCollection",
+        "features", func.coalesce(func.json_agg(features.c.feature), literal_column("'[]'::json")),
+    )
+    body = db.execute(select(cast(collection, Text)).select_from(features)).scalar()
+    return Response(content=body, media_type="application/geo+json")
 
-router = APIRouter(prefix="/api/v1/map", tags=["map"])
 
 @router.get("/issues", response_model=GeoJSONFeatureCollection)
-async def get_map_issues(
+def get_map_issues(
+    bbox: Optional[str] = Query(None, description="Viewport as min_lon,min_lat,max_lon,max_lat"),
     issue_type: Optional[IssueTypeEnum] = Query(None, description="Filter by issue type"),
     severity: Optional[IssuePriorityEnum] = Query(None, description="Filter by severity level"),
-    status: Optional[IssueStatusEnum] = Query(None, description="Filter by issue status"),
-    area: Optional[str] = Query(None, description="Filter by area/locality") # Keep as str for now, but validate against chennai_areas
+    status: Optional[IssueStatusEnum] = Query(None, description="Filter by issue status (default: all active)"),
+    area: Optional[str] = Query(None, description="Filter by area/locality"),
+    limit: int = Query(MAP_MAX_FEATURES, ge=1, le=MAP_MAX_FEATURES, description="Maximum number of features"),
+    db: Session = Depends(database.get_db)
 ):
     """
     Get GeoJSON data of all active infrastructure issues for the map.
-    Supports filtering by issue type, severity, status, and area.
+    Supports filtering by viewport, issue type, severity, status, and area.
     """
-    # Chennai-specific locations with coordinates
-    chennai_areas = {
-        "T. Nagar": {"lat": 13.0478, "lng": 80.2425},
-        "Anna Salai": {"lat": 13.0827, "lng": 80.2707},
-        "Adyar": {"lat": 13.0067, "lng": 80.2544},
-        "Mylapore": {"lat": 13.0370, "lng": 80.2707},
-        "Velachery": {"lat": 12.9716, "lng": 80.2207},
-        "Sholinganallur": {"lat": 12.9067, "lng": 80.2277},
-        "Anna Nagar": {"lat": 13.0827, "lng": 80.2707},
-        "Besant Nagar": {"lat": 13.0067, "lng": 80.2544},
-        "Guindy": {"lat": 13.0067, "lng": 80.2544},
-        "Chromepet": {"lat": 12.9516, "lng": 80.1407},
-        "Tambaram": {"lat": 12.9245, "lng": 80.1275},
-        "Porur": {"lat": 13.0167, "lng": 80.1667},
-        "Vadapalani": {"lat": 13.0500, "lng": 80.2167},
-        "Alwarpet": {"lat": 13.0333, "lng": 80.2500},
-        "Egmore": {"lat": 13.0833, "lng": 80.2667},
-        "Triplicane": {"lat": 13.0667, "lng": 80.2667},
-        "Royapettah": {"lat": 13.0500, "lng": 80.2500},
-        "Mandaveli": {"lat": 13.0167, "lng": 80.2500},
-        "Kotturpuram": {"lat": 13.0167, "lng": 80.2333},
-        "Nungambakkam": {"lat": 13.0667, "lng": 80.2333},
-        "Kodambakkam": {"lat": 13.0500, "lng": 80.2167}
-    }
-
-    # Chennai-specific issue types (from schemas.IssueTypeEnum)
-    # issue_types = [e.value for e in IssueTypeEnum] # This would be better if mock data used enums directly
-
-    # Generate mock issues
-    features = []
-
-    for i in range(random.randint(15, 35)):  # Generate 15-35 issues
-        area_name = random.choice(list(chennai_areas.keys()))
-        base_coords = chennai_areas[area_name]
-
-        # Add some random variation to coordinates within the area
-        lat = base_coords["lat"] + random.uniform(-0.005, 0.005)
-        lng = base_coords["lng"] + random.uniform(-0.005, 0.005)
-
-        # Use Enum values for mock data generation
-        mock_issue_type = random.choice(list(IssueTypeEnum)).value
-        mock_severity = random.choice(list(IssuePriorityEnum)).value
-        mock_status = random.choice(list(IssueStatusEnum)).value
-        mock_confidence_score = round(random.uniform(0.6, 0.99), 2) # Generate random confidence score
-
-        # Apply filters if provided
-        if issue_type and issue_type.value != mock_issue_type: # Compare with .value
-            continue
-        if severity and severity.value != mock_severity: # Compare with .value
-            continue
-        if status and status.value != mock_status: # Compare with .value
-            continue
-        if area and area.lower() != area_name.lower(): # Corrected filter logic
-            continue
-
-        # Generate issue timestamp
-        issue_time = datetime.utcnow() - timedelta(hours=random.randint(1, 168))  # 1 hour to 1 week ago
-
-        # Create GeoJSON feature
-        feature = GeoJSONFeature(
-            type="Feature",
-            geometry={
-                "type": "Point",
-                "coordinates": [lng, lat]  # GeoJSON uses [longitude, latitude]
-            },
-            properties={
-                "id": f"CHEN-{random.randint(1000, 9999)}",
-                "issueType": mock_issue_type, # Use mock_issue_type
-                "severity": mock_severity, # Use mock_severity
-                "status": mock_status, # Use mock_status
-                "area": area_name,
-                "timestamp": issue_time.isoformat(),
-                "description": f"{mock_issue_type} issue in {area_name}",
-                "reporter": f"Citizen-{random.randint(100, 999)}",
-                "assignedTo": f"GCC {random.choice(['Roads', 'Water', 'Electrical', 'Sanitation'])} Department",
-                "priority": random.choice(list(IssuePriorityEnum)).value, # Use Enum value
-                "estimatedResolutionTime": f"{random.randint(1, 7)} days",
-                "confidence_score": mock_confidence_score # Add confidence score
-            }
-        )
-
-        features.append(feature)
-
-    return GeoJSONFeatureCollection(
-        type="FeatureCollection",
-        features=features
-    )
+    filters = issue_filters(parse_bbox(bbox), issue_type, severity, status, area)
+    return _geojson_response(db, filters, limit)
 
 @router.get("/issues/{issue_id}", response_model=GeoJSONFeature)
-async def get_map_issue(issue_id: str):
+def get_map_issue(issue_id: uuid.UUID, db: Session = Depends(database.get_db)):
     """
     Get specific issue by ID for map display.
     """
-    # Get all issues and find the specific one
-    all_issues = await get_map_issues()
-    for feature in all_issues.features:
-        if feature.properties["id"] == issue_id:
-            return feature
-
-    raise HTTPException(status_code=404, detail="Issue not found")
+    issue = models.InfrastructureIssue
+    query = _feature_query([issue.id == issue_id, issue.location.isnot(None)], limit=1)
+    body = db.execute(select(cast(query.subquery().c.feature, Text))).scalar()
+    if body is None:
+        raise HTTPException(status_code=404, detail="Issue not found")
+    return Response(content=body, media_type="application/geo+json")
 
 @router.get("/issues/area/{area_name}", response_model=GeoJSONFeatureCollection)
-async def get_map_issues_by_area(area_name: str):
+def get_map_issues_by_area(area_name: str, db: Session = Depends(database.get_db)):
     """
     Get all issues for a specific area.
     """
-    return await get_map_issues(area=area_name)
+    return _geojson_response(db, issue_filters(area=area_name), MAP_MAX_FEATURES)
 
 @router.get("/issues/type/{issue_type}", response_model=GeoJSONFeatureCollection)
-async def get_map_issues_by_type(issue_type: IssueTypeEnum): # Use Enum
+def get_map_issues_by_type(issue_type: IssueTypeEnum, db: Session = Depends(database.get_db)): # Use Enum
     """
     Get all issues of a specific type.
     """
-    return await get_map_issues(issue_type=issue_type)
+    return _geojson_response(db, issue_filters(issue_type=issue_type), MAP_MAX_FEATURES)
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+def get_map_tile(z: int, x: int, y: int, db: Session = Depends(database.get_db)):
+    """
+    Mapbox Vector Tile of active issues. Up to MVT_CLUSTER_MAX_ZOOM the tile has a
+    'clusters' layer (grid centroids with point_count and per-type counts); above it,
+    an 'issues' layer with one point per issue.
+    """
+    if not 0 <= z <= TILE_MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+
+    tile = tile_cache.get(z, x, y)
+    if tile is None:
+        generation = tile_cache.generation()
+        if z <= MVT_CLUSTER_MAX_ZOOM:
+            cell_size = _WEB_MERCATOR_WIDTH / (2 ** z) / MVT_CLUSTER_GRID
+            tile = db.execute(_TILE_CLUSTERS_SQL, {"z": z, "x": x, "y": y, "cell_size": cell_size}).scalar()
+        else:
+            tile = db.execute(_TILE_ISSUES_SQL, {"z": z, "x": x, "y": y}).scalar()
+        tile = bytes(tile or b"")
+        tile_cache.put(z, x, y, tile, generation)
+
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile")
+
+
+@router.get("/clusters", response_model=MapClusterResponse)
+def get_map_clusters(
+    bbox: str = Query(..., description="Viewport as min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+    issue_type: Optional[IssueTypeEnum] = Query(None, description="Filter by issue type"),
+    severity: Optional[IssuePriorityEnum] = Query(None, description="Filter by severity level"),
+    status: Optional[IssueStatusEnum] = Query(None, description="Filter by issue status (default: all active)"),
+    db: Session = Depends(database.get_db)
+):
+    """
+    Server-side clustering for dense maps: issues in the viewport are bucketed on a
+    grid (sized from the zoom level, but never more than MAP_CLUSTER_MAX_CELLS per
+    side of the bbox) and each cell returns its centroid, count and per-type counts.
+    """
+    parsed = parse_bbox(bbox)
+    min_lon, min_lat, max_lon, max_lat = parsed
+    cell_size = max(
+        360.0 / (2 ** zoom) / MAP_CLUSTER_CELLS_PER_TILE,
+        (max_lon - min_lon) / MAP_CLUSTER_MAX_CELLS,
+        (max_lat - min_lat) / MAP_CLUSTER_MAX_CELLS,
+    )
+
+    issue = models.InfrastructureIssue
+    x, y = func.ST_X(issue.location), func.ST_Y(issue.location)
+    per_type = (
+        select(
+            func.floor(x / cell_size).label("cx"),
+            func.floor(y / cell_size).label("cy"),
+            issue.issue_type.label("issue_type"),
+            func.count().label("n"),
+            func.sum(x).label("sum_x"),
+            func.sum(y).label("sum_y"),
+        )
+        .where(*issue_filters(parsed, issue_type, severity, status))
+        .group_by("cx", "cy", "issue_type")
+        .subquery()
+    )
+    total = func.sum(per_type.c.n)
+    rows = db.execute(
+        select(
+            (func.sum(per_type.c.sum_x) / total).label("lon"),
+            (func.sum(per_type.c.sum_y) / total).label("lat"),
+            total.label("count"),
+            func.json_object_agg(per_type.c.issue_type, per_type.c.n).label("types"),
+        ).group_by(per_type.c.cx, per_type.c.cy)
+    ).all()
+
+    clusters = [
+        MapCluster(lat=float(row.lat), lon=float(row.lon), count=int(row.count), types=row.types)
+        for row in rows
+    ]
+    return MapClusterResponse(
+        zoom=zoom,
+        cell_size_degrees=cell_size,
+        total=sum(c.count for c in clusters),
+        clusters=clusters
+    )
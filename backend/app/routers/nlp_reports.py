@@ -1,5 +1,10 @@
 
+import os
+import uuid
+from typing import List, Optional
+
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import Field, ValidationError
 from sqlalchemy.orm import Session
 
 from .. import crud, schemas, security, models
@@ -12,9 +17,47 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+# --- Configuration ---
+NLP_BATCH_MAX_REPORTS = int(os.getenv("NLP_BATCH_MAX_REPORTS", "5000"))
+
 class TextReport(schemas.BaseModel):
     report_text: str
 
+class TextReportBatch(schemas.BaseModel):
+    reports: List[str] = Field(min_length=1, max_length=NLP_BATCH_MAX_REPORTS)
+
+class TextReportBatchItem(schemas.BaseModel):
+    index: int
+    status: str  # "created" or "error"
+    issue_id: Optional[uuid.UUID] = None
+    issue_type: Optional[models.IssueTypeEnum] = None
+    address: Optional[str] = None
+    error: Optional[str] = None
+
+class TextReportBatchResponse(schemas.BaseModel):
+    created: int
+    failed: int
+    results: List[TextReportBatchItem]
+
+def _analyze(texts: list) -> list:
+    try:
+        return nlp_service.analyze_report_texts(texts)
+    except nlp_service.NLPModelUnavailable as e:
+        print(f"[ERROR] {e}")
+        raise HTTPException(status_code=503, detail="Text analysis is not available right now.")
+
+def _issue_from_text(text: str, nlp_result: dict, reporter_id) -> schemas.InfrastructureIssueCreate:
+    return schemas.InfrastructureIssueCreate(
+        title=nlp_result["title"],
+        description=text,
+        issue_type=nlp_result["issue_type"],
+        latitude=None,  # text reports carry no coordinates; keep them off the map
+        longitude=None,
+        address=nlp_result["address"],
+        detection_source=models.DetectionSourceEnum.citizen_report,
+        reported_by_id=reporter_id,
+    )
+
 @router.post("/text", response_model=schemas.InfrastructureIssue)
 def create_issue_from_text(
     report: TextReport,
@@ -24,17 +67,50 @@ def create_issue_from_text(
     """
     Create an infrastructure issue from unstructured text.
     """
-    nlp_result = nlp_service.analyze_report_text(report.report_text)
-
-    issue_data = schemas.InfrastructureIssueCreate(
-        title=nlp_result["title"],
-        description=report.report_text,
-        issue_type=nlp_result["issue_type"],
-        latitude=0.0,  # Placeholder
-        longitude=0.0, # Placeholder
-        address=nlp_result["address"],
-        detection_source=models.DetectionSourceEnum.citizen_report,
-        reported_by_id=current_user.id,
-    )
+    nlp_result = _analyze([report.report_text])[0]
+    if nlp_result["issue_type"] is None:
+        raise HTTPException(status_code=422, detail="Could not determine the issue type from the report text.")
 
+    issue_data = _issue_from_text(report.report_text, nlp_result, current_user.id)
     return crud.create_infrastructure_issue(db=db, issue=issue_data)
+
+@router.post("/text/batch", response_model=TextReportBatchResponse)
+def create_issues_from_texts(
+    batch: TextReportBatch,
+    db: Session = Depends(get_db),
+    current_user: models.UserProfile = Depends(security.get_current_active_user),
+):
+    """
+    Bulk-imports many unstructured reports (e.g. legacy complaint texts). The texts
+    go through spaCy together and all recognised issues are inserted in one statement.
+    Texts without a recognisable issue type are reported back as errors.
+    """
+    nlp_results = _analyze(batch.reports)
+
+    results, issues = [], []
+    for index, (text, nlp_result) in enumerate(zip(batch.reports, nlp_results)):
+        item = TextReportBatchItem(
+            index=index, status="error",
+            issue_type=nlp_result["issue_type"], address=nlp_result["address"]
+        )
+        results.append(item)
+        if nlp_result["issue_type"] is None:
+            item.error = "Could not determine the issue type."
+            continue
+        try:
+            issues.append((item, _issue_from_text(text, nlp_result, current_user.id)))
+        except ValidationError as e:
+            item.error = str(e)
+
+    if issues:
+        try:
+            issue_ids = crud.bulk_create_issues(db, [issue for _, issue in issues])
+        except Exception as e:
+            db.rollback()
+            print(f"[ERROR] Bulk text report insert failed: {e}")
+            raise HTTPException(status_code=500, detail="Database insert failed.")
+        for (item, _), issue_id in zip(issues, issue_ids):
+            item.status, item.issue_id = "created", issue_id
+
+    created = sum(1 for item in results if item.status == "created")
+    return TextReportBatchResponse(created=created, failed=len(results) - created, results=results)
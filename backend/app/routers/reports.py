@@ -1,12 +1,12 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, status, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Response, status, Depends
 from datetime import datetime
 import random
 from typing import List, Optional
 import os
-from sqlalchemy.orm import Session, joinedload # Import joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload # Import joinedload
 
 from ..schemas import CitizenReport, CitizenReportResponse, IssueStatusEnum, InfrastructureIssueAdmin # Import InfrastructureIssueAdmin
-from .. import database, schemas, models # Import models
+from .. import database, schemas, models, pagination # Import models
 from .. import security # Import the security module
 
 router = APIRouter(prefix="/api/v1/reports", tags=["reports"])
@@ -142,22 +142,39 @@ async def get_reports_summary():
 
 # New endpoint for admin to get all infrastructure issues
 @router.get("/admin/all", response_model=List[InfrastructureIssueAdmin])
-async def get_all_infrastructure_issues(
+def get_all_infrastructure_issues(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit (with no cursor) for every issue"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,title,status"),
     db: Session = Depends(database.get_db),
     current_user: models.UserProfile = Depends(security.get_current_admin_user) # Ensures only admins can access
 ):
     """
-    Retrieves all infrastructure issues with reporter and media details.
-    Accessible only by admin users.
+    Retrieves infrastructure issues with reporter and media details, newest first.
+    Returns every issue unless `limit` or `cursor` is given, in which case it is
+    paginated by cursor (see the X-Next-Cursor header). Accessible only by admin users.
     """
+    if cursor and limit is None:
+        limit = pagination.DEFAULT_PAGE_SIZE
+    issue = models.InfrastructureIssue
+    columns = pagination.parse_fields(fields, issue)
     try:
-        issues = db.query(models.InfrastructureIssue).options(
-            joinedload(models.InfrastructureIssue.reporter),
-            joinedload(models.InfrastructureIssue.media)
-        ).order_by(
-            models.InfrastructureIssue.detected_at.desc()
-        ).all()
-        return issues
+        if columns:
+            query = pagination.projected_query(db, issue, columns, issue.detected_at, issue.id)
+        else:
+            query = db.query(issue).options(
+                joinedload(issue.reporter),
+                selectinload(issue.media)
+            )
+        issues, next_cursor = pagination.keyset_page(query, issue.detected_at, issue.id, cursor, limit)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching admin reports: {e}")
-        raise HTTPException(status_code=500, detail="Failed to fetch reports.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to fetch reports.")
+
+    if columns:
+        return pagination.projected_response(issues, columns, next_cursor)
+    pagination.set_next_cursor(response, next_cursor)
+    return issues
\ No newline at end of file
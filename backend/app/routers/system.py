@@ -1,5 +1,7 @@
 from fastapi import APIRouter
 
+from ..services.ttl_cache import cache_stats
+
 router = APIRouter()
 
 @router.get("/system/stats")
@@ -10,3 +12,9 @@ async def get_system_stats():
         "active_users": 500,
         "new_reports_today": 50
     }
+
+
+@router.get("/system/caches")
+async def get_cache_stats():
+    """Hit rate, size and TTL of every shared in-process cache (auth users, dashboard, community...)."""
+    return cache_stats()
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from .. import models, schemas, security, crud
+from .. import models, schemas, security, crud, pagination
 from ..database import get_db
 
 router = APIRouter(
@@ -12,29 +12,50 @@ router = APIRouter(
 
 @router.get("/", response_model=List[schemas.UserProfile])
 def read_users(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     db: Session = Depends(get_db),
     current_user: models.UserProfile = Depends(security.get_current_admin_user)
 ):
     """
-    Retrieve all users.
+    Retrieve all users, newest first.
+    Prefer `cursor` (from the X-Next-Cursor header) over `skip` for deep pages.
     This endpoint is only accessible to admin users.
     """
-    users = crud.get_users(db, skip=skip, limit=limit)
+    users, next_cursor = crud.get_users(db, skip=skip, limit=limit, cursor=cursor)
+    pagination.set_next_cursor(response, next_cursor)
     return users
 
 @router.get("/me/issues", response_model=List[schemas.InfrastructureIssue])
 def get_my_issues(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit (with no cursor) for every issue"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,title,status"),
     db: Session = Depends(get_db),
-    current_user: models.UserProfile = Depends(security.get_current_user)
+    current_user: models.UserProfile = Depends(security.get_token_principal)
 ):
-    """Fetch all issues reported by the currently authenticated user."""
+    """
+    Fetch the issues reported by the currently authenticated user, newest first.
+    All of them unless `limit` or `cursor` is given.
+    """
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
+    if cursor and limit is None:
+        limit = pagination.DEFAULT_PAGE_SIZE
+
+    issue = models.InfrastructureIssue
+    columns = pagination.parse_fields(fields, issue)
+    if columns:
+        query = pagination.projected_query(db, issue, columns, issue.detected_at, issue.id)
+    else:
+        query = db.query(issue)
+    query = query.filter(issue.reported_by_id == current_user.id)
+    issues, next_cursor = pagination.keyset_page(query, issue.detected_at, issue.id, cursor, limit)
 
-    issues = db.query(models.InfrastructureIssue).filter(
-        models.InfrastructureIssue.reported_by_id == current_user.id
-    ).order_by(models.InfrastructureIssue.detected_at.desc()).all()
-    
+    if columns:
+        return pagination.projected_response(issues, columns, next_cursor)
+    pagination.set_next_cursor(response, next_cursor)
     return issues
\ No newline at end of file
@@ -56,6 +56,16 @@ class InfrastructureIssueCreate(InfrastructureIssueBase):
     detection_source: DetectionSourceEnum
     reported_by_id: uuid.UUID # Link to the user who reported it
 
+class AIDetectionCreate(InfrastructureIssueBase):
+    """A single camera detection as accepted by the bulk ingestion endpoint."""
+    detection_source: DetectionSourceEnum = DetectionSourceEnum.ai_camera
+    reported_by_id: Optional[uuid.UUID] = None
+    video_feed_id: Optional[uuid.UUID] = None
+    confidence_score: float = Field(1.0, ge=0, le=1)
+    bounding_box: Optional[Dict[str, Any]] = None
+    image_url: Optional[str] = Field(None, max_length=255)
+    detected_at: Optional[datetime] = None
+
 class VideoFeedCreate(VideoFeedBase):
     is_active: bool = True
     ai_detection_enabled: bool = True
@@ -104,7 +114,9 @@ class InfrastructureIssue(InfrastructureIssueBase):
     id: uuid.UUID
     status: IssueStatusEnum
     detection_source: DetectionSourceEnum
+    detection_count: int = 1
     detected_at: datetime
+    last_detected_at: Optional[datetime] = None
     updated_at: datetime
     
     # Example of including a nested object for related data
@@ -130,6 +142,19 @@ class WorkOrder(WorkOrderBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class BulkDetectionItemResult(BaseModel):
+    index: int
+    status: str # 'created', 'merged' or 'error'
+    issue_id: Optional[uuid.UUID] = None
+    detection_id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+
+class BulkDetectionResponse(BaseModel):
+    created: int
+    merged: int = 0
+    failed: int
+    results: List[BulkDetectionItemResult]
+
 class CitizenReportResponse(CitizenReport):
     id: uuid.UUID
     created_at: datetime
@@ -235,10 +260,10 @@ class SpotlightStory(BaseModel):
     imageUrl: Optional[str] = None
 
 class AnalyticsSummary(BaseModel):
-    issues_by_type: List[Dict[str, int]]
-    issues_by_severity: List[Dict[str, int]]
-    issues_by_status: List[Dict[str, int]]
-    issues_by_area: List[Dict[str, int]]
+    issues_by_type: List[Dict[str, Any]]
+    issues_by_severity: List[Dict[str, Any]]
+    issues_by_status: List[Dict[str, Any]]
+    issues_by_area: List[Dict[str, Any]]
     resolution_trends: List[Dict[str, Any]]
     department_performance: List[Dict[str, Any]]
     total_issues: int
@@ -249,15 +274,16 @@ class AnalyticsSummary(BaseModel):
 class MapIssue(BaseModel):
     id: str
     issueType: str
-    severity: str
+    severity: Optional[str] = None
     status: str
-    area: str
+    area: Optional[str] = None
     timestamp: datetime
-    description: str
-    reporter: str
-    assignedTo: str
-    priority: str
-    estimatedResolutionTime: str
+    description: Optional[str] = None
+    reporter: Optional[str] = None
+    assignedTo: Optional[str] = None
+    priority: Optional[str] = None
+    estimatedResolutionTime: Optional[str] = None
+    detectionCount: int = 1
 
 class GeoJSONFeature(BaseModel):
     type: str
@@ -268,6 +294,18 @@ class GeoJSONFeatureCollection(BaseModel):
     type: str
     features: List[GeoJSONFeature]
 
+class MapCluster(BaseModel):
+    lat: float
+    lon: float
+    count: int
+    types: Dict[str, int]
+
+class MapClusterResponse(BaseModel):
+    zoom: int
+    cell_size_degrees: float
+    total: int
+    clusters: List[MapCluster]
+
 class InfrastructureIssueAdmin(InfrastructureIssue):
     reporter: Optional[UserProfile] = None
     media: List["IssueMediaSchema"] = []
@@ -1,25 +1,40 @@
 # backend/app/security.py
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from typing import Optional
-from passlib.context import CryptContext
 from jose import JWTError, jwt
 import os
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
 from . import crud, database, models, schemas
+from .services.ttl_cache import get_cache
+from .services.password_hasher import pwd_context, password_hasher, PasswordHasherBusy
 
 # --- Configuration ---
 SECRET_KEY = os.getenv("SECRET_KEY", "a_very_secret_key_that_should_be_changed")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+# Authenticated users are served from memory for this long; changes made through
+# the ORM invalidate the entry immediately (see `invalidate_user`), but only in the
+# process that made them. Other workers keep their copy for up to this TTL.
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+# When enabled, `get_token_principal` trusts the uid/role claims in the token and
+# never touches the DB. Role or deactivation changes then only take effect once
+# the token expires, so this is off by default.
+AUTH_TRUST_TOKEN_CLAIMS = os.getenv("AUTH_TRUST_TOKEN_CLAIMS", "false").lower() == "true"
 
 # This points to your login endpoint
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Columns that never leave the DB row into a cached principal.
+_PRIVATE_USER_COLUMNS = {"password", "reset_token", "reset_token_expires"}
+
+user_cache = get_cache("auth_users", ttl=AUTH_USER_CACHE_TTL_SECONDS, maxsize=AUTH_USER_CACHE_SIZE)
 
 
 # --- Functions ---
@@ -40,8 +55,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(db: Session = Depends(database.get_db), token: str = Depends(oauth2_scheme)):
-    """Dependency to get the current user from a token."""
+def token_claims(user) -> dict:
+    """Claims put into every access token for `user`."""
+    role = user.role.value if hasattr(user.role, "value") else user.role
+    return {"sub": user.email, "uid": str(user.id), "role": role, "full_name": user.full_name}
+
+def principal_from_user(user) -> SimpleNamespace:
+    """
+    Detached snapshot of a user row. Safe to share between requests and threads,
+    unlike the ORM object, which belongs to the session that loaded it.
+    """
+    return SimpleNamespace(**{
+        column.key: getattr(user, column.key)
+        for column in models.UserProfile.__table__.columns
+        if column.key not in _PRIVATE_USER_COLUMNS
+    })
+
+def invalidate_user(email: str):
+    """Drops a cached principal; call after changing a user's profile, role or password."""
+    if email:
+        user_cache.invalidate(email)
+
+@event.listens_for(models.UserProfile, "after_update")
+@event.listens_for(models.UserProfile, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    # An email change leaves the old address cached too; it is still in the attribute history here.
+    for email in (target.email, *inspect(target).attrs.email.history.deleted):
+        invalidate_user(email)
+
+def _decode_token(token: str) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,30 +91,58 @@ def get_current_user(db: Session = Depends(database.get_db), token: str = Depend
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        # Extract full_name and role from payload
-        full_name: str = payload.get("full_name")
-        role: str = payload.get("role")
-
-        if email is None:
-            raise credentials_exception
-        # token_data = schemas.TokenData(username=email) # FastAPI uses 'username' field here
-        # The TokenData schema might need to be updated if you want to use it for full_name and role
-        # For now, we'll directly use the payload values
-
     except JWTError:
         raise credentials_exception
-    
-    user = crud.get_user_by_email(db, email=email) # Use email directly
-    if user is None:
+    if payload.get("sub") is None:
         raise credentials_exception
-    
-    # You might want to verify that the role in the token matches the role in the DB
-    # if user.role.value != role:
-    #     raise credentials_exception
+    return payload
+
+def _load_principal(db: Session, email: str):
+    user = crud.get_user_by_email(db, email=email)
+    return principal_from_user(user) if user is not None else None
 
+def get_current_user(db: Session = Depends(database.get_db), token: str = Depends(oauth2_scheme)):
+    """
+    Dependency to get the current user from a token. Returns a cached snapshot
+    of the user row (not a session-bound ORM object); the DB is only queried
+    once per user per AUTH_USER_CACHE_TTL_SECONDS.
+    """
+    email = _decode_token(token)["sub"]
+    # Unknown users are not cached, so a just-registered account works at once.
+    user = user_cache.get(email)
+    if user is None:
+        user = _load_principal(db, email)
+        if user is not None:
+            user_cache.set(email, user)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
+def get_token_principal(db: Session = Depends(database.get_db), token: str = Depends(oauth2_scheme)):
+    """
+    Dependency for read-only routes that only need the caller's id and role.
+    With AUTH_TRUST_TOKEN_CLAIMS enabled, it is answered from the token alone;
+    otherwise (or for tokens issued without a uid claim) it behaves like
+    `get_current_user`.
+    """
+    payload = _decode_token(token)
+    if AUTH_TRUST_TOKEN_CLAIMS and payload.get("uid") and payload.get("role"):
+        try:
+            return SimpleNamespace(
+                id=uuid.UUID(payload["uid"]),
+                email=payload["sub"],
+                role=models.UserRoleEnum(payload["role"]),
+                full_name=payload.get("full_name"),
+                is_active=True,
+            )
+        except ValueError:
+            pass
+    return get_current_user(db, token)
+
 def get_current_active_user(current_user: models.UserProfile = Depends(get_current_user)):
     """Dependency to check if the current user is active."""
     if not current_user.is_active:
@@ -0,0 +1,252 @@
+# backend/app/services/alert_dispatcher.py
+
+import os
+import math
+import time
+import queue
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv, find_dotenv
+
+# --- Configuration ---
+# The settings below are read at import, which may happen before anything else
+# has loaded .env (main.py imports services ahead of the routers), so load it here.
+load_dotenv(find_dotenv(usecwd=True))
+TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
+TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+TWILIO_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
+# Comma-separated; RECIPIENT_PHONE_NUMBER is the older single-recipient setting.
+ALERT_RECIPIENTS = [
+    number.strip()
+    for number in os.getenv("ALERT_RECIPIENTS", os.getenv("RECIPIENT_PHONE_NUMBER", "")).split(",")
+    if number.strip()
+]
+# Alerts arriving within this window of the first one go out as a single message.
+ALERT_COALESCE_SECONDS = float(os.getenv("ALERT_COALESCE_SECONDS", "10"))
+# At most one SMS per recipient per interval; anything in between is folded into the next digest.
+ALERT_MIN_INTERVAL_SECONDS = float(os.getenv("ALERT_MIN_INTERVAL_SECONDS", "60"))
+ALERT_MAX_RETRIES = int(os.getenv("ALERT_MAX_RETRIES", "4"))
+ALERT_MAX_QUEUE = int(os.getenv("ALERT_MAX_QUEUE", "1000"))
+
+# Singular/plural wording for digests ("14 critical potholes in Adyar ...").
+_ISSUE_NOUNS = {
+    "pothole": ("pothole", "potholes"),
+    "garbage_piles": ("garbage pile", "garbage piles"),
+    "street_flooding": ("street flooding report", "street flooding reports"),
+    "illegal_parking": ("illegal parking report", "illegal parking reports"),
+    "debris": ("debris report", "debris reports"),
+}
+_MAX_DIGEST_LINES = 5
+
+
+def _value(field):
+    return getattr(field, "value", field)
+
+
+class TwilioTransport:
+    """Sends SMS through Twilio. The client library is only imported when this is used."""
+
+    def __init__(self, account_sid: str, auth_token: str, from_number: str):
+        from twilio.rest import Client
+        self.client = Client(account_sid, auth_token)
+        self.from_number = from_number
+
+    def send(self, to: str, body: str):
+        sms = self.client.messages.create(body=body, from_=self.from_number, to=to)
+        print(f"[INFO] SMS alert sent to {to}. SID: {sms.sid}")
+
+
+class FakeTransport:
+    """Records messages instead of sending them; `fail_times` makes the first sends raise."""
+
+    def __init__(self, fail_times: int = 0):
+        self.sent = []
+        self.fail_times = fail_times
+
+    def send(self, to: str, body: str):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("Fake transport failure")
+        self.sent.append((to, body))
+
+
+class AlertDispatcher:
+    """
+    Delivers issue alerts by SMS from a background thread.
+
+    `submit` only enqueues, so request handlers never wait on the SMS provider.
+    The worker fans each alert out to every recipient. Per recipient it waits
+    `coalesce_seconds` after the first pending alert and sends at most one message
+    per `min_interval`. Several pending alerts become one digest grouped by
+    priority, issue type and area. A failed send is retried with exponential
+    backoff; after `max_retries` retries the pending alerts are dropped.
+    """
+
+    def __init__(self, transport, recipients: list, coalesce_seconds: float = 10.0,
+                 min_interval: float = 60.0, max_retries: int = 4, backoff_base: float = 5.0,
+                 backoff_max: float = 300.0, max_queue: int = 1000, clock=time.monotonic):
+        self.transport = transport
+        self.recipients = list(recipients)
+        self.coalesce_seconds = coalesce_seconds
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = {recipient: [] for recipient in self.recipients}  # recipient -> [alert]
+        self._next_send_at = {recipient: 0.0 for recipient in self.recipients}
+        self._attempts = {recipient: 0 for recipient in self.recipients}
+        self._stop_event = threading.Event()
+        self._worker = None
+        self.submitted = 0
+        self.dropped = 0
+        self.messages_sent = 0
+        self.alerts_sent = 0
+        self.failed_attempts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.transport is not None and bool(self.recipients)
+
+    def start(self):
+        if not self.enabled:
+            print("[INFO] SMS alerting not configured. Alerts will not be sent.")
+            return
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stops the worker, making one last attempt to send whatever is pending."""
+        self._stop_event.set()
+        if self._worker:
+            self._worker.join(timeout=timeout)
+
+    def submit(self, issue_type, priority, address: str = None, title: str = None):
+        """Queues an alert about one issue. Never blocks; alerts are dropped if the queue is full."""
+        if not self.enabled:
+            return
+        self.submitted += 1
+        issue_type, priority = _value(issue_type), _value(priority)
+        alert = {
+            "issue_type": issue_type,
+            "priority": priority,
+            "area": address or "unknown location",
+            "title": title or issue_type.replace("_", " ").title(),
+            "queued_at": self.clock(),
+        }
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+            print("[WARN] Alert queue is full; dropping alert.")
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "pending": {recipient: len(alerts) for recipient, alerts in self._pending.items()},
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "messages_sent": self.messages_sent,
+            "alerts_sent": self.alerts_sent,
+            "failed_attempts": self.failed_attempts,
+        }
+
+    # --- Messages ---
+    def format_message(self, alerts: list) -> str:
+        if len(alerts) == 1:
+            alert = alerts[0]
+            return (
+                f"[InfraSight AI Alert] {alert['priority'].title()} priority issue detected!\n"
+                f"{alert['title']}\n"
+                f"Location: {alert['area']}"
+            )
+        groups = OrderedDict()
+        for alert in alerts:
+            key = (alert["priority"], alert["issue_type"], alert["area"])
+            groups[key] = groups.get(key, 0) + 1
+        window = alerts[-1]["queued_at"] - alerts[0]["queued_at"]
+        minutes = max(1, math.ceil(window / 60))
+        lines = []
+        for (priority, issue_type, area), count in sorted(groups.items(), key=lambda item: -item[1]):
+            singular, plural = _ISSUE_NOUNS.get(issue_type, (issue_type.replace("_", " "),) * 2)
+            lines.append(f"{count} {priority} {singular if count == 1 else plural} in {area}")
+        if len(lines) > _MAX_DIGEST_LINES:
+            hidden = len(lines) - _MAX_DIGEST_LINES
+            lines = lines[:_MAX_DIGEST_LINES] + [f"...and {hidden} more"]
+        return f"[InfraSight AI Alert] Last {minutes} min:\n" + "\n".join(lines)
+
+    # --- Worker ---
+    def pump(self, force: bool = False):
+        """Moves queued alerts to the recipients' pending lists and sends every digest that is due."""
+        while True:
+            try:
+                alert = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            for recipient in self.recipients:
+                self._pending[recipient].append(alert)
+
+        now = self.clock()
+        for recipient in self.recipients:
+            alerts = self._pending[recipient]
+            if not alerts:
+                continue
+            due = alerts[0]["queued_at"] + self.coalesce_seconds <= now and self._next_send_at[recipient] <= now
+            if not (due or force):
+                continue
+            try:
+                self.transport.send(recipient, self.format_message(alerts))
+            except Exception as e:
+                self.failed_attempts += 1
+                attempt = self._attempts[recipient]
+                print(f"[ERROR] Failed to send alert to {recipient} (attempt {attempt + 1}): {e}")
+                if attempt >= self.max_retries or force:
+                    print(f"[ERROR] Dropping {len(alerts)} alerts for {recipient}.")
+                    self.dropped += len(alerts)
+                    self._pending[recipient] = []
+                    self._attempts[recipient] = 0
+                else:
+                    self._attempts[recipient] = attempt + 1
+                    self._next_send_at[recipient] = now + min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                continue
+            self.messages_sent += 1
+            self.alerts_sent += len(alerts)
+            self._pending[recipient] = []
+            self._attempts[recipient] = 0
+            self._next_send_at[recipient] = now + self.min_interval
+
+    def _run(self):
+        tick = max(0.1, min(1.0, self.coalesce_seconds / 2))
+        while not self._stop_event.is_set():
+            try:
+                self.pump()
+            except Exception as e:
+                print(f"[ERROR] Alert dispatcher error: {e}")
+            self._stop_event.wait(tick)
+        self.pump(force=True)
+
+
+def _default_transport():
+    if not all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_NUMBER]):
+        return None
+    try:
+        return TwilioTransport(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_NUMBER)
+    except ImportError:
+        print("[ERROR] Twilio credentials are set but the twilio package is not installed.")
+        return None
+
+
+# --- Shared Instance ---
+alert_dispatcher = AlertDispatcher(
+    _default_transport(),
+    ALERT_RECIPIENTS,
+    coalesce_seconds=ALERT_COALESCE_SECONDS,
+    min_interval=ALERT_MIN_INTERVAL_SECONDS,
+    max_retries=ALERT_MAX_RETRIES,
+    max_queue=ALERT_MAX_QUEUE,
+)
@@ -0,0 +1,133 @@
+# backend/app/services/dedup.py
+
+import os
+import math
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# --- Configuration ---
+DEDUP_RADIUS_METERS = float(os.getenv("DEDUP_RADIUS_METERS", "25"))
+DEDUP_WINDOW_HOURS = float(os.getenv("DEDUP_WINDOW_HOURS", "24"))
+
+# Statuses that count as "still open" for merging. Keep in sync with the
+# partial index ix_infrastructure_issues_open_location.
+OPEN_STATUSES = ("detected", "verified", "in_progress")
+
+_EARTH_RADIUS_M = 6371008.8
+_METERS_PER_DEGREE = 111320.0
+
+# One round trip per batch: every incoming detection probes the partial GiST index
+# with a degree-based ST_DWithin (index-backed), then the exact metre distance is
+# checked on geography and the nearest candidate wins.
+_MATCH_SQL = text("""
+    SELECT d.idx, m.id
+    FROM unnest(
+        CAST(:idx AS integer[]), CAST(:issue_types AS text[]),
+        CAST(:lons AS float8[]), CAST(:lats AS float8[]), CAST(:detected_at AS timestamp[])
+    ) AS d(idx, issue_type, lon, lat, detected_at)
+    CROSS JOIN LATERAL (
+        SELECT i.id
+        FROM infrastructure_issues i
+        WHERE i.status IN ('detected', 'verified', 'in_progress')
+          AND i.issue_type = CAST(d.issue_type AS issuetypeenum)
+          AND COALESCE(i.last_detected_at, i.detected_at) >= d.detected_at - make_interval(secs => :window_seconds)
+          AND ST_DWithin(
+                i.location, ST_SetSRID(ST_MakePoint(d.lon, d.lat), 4326),
+                :radius_m / (:meters_per_degree * GREATEST(cos(radians(d.lat)), 0.01)))
+          AND ST_DWithin(
+                i.location::geography, ST_SetSRID(ST_MakePoint(d.lon, d.lat), 4326)::geography, :radius_m)
+        ORDER BY i.location <-> ST_SetSRID(ST_MakePoint(d.lon, d.lat), 4326)
+        LIMIT 1
+    ) AS m
+""")
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _has_location(detection) -> bool:
+    return detection.latitude is not None and detection.longitude is not None
+
+
+def find_open_duplicates(db: Session, detections: list, radius_m: float = DEDUP_RADIUS_METERS,
+                         window_hours: float = DEDUP_WINDOW_HOURS) -> dict:
+    """Maps the index of each detection that has an open issue nearby to that issue's id."""
+    now = datetime.utcnow()
+    rows = [
+        (i, d.issue_type.value, float(d.longitude), float(d.latitude), getattr(d, "detected_at", None) or now)
+        for i, d in enumerate(detections) if _has_location(d)
+    ]
+    if not rows:
+        return {}
+    idx, issue_types, lons, lats, detected_at = (list(column) for column in zip(*rows))
+    result = db.execute(_MATCH_SQL, {
+        "idx": idx,
+        "issue_types": issue_types,
+        "lons": lons,
+        "lats": lats,
+        "detected_at": detected_at,
+        "window_seconds": window_hours * 3600,
+        "radius_m": radius_m,
+        "meters_per_degree": _METERS_PER_DEGREE,
+    })
+    return {row.idx: row.id for row in result}
+
+
+def assign_duplicates(detections: list, existing: dict, radius_m: float = DEDUP_RADIUS_METERS,
+                      window_hours: float = DEDUP_WINDOW_HOURS) -> list:
+    """
+    Decides where each detection of a batch goes. Returns one target per detection:
+    an existing issue id (from `existing`), the int index of an earlier detection in
+    the same batch that opens the issue this one merges into, or None for a new issue.
+
+    Detections without a match in the database are grouped among themselves on a grid
+    of `radius_m` cells, so only neighbouring cells are compared.
+    """
+    window = timedelta(hours=window_hours)
+    now = datetime.utcnow()
+    cell_deg = radius_m / _METERS_PER_DEGREE
+    leaders = {}  # (issue_type, cell_y, cell_x) -> [leader indexes]
+    targets = []
+
+    for i, detection in enumerate(detections):
+        if i in existing:
+            targets.append(existing[i])
+            continue
+        if not _has_location(detection):
+            targets.append(None)
+            continue
+
+        lat, lon = float(detection.latitude), float(detection.longitude)
+        detected_at = getattr(detection, "detected_at", None) or now
+        cell_y = int(math.floor(lat / cell_deg))
+        # Longitude cells widen towards the poles; scale so a cell still spans ~radius_m.
+        cell_x = int(math.floor(lon * max(math.cos(math.radians(lat)), 0.01) / cell_deg))
+
+        target = None
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                for j in leaders.get((detection.issue_type, cell_y + dy, cell_x + dx), ()):
+                    leader = detections[j]
+                    leader_at = getattr(leader, "detected_at", None) or now
+                    if abs(detected_at - leader_at) > window:
+                        continue
+                    if haversine_m(lat, lon, float(leader.latitude), float(leader.longitude)) <= radius_m:
+                        target = j
+                        break
+                if target is not None:
+                    break
+            if target is not None:
+                break
+
+        if target is None:
+            leaders.setdefault((detection.issue_type, cell_y, cell_x), []).append(i)
+        targets.append(target)
+    return targets
@@ -0,0 +1,212 @@
+# backend/app/services/detection_sink.py
+
+import os
+import json
+import time
+import queue
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- Configuration ---
+DETECTION_SINK_URL = os.getenv("MAIN_BACKEND_URL", "http://backend:8000/api/v1/detections")
+DETECTION_SINK_BATCH_SIZE = int(os.getenv("DETECTION_SINK_BATCH_SIZE", "50"))
+DETECTION_SINK_FLUSH_SECONDS = float(os.getenv("DETECTION_SINK_FLUSH_SECONDS", "2.0"))
+DETECTION_SINK_MAX_RETRIES = int(os.getenv("DETECTION_SINK_MAX_RETRIES", "4"))
+DETECTION_SINK_MAX_QUEUE = int(os.getenv("DETECTION_SINK_MAX_QUEUE", "10000"))
+DETECTION_SINK_SPOOL_PATH = os.getenv("DETECTION_SINK_SPOOL_PATH", "storage/detection_spool.jsonl")
+
+
+class HttpDetectionTransport:
+    """Posts detections to the backend over a pooled, keep-alive HTTP session."""
+
+    def __init__(self, url: str, timeout: float = 5.0, pool_size: int = 10):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, batch: list):
+        # One request per batch via the bulk endpoint instead of one per detection.
+        response = self.session.post(f"{self.url.rstrip('/')}/bulk", json=batch, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+class DetectionSink:
+    """
+    Buffers detections and delivers them from a background thread.
+
+    Detections are grouped into batches of `batch_size` or whatever arrived within
+    `flush_interval` seconds. A failed batch is retried with exponential backoff;
+    if it still fails it is appended to an on-disk JSONL spool, which is replayed
+    when the worker starts and after each successful delivery. `submit` never
+    blocks on the network.
+    """
+
+    def __init__(self, transport, batch_size: int = 50, flush_interval: float = 2.0,
+                 max_retries: int = 4, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 spool_path: str = None, max_queue: int = 10000):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.spool_path = spool_path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spool_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._worker = None
+        self.submitted = 0
+        self.delivered = 0
+        self.spooled = 0
+        self.failed_attempts = 0
+
+    def start(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="detection-sink", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stops the worker after flushing what is queued; anything undeliverable is spooled."""
+        self._stop_event.set()
+        if self._worker:
+            self._worker.join(timeout=timeout)
+        # The worker is a daemon thread; whatever it didn't get to within the
+        # timeout would die with the process, so keep it for the next start.
+        leftover = []
+        while True:
+            try:
+                leftover.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if leftover:
+            self._spool(leftover)
+
+    def submit(self, detection: dict):
+        self.submitted += 1
+        try:
+            self._queue.put_nowait(detection)
+        except queue.Full:
+            self._spool([detection])
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "spooled": self.spooled,
+            "failed_attempts": self.failed_attempts,
+        }
+
+    # --- Spool ---
+    def _spool(self, batch: list):
+        if not self.spool_path:
+            print(f"[ERROR] Dropping {len(batch)} detections: backend unavailable and no spool configured.")
+            return
+        with self._spool_lock:
+            directory = os.path.dirname(self.spool_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for detection in batch:
+                    f.write(json.dumps(detection, default=str) + "\n")
+            self.spooled += len(batch)
+        print(f"[WARN] Spooled {len(batch)} detections to {self.spool_path}.")
+
+    def _drain_spool(self):
+        if not self.spool_path:
+            return
+        # Several worker processes may share the spool: claim it under a name that is
+        # ours alone. Whoever loses the race simply finds nothing to replay.
+        replay_path = f"{self.spool_path}.{os.getpid()}.{threading.get_ident()}.replay"
+        with self._spool_lock:
+            try:
+                os.replace(self.spool_path, replay_path)
+            except FileNotFoundError:
+                return
+            pending, bad_lines = [], 0
+            with open(replay_path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        pending.append(json.loads(line))
+                    except ValueError:
+                        bad_lines += 1
+            os.remove(replay_path)
+            self.spooled = max(0, self.spooled - len(pending))
+        if bad_lines:
+            print(f"[WARN] Skipped {bad_lines} unreadable lines in the detection spool.")
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            if not self._deliver(batch, retries=0):
+                # Backend went away again: put this and the remaining items back.
+                self._spool(pending[start:])
+                return
+        if pending:
+            print(f"[INFO] Replayed {len(pending)} spooled detections.")
+
+    # --- Worker ---
+    def _deliver(self, batch: list, retries: int) -> bool:
+        for attempt in range(retries + 1):
+            try:
+                self.transport.send(batch)
+                self.delivered += len(batch)
+                return True
+            except Exception as e:
+                self.failed_attempts += 1
+                print(f"[ERROR] Failed to send {len(batch)} detections (attempt {attempt + 1}): {e}")
+                if attempt < retries and not self._stop_event.is_set():
+                    time.sleep(min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        return False
+
+    def _next_batch(self) -> list:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            self._drain_spool()
+        except Exception as e:
+            print(f"[ERROR] Detection spool replay failed: {e}")
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            try:
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                retries = 0 if self._stop_event.is_set() else self.max_retries
+                if self._deliver(batch, retries=retries):
+                    self._drain_spool()
+                else:
+                    self._spool(batch)
+            except Exception as e:
+                print(f"[ERROR] Detection sink error: {e}")
+
+
+# --- Shared Instance ---
+detection_sink = DetectionSink(
+    HttpDetectionTransport(DETECTION_SINK_URL),
+    batch_size=DETECTION_SINK_BATCH_SIZE,
+    flush_interval=DETECTION_SINK_FLUSH_SECONDS,
+    max_retries=DETECTION_SINK_MAX_RETRIES,
+    spool_path=DETECTION_SINK_SPOOL_PATH,
+    max_queue=DETECTION_SINK_MAX_QUEUE,
+)
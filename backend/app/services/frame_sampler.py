@@ -0,0 +1,89 @@
+# backend/app/services/frame_sampler.py
+
+import threading
+
+import cv2
+import numpy as np
+
+
+class AdaptiveFrameSampler:
+    """
+    Decides which video frames are worth a YOLO pass.
+
+    Each frame is reduced to a small grayscale thumbnail and compared with the
+    thumbnail of the last frame that was inferred. Frames whose mean absolute
+    difference stays under `diff_threshold` are skipped (the pipeline reuses the
+    previous detections for them), but never more than `max_interval` in a row.
+    Motion above the threshold, or a change in the number of detected objects,
+    switches to inferring every frame for the next `boost_frames` frames.
+
+    `should_infer` is called from the decode thread and `observe` from the
+    inference thread, which runs behind decode by however many frames are queued
+    between them. A boost from `observe` therefore starts at the first frame not
+    yet decided, not at the frame whose detections triggered it; `feedback_lag`
+    reports how far behind that was (the pipeline keeps the queue short to bound it).
+    """
+
+    def __init__(self, diff_threshold: float = 6.0, max_interval: int = 15,
+                 boost_frames: int = 15, thumbnail_size: tuple = (64, 36)):
+        self.diff_threshold = diff_threshold
+        self.max_interval = max(1, max_interval)
+        self.boost_frames = boost_frames
+        self.thumbnail_size = thumbnail_size
+        self._lock = threading.Lock()
+        self._reference = None
+        self._since_inferred = 0
+        self._boost_until = -1  # last frame index inside the current boost
+        self._next_frame_idx = 0  # first frame index should_infer hasn't decided yet
+        self._last_object_count = None
+        self.frames_seen = 0
+        self.frames_selected = 0
+        self.feedback_lag = 0
+        self.max_feedback_lag = 0
+
+    def _thumbnail(self, frame) -> np.ndarray:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+
+    def should_infer(self, frame_idx: int, frame) -> bool:
+        thumbnail = self._thumbnail(frame)  # outside the lock; it's the expensive part
+        with self._lock:
+            self.frames_seen += 1
+            self._next_frame_idx = frame_idx + 1
+
+            if self._reference is None or frame_idx <= self._boost_until:
+                selected = True
+            elif self._since_inferred + 1 >= self.max_interval:
+                selected = True
+            else:
+                diff = float(cv2.absdiff(thumbnail, self._reference).mean())
+                selected = diff >= self.diff_threshold
+                if selected:
+                    self._boost_until = frame_idx + self.boost_frames
+
+            if selected:
+                self._reference = thumbnail
+                self._since_inferred = 0
+                self.frames_selected += 1
+            else:
+                self._since_inferred += 1
+            return selected
+
+    def observe(self, result, frame_idx: int = None):
+        """
+        Feeds back the detections for inferred frame `frame_idx`; a change in the
+        number of objects boosts the sampling rate for the next `boost_frames`
+        frames that haven't been decided yet.
+        """
+        object_count = len(result.boxes) if result is not None and result.boxes is not None else 0
+        with self._lock:
+            if frame_idx is not None:
+                self.feedback_lag = max(0, self._next_frame_idx - 1 - frame_idx)
+                self.max_feedback_lag = max(self.max_feedback_lag, self.feedback_lag)
+            if self._last_object_count is not None and object_count != self._last_object_count:
+                self._boost_until = max(self._boost_until, self._next_frame_idx - 1 + self.boost_frames)
+            self._last_object_count = object_count
+
+    @property
+    def inference_ratio(self) -> float:
+        return self.frames_selected / self.frames_seen if self.frames_seen else 0.0
@@ -0,0 +1,142 @@
+# backend/app/services/inference_executor.py
+
+import os
+import asyncio
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# --- Configuration ---
+# "thread" keeps YOLO in this process so concurrent requests share the micro-batcher;
+# "process" gives each worker process its own model (useful when torch is pinned to one core).
+# In process mode cv_model.predict_image runs in the child processes, so its in-memory
+# state lives there, not in the API process: the prediction cache's memory tier and
+# hit counters, and the batcher metrics, are per child and don't show in /cv-api/metrics.
+# The prediction cache's disk tier is shared, so cached results and image links still work.
+INFERENCE_EXECUTOR_MODE = os.getenv("INFERENCE_EXECUTOR_MODE", "thread")
+INFERENCE_MAX_WORKERS = int(os.getenv("INFERENCE_MAX_WORKERS", "4"))
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", "16"))
+INFERENCE_RETRY_AFTER_SECONDS = int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", "5"))
+IO_MAX_WORKERS = int(os.getenv("IO_MAX_WORKERS", "16"))
+
+
+class InferenceQueueFull(Exception):
+    """Raised when the inference executor cannot admit more work."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full.")
+        self.retry_after = retry_after
+
+
+def _init_inference_process():
+    """Loads the YOLO model once inside each worker process."""
+    from .. import cv_model
+    cv_model.load_models()
+
+
+class InferenceExecutor:
+    """
+    Runs blocking CV work off the event loop.
+
+    CPU-bound inference goes to a bounded pool with admission control; blocking
+    I/O (the summary and prediction caches' disk tiers) goes to a separate
+    thread pool so it never competes with inference for workers.
+    """
+
+    def __init__(self, mode: str = "thread", max_workers: int = 4, max_queue: int = 16,
+                 io_workers: int = 16, retry_after: int = 5):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.io_workers = io_workers
+        self.retry_after = retry_after
+        self._cpu_pool = None
+        self._io_pool = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def start(self):
+        if self._cpu_pool is None:
+            if self.mode == "process":
+                self._cpu_pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=_init_inference_process
+                )
+            else:
+                self._cpu_pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="inference"
+                )
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="inference-io")
+        print(f"[INFO] Inference executor started (mode={self.mode}, workers={self.max_workers}, queue={self.max_queue}).")
+        if self.mode == "process":
+            print("[WARN] Process mode: prediction cache hits and batcher metrics are kept per worker process "
+                  "and are not reported by /cv-api/metrics.")
+
+    def shutdown(self):
+        if self._cpu_pool:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
+        if self._io_pool:
+            self._io_pool.shutdown(wait=False, cancel_futures=True)
+            self._io_pool = None
+
+    def check_capacity(self):
+        """Raises InferenceQueueFull if no slot is free right now."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise InferenceQueueFull(self.retry_after)
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise InferenceQueueFull(self.retry_after)
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run_inference(self, fn, *args, **kwargs):
+        """Runs a CPU-bound callable in the inference pool, rejecting work when saturated."""
+        if self._cpu_pool is None:
+            raise RuntimeError("Inference executor is not running.")
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._cpu_pool, partial(fn, *args, **kwargs))
+        finally:
+            self._release()
+
+    async def run_io(self, fn, *args, **kwargs):
+        """Runs a blocking I/O callable in the dedicated I/O thread pool."""
+        if self._io_pool is None:
+            raise RuntimeError("Inference executor is not running.")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, partial(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "in_flight": self._in_flight,
+            "capacity": self.capacity,
+            "rejected": self._rejected,
+        }
+
+
+# --- Shared Instance ---
+inference_executor = InferenceExecutor(
+    mode=INFERENCE_EXECUTOR_MODE,
+    max_workers=INFERENCE_MAX_WORKERS,
+    max_queue=INFERENCE_MAX_QUEUE,
+    io_workers=IO_MAX_WORKERS,
+    retry_after=INFERENCE_RETRY_AFTER_SECONDS,
+)
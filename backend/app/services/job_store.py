@@ -0,0 +1,316 @@
+# backend/app/services/job_store.py
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+# --- Configuration ---
+# "sqlite" is shared by every uvicorn worker on the host; "memory" is per-process.
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "sqlite")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "storage/jobs.sqlite3")
+JOB_BLOB_DIR = os.getenv("JOB_BLOB_DIR", "storage/job_blobs")
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+JOB_STORE_MAX_BYTES = int(os.getenv("JOB_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+JOB_STORE_MAX_ENTRIES = int(os.getenv("JOB_STORE_MAX_ENTRIES", "10000"))
+
+
+class BlobStore:
+    """Stores job payloads (e.g. annotated JPEGs) as files so records only carry a reference."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, blob_id: str) -> str:
+        # Blob ids are generated server-side, but never let one escape the directory.
+        return os.path.join(self.directory, os.path.basename(blob_id))
+
+    def put(self, blob_id: str, data: bytes) -> str:
+        path = self._path(blob_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return blob_id
+
+    def get(self, blob_id: str) -> Optional[bytes]:
+        try:
+            with open(self._path(blob_id), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def path(self, blob_id: str) -> Optional[str]:
+        path = self._path(blob_id)
+        return path if os.path.exists(path) else None
+
+    def size(self, blob_id: str) -> int:
+        try:
+            return os.path.getsize(self._path(blob_id))
+        except OSError:
+            return 0
+
+    def delete(self, blob_id: str):
+        try:
+            os.remove(self._path(blob_id))
+        except FileNotFoundError:
+            pass
+
+
+class JobStore(ABC):
+    """
+    Interface for async job results.
+
+    A record is a JSON-serialisable dict. Large payloads are written to `self.blobs`
+    and referenced from the record by the `blob_id` key, which is deleted together
+    with the job when it expires or is evicted.
+    """
+
+    def __init__(self, blobs: BlobStore, ttl_seconds: int):
+        self.blobs = blobs
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def set(self, job_id: str, record: dict):
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def delete(self, job_id: str):
+        ...
+
+    @abstractmethod
+    def purge_expired(self) -> int:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+    def _record_size(self, record: dict) -> int:
+        """Bytes counted against a byte budget: the record plus its referenced blob."""
+        size = len(json.dumps(record, default=str))
+        if record.get("blob_id"):
+            size += self.blobs.size(record["blob_id"])
+        return size
+
+    def _drop_blob(self, record: Optional[dict]):
+        if record and record.get("blob_id"):
+            self.blobs.delete(record["blob_id"])
+
+
+class MemoryJobStore(JobStore):
+    """Per-process LRU store with a TTL and a byte budget that includes referenced blobs."""
+
+    def __init__(self, blobs: BlobStore, ttl_seconds: int = 3600,
+                 max_bytes: int = 64 * 1024 * 1024, max_entries: int = 10000):
+        super().__init__(blobs, ttl_seconds)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # job_id -> (expires_at, record, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _remove(self, job_id: str):
+        _, record, size = self._entries.pop(job_id)
+        self._bytes -= size
+        return record
+
+    def set(self, job_id: str, record: dict):
+        size = self._record_size(record)
+        dropped = []
+        with self._lock:
+            if job_id in self._entries:
+                old = self._remove(job_id)
+                if old.get("blob_id") != record.get("blob_id"):
+                    dropped.append(old)
+            self._entries[job_id] = (time.time() + self.ttl_seconds, record, size)
+            self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                oldest = next(iter(self._entries))
+                if oldest == job_id and len(self._entries) == 1:
+                    break
+                dropped.append(self._remove(oldest))
+        for old in dropped:
+            self._drop_blob(old)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            expires_at, record, _ = entry
+            if expires_at < time.time():
+                self._remove(job_id)
+                expired = record
+            else:
+                self._entries.move_to_end(job_id)
+                return record
+        self._drop_blob(expired)
+        return None
+
+    def delete(self, job_id: str):
+        with self._lock:
+            record = self._remove(job_id) if job_id in self._entries else None
+        self._drop_blob(record)
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, (expires_at, _, _) in self._entries.items() if expires_at < now]
+            records = [self._remove(job_id) for job_id in expired]
+        for record in records:
+            self._drop_blob(record)
+        return len(records)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite-backed store shared by every worker process on the same host, with a
+    TTL and the same byte/entry budget as MemoryJobStore. Over budget, the oldest
+    jobs are evicted first (by write time; reads don't refresh them).
+    """
+
+    # Expired rows are swept every this many writes rather than on a timer.
+    PURGE_EVERY_WRITES = 100
+
+    def __init__(self, path: str, blobs: BlobStore, ttl_seconds: int = 3600,
+                 max_bytes: int = 64 * 1024 * 1024, max_entries: int = 10000):
+        super().__init__(blobs, ttl_seconds)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " record TEXT NOT NULL,"
+                " blob_id TEXT,"
+                " size INTEGER NOT NULL DEFAULT 0,"
+                " expires_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "size" not in columns:
+                # Stores created before the byte budget existed.
+                conn.execute("ALTER TABLE jobs ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_expires_at ON jobs (expires_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def set(self, job_id: str, record: dict):
+        size = self._record_size(record)
+        with self._connect() as conn:
+            row = conn.execute("SELECT blob_id FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, record, blob_id, size, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, json.dumps(record, default=str), record.get("blob_id"), size,
+                 time.time() + self.ttl_seconds)
+            )
+            evicted = self._evict_over_budget(conn, job_id)
+        if row and row[0] and row[0] != record.get("blob_id"):
+            self.blobs.delete(row[0])
+        for (blob_id,) in evicted:
+            if blob_id:
+                self.blobs.delete(blob_id)
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY_WRITES == 0:
+            self.purge_expired()
+
+    def _evict_over_budget(self, conn, keep_job_id: str) -> list:
+        """Deletes the oldest jobs (never `keep_job_id`) until the table fits the budget; returns their blob ids."""
+        total_bytes, entries = conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM jobs").fetchone()
+        if total_bytes <= self.max_bytes and entries <= self.max_entries:
+            return []
+        evicted = []
+        for job_id, blob_id, size in conn.execute(
+            "SELECT job_id, blob_id, size FROM jobs WHERE job_id != ? ORDER BY expires_at", (keep_job_id,)
+        ).fetchall():
+            if total_bytes <= self.max_bytes and entries <= self.max_entries:
+                break
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            evicted.append((blob_id,))
+            total_bytes -= size
+            entries -= 1
+        return evicted
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT record, expires_at FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        if row[1] < time.time():
+            self.delete(job_id)
+            return None
+        return json.loads(row[0])
+
+    def delete(self, job_id: str):
+        with self._connect() as conn:
+            row = conn.execute("SELECT blob_id FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        if row and row[0]:
+            self.blobs.delete(row[0])
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute("SELECT blob_id FROM jobs WHERE expires_at < ?", (now,)).fetchall()
+            conn.execute("DELETE FROM jobs WHERE expires_at < ?", (now,))
+        for (blob_id,) in rows:
+            if blob_id:
+                self.blobs.delete(blob_id)
+        return len(rows)
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            entries, total_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM jobs").fetchone()
+        return {
+            "backend": "sqlite",
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "path": self.path,
+        }
+
+
+def create_job_store(backend: str = JOB_STORE_BACKEND) -> JobStore:
+    """Builds the configured job store."""
+    blobs = BlobStore(JOB_BLOB_DIR)
+    if backend == "memory":
+        return MemoryJobStore(blobs, ttl_seconds=JOB_TTL_SECONDS,
+                              max_bytes=JOB_STORE_MAX_BYTES, max_entries=JOB_STORE_MAX_ENTRIES)
+    if backend == "sqlite":
+        return SQLiteJobStore(JOB_STORE_PATH, blobs, ttl_seconds=JOB_TTL_SECONDS,
+                              max_bytes=JOB_STORE_MAX_BYTES, max_entries=JOB_STORE_MAX_ENTRIES)
+    raise ValueError(f"Unknown job store backend: {backend}")
@@ -1,67 +1,162 @@
 # backend/app/services/nlp_service.py
 
-import spacy
+import os
+import time
+
 from ..models import IssueTypeEnum
 
+# --- Configuration ---
+NLP_MODEL = os.getenv("NLP_MODEL", "en_core_web_sm")
+NLP_PRELOAD_MODELS = [name.strip() for name in os.getenv("NLP_PRELOAD_MODELS", NLP_MODEL).split(",") if name.strip()]
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "256"))
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+# Only NER (and the tokenizer) is used; the rest of the pipeline is skipped.
+# The lemmatizer depends on tagger/attribute_ruler, so those go too.
+_UNUSED_COMPONENTS = ["parser", "lemmatizer", "tagger", "attribute_ruler", "senter"]
+LOCATION_LABELS = {"GPE", "LOC", "FAC"}  # GPE=City/Country, LOC=Non-GPE locations, FAC=Buildings/Airports
+
 # --- Model Cache ---
-# This pattern ensures the model is loaded only once, improving performance.
+# Models are loaded once at startup (see `load_models`, called from the app lifespan),
+# never downloaded while serving a request.
 _nlp_cache = {}
+model_load_seconds = {}
 
-def _load_nlp_model():
-    """Loads the spaCy model into a global cache if it's not already there."""
-    if "model" not in _nlp_cache:
+class NLPModelUnavailable(Exception):
+    """Raised when the spaCy model is not installed in this environment."""
+
+def _load_model(name: str):
+    try:
+        import spacy
+    except ImportError:
+        raise NLPModelUnavailable("spaCy is not installed; run `pip install spacy`.")
+    started = time.perf_counter()
+    try:
+        # Components we never run aren't even deserialised, which also makes boot faster.
+        model = spacy.load(name, exclude=_UNUSED_COMPONENTS)
+    except OSError:
+        raise NLPModelUnavailable(
+            f"spaCy model '{name}' is not installed; run `python -m spacy download {name}`."
+        )
+    model_load_seconds[name] = round(time.perf_counter() - started, 3)
+    _nlp_cache[name] = model
+    return model
+
+def load_models(names: list = None):
+    """Preloads the given spaCy models (default: NLP_PRELOAD_MODELS), logging each load time."""
+    for name in names if names is not None else NLP_PRELOAD_MODELS:
+        if name in _nlp_cache:
+            continue
         try:
-            _nlp_cache["model"] = spacy.load("en_core_web_sm")
-        except OSError:
-            print("Downloading spaCy model 'en_core_web_sm'...")
-            from spacy.cli import download
-            download("en_core_web_sm")
-            _nlp_cache["model"] = spacy.load("en_core_web_sm")
-    return _nlp_cache["model"]
+            _load_model(name)
+            print(
+                f"[INFO] Loaded spaCy model '{name}' in {model_load_seconds[name]:.2f}s "
+                f"(excluded: {', '.join(_UNUSED_COMPONENTS)}; running: {', '.join(_nlp_cache[name].pipe_names)})"
+            )
+        except NLPModelUnavailable as e:
+            print(f"[ERROR] {e}")
+
+def _load_nlp_model():
+    """Returns the cached NLP_MODEL, loading it (without downloading) if it wasn't preloaded."""
+    model = _nlp_cache.get(NLP_MODEL)
+    if model is None:
+        model = _load_model(NLP_MODEL)
+        print(f"[INFO] Loaded spaCy model '{NLP_MODEL}' on demand in {model_load_seconds[NLP_MODEL]:.2f}s")
+    return model
 
 # --- Keyword Definitions ---
-# More specific keywords for better accuracy
+# More specific keywords for better accuracy. Matching is on lowercased tokens; the
+# lemmatizer is excluded, so inflections of each keyword's last word ("dump" ->
+# "dumps", "dumped", "dumping") are generated up front instead.
 ISSUE_KEYWORDS = {
     IssueTypeEnum.pothole: ["pothole", "crater", "road is broken"],
-    IssueTypeEnum.garbage_piles: ["garbage", "trash", "dump", "waste", "overflowing bin", "garbage piles"],
-    IssueTypeEnum.street_flooding: ["water leak", "pipe burst", "flooding", "water logging", "sewage", "street flooding"],
+    IssueTypeEnum.garbage_piles: ["garbage", "trash", "dump", "waste", "overflowing bin", "garbage pile"],
+    IssueTypeEnum.street_flooding: ["water leak", "pipe burst", "flood", "water logging", "sewage", "street flooding"],
     IssueTypeEnum.illegal_parking: ["illegal parking", "wrong parking", "parked illegally"],
-    IssueTypeEnum.debris: ["debris", "rubble", "construction waste", "fallen objects"],
+    IssueTypeEnum.debris: ["debris", "rubble", "construction waste", "fallen object"],
 }
 
-def analyze_report_text(text: str) -> dict:
+def _inflections(word: str) -> set:
+    """Crude English inflections; over-generating is harmless since only real words occur in text."""
+    forms = {word, word + "s", word + "es", word + "ed", word + "ing"}
+    if word.endswith("e"):
+        forms |= {word + "d", word[:-1] + "ing"}
+    if word.endswith("y"):
+        forms |= {word[:-1] + "ies", word[:-1] + "ied"}
+    return forms
+
+def _build_keyword_index() -> dict:
+    """Maps every keyword form, as a tuple of tokens, to (issue_type, keyword)."""
+    index = {}
+    for issue_type, keywords in ISSUE_KEYWORDS.items():
+        for keyword in keywords:
+            *head, last = keyword.split()
+            for form in _inflections(last):
+                index.setdefault((*head, form), (issue_type, keyword))
+    return index
+
+_KEYWORD_INDEX = _build_keyword_index()
+_MAX_KEYWORD_TOKENS = max(len(form) for form in _KEYWORD_INDEX)
+
+def match_keywords(tokens: list) -> set:
     """
-    Analyzes unstructured text to extract the most likely issue type and location.
+    (issue_type, keyword) pairs found in a sequence of lowercased tokens, in one
+    pass of hash lookups over every n-gram up to the longest keyword.
     """
-    nlp = _load_nlp_model()
-    doc = nlp(text.lower()) # Process text in lowercase for easier matching
+    found = set()
+    for start in range(len(tokens)):
+        for end in range(start + 1, min(start + _MAX_KEYWORD_TOKENS, len(tokens)) + 1):
+            match = _KEYWORD_INDEX.get(tuple(tokens[start:end]))
+            if match:
+                found.add(match)
+    return found
 
+def _analyze_doc(doc) -> dict:
     # --- Extract Location using NER ---
     address = "Unknown Location"
     for ent in doc.ents:
-        if ent.label_ in ["GPE", "LOC", "FAC"]: # GPE=City/Country, LOC=Non-GPE locations, FAC=Buildings/Airports
+        if ent.label_ in LOCATION_LABELS:
             address = ent.text.title() # Capitalize the location nicely
             break
 
     # --- Determine Best Issue Type using a Scoring System ---
+    # Each distinct keyword found (in any of its forms) scores one point for its issue type.
     scores = {issue_type: 0 for issue_type in ISSUE_KEYWORDS}
-    
-    for issue_type, keywords in ISSUE_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text.lower():
-                scores[issue_type] += 1
-    
-    # Find the issue type with the highest score
-    if any(score > 0 for score in scores.values()):
-        best_issue_type = max(scores, key=scores.get)
-    else:
-        best_issue_type = IssueTypeEnum.other
+    for issue_type, _ in match_keywords([token.lower_ for token in doc]):
+        scores[issue_type] += 1
+
+    # Find the issue type with the highest score (None when no keyword matched)
+    best_issue_type = max(scores, key=scores.get) if any(scores.values()) else None
 
     # --- Generate a Title ---
-    title = f"{best_issue_type.value.replace('_', ' ').title()} reported near {address}"
+    kind = best_issue_type.value.replace('_', ' ').title() if best_issue_type else "Issue"
+    title = f"{kind} reported near {address}"
 
     return {
         "issue_type": best_issue_type,
         "address": address,
         "title": title,
-    }
\ No newline at end of file
+    }
+
+def analyze_report_texts(texts: list, batch_size: int = None, n_process: int = None) -> list:
+    """
+    Batch version of `analyze_report_text`: runs the texts through `nlp.pipe`
+    (tokenizer and NER only; the rest is excluded at load). Returns one result
+    dict per text, in order.
+    """
+    nlp = _load_nlp_model()
+    batch_size = batch_size or NLP_BATCH_SIZE
+    # Worker processes only pay off once there is more than one batch to share out.
+    n_process = n_process or (NLP_N_PROCESS if len(texts) > batch_size else 1)
+    docs = nlp.pipe(
+        (text.lower() for text in texts), # Process text in lowercase for easier matching
+        batch_size=batch_size,
+        n_process=n_process,
+    )
+    return [_analyze_doc(doc) for doc in docs]
+
+def analyze_report_text(text: str) -> dict:
+    """
+    Analyzes unstructured text to extract the most likely issue type and location.
+    issue_type is None when the text mentions no known issue keyword.
+    """
+    return analyze_report_texts([text], n_process=1)[0]
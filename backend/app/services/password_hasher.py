@@ -0,0 +1,114 @@
+# backend/app/services/password_hasher.py
+
+import os
+import asyncio
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+
+# --- Configuration ---
+# Each +1 doubles the cost of a hash/verify. Stored hashes with a different cost
+# are upgraded (or downgraded) the next time their owner logs in.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# bcrypt releases the GIL, so each worker can keep one core busy.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+PASSWORD_HASH_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "2"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when more password checks are waiting than the hasher admits."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hasher is busy.")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in its own small thread pool, so a login burst queues here
+    instead of occupying the threadpool that serves every other sync route.
+    Work beyond `max_workers + max_queue` is rejected rather than queued forever.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int = 4, max_queue: int = 64,
+                 retry_after: int = 2):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._pool = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._rehashed = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    async def _run(self, fn, *args):
+        pool = self._get_pool()
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise PasswordHasherBusy(self.retry_after)
+            self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, partial(fn, *args))
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple:
+        """
+        Returns (valid, new_hash). new_hash is set when the stored hash was made
+        with a different cost than BCRYPT_ROUNDS and should replace it.
+        """
+        valid, new_hash = await self._run(self.context.verify_and_update, password, hashed_password)
+        if new_hash:
+            with self._lock:
+                self._rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> dict:
+        return {
+            "rounds": self.context.to_dict().get("bcrypt__rounds"),
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "capacity": self.capacity,
+            "rejected": self._rejected,
+            "rehashed": self._rehashed,
+        }
+
+
+# --- Shared Instance ---
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_queue=PASSWORD_HASH_MAX_QUEUE,
+    retry_after=PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,194 @@
+# backend/app/services/prediction_cache.py
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from typing import Optional
+
+from .ttl_cache import TTLCache
+
+# --- Configuration ---
+PREDICTION_CACHE_DIR = os.getenv("PREDICTION_CACHE_DIR", "storage/prediction_cache")
+PREDICTION_CACHE_MEMORY_ENTRIES = int(os.getenv("PREDICTION_CACHE_MEMORY_ENTRIES", "256"))
+PREDICTION_CACHE_DISK_ENTRIES = int(os.getenv("PREDICTION_CACHE_DISK_ENTRIES", "20000"))
+
+
+def model_fingerprint(model_path: str, settings: dict = None) -> str:
+    """
+    Short hash of the model weights plus any prediction settings (thresholds,
+    image size...), so cached results never outlive the model that produced them.
+    """
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    digest.update(json.dumps(settings or {}, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+class PredictionCache:
+    """
+    Image predictions (detections, plus the annotated JPEG when one was drawn)
+    keyed by the SHA-256 of the uploaded bytes. A small in-process LRU sits in front of files under
+    `<directory>/<model fingerprint>/`. Switching fingerprints (see `set_model`)
+    drops everything produced by other models.
+    """
+
+    # The disk tier is trimmed every this many writes rather than on every insert.
+    TRIM_EVERY_WRITES = 100
+
+    def __init__(self, directory: str = None, memory_entries: int = 256, disk_entries: int = 20000):
+        self.directory = directory
+        self.disk_entries = disk_entries
+        self.fingerprint = None
+        self._memory = TTLCache(float("inf"), maxsize=memory_entries, name="predictions")
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def set_model(self, fingerprint: str):
+        """Called after loading a model; cached results from any other model are discarded."""
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            self.fingerprint = fingerprint
+            self._memory.invalidate()
+        if self.directory and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name != fingerprint:
+                    shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _model_dir(self) -> Optional[str]:
+        if not self.directory or not self.fingerprint:
+            return None
+        return os.path.join(self.directory, self.fingerprint)
+
+    @staticmethod
+    def key_for(image_bytes: bytes) -> str:
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    def image_id(self, image_bytes: bytes) -> Optional[str]:
+        """Public id of the cached annotated image for these bytes; includes the model, so it never changes."""
+        if self.fingerprint is None:
+            return None
+        return f"{self.fingerprint}-{self.key_for(image_bytes)}"
+
+    def image_path(self, image_id: str) -> Optional[str]:
+        """File holding the annotated JPEG for an `image_id`, if it is (still) on disk."""
+        fingerprint, _, key = image_id.partition("-")
+        model_dir = self._model_dir()
+        if not model_dir or fingerprint != self.fingerprint:
+            return None
+        path = os.path.join(model_dir, os.path.basename(key) + ".jpg")
+        return path if os.path.exists(path) else None
+
+    def get(self, image_bytes: bytes, annotated: bool = True) -> Optional[tuple]:
+        """
+        Returns (detections, annotated_image_bytes) for these exact bytes, or None.
+        The image is None for detections-only results; with annotated=True those
+        count as misses.
+        """
+        if self.fingerprint is None:
+            return None
+        key = self.key_for(image_bytes)
+        result = self._memory.get(key)
+        if result is None or (annotated and result[1] is None):
+            # Another process may have stored the annotated image since.
+            from_disk = self._read(key)
+            if from_disk is not None and (result is None or from_disk[1] is not None):
+                self.disk_hits += 1
+                self._memory.set(key, from_disk)
+                result = from_disk
+        if result is not None and annotated and result[1] is None:
+            result = None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, image_bytes: bytes, detections: list, annotated_image_bytes: Optional[bytes]):
+        """Stores a result; annotated_image_bytes is None for detections-only predictions."""
+        if self.fingerprint is None:
+            return
+        key = self.key_for(image_bytes)
+        self._memory.set(key, (detections, annotated_image_bytes))
+        model_dir = self._model_dir()
+        if not model_dir:
+            return
+        os.makedirs(model_dir, exist_ok=True)
+        base = os.path.join(model_dir, key)
+        suffix = f".{threading.get_ident()}.tmp"
+        # The image goes first: a result only counts as cached once its .json exists.
+        if annotated_image_bytes is not None:
+            with open(base + ".jpg" + suffix, "wb") as f:
+                f.write(annotated_image_bytes)
+            os.replace(base + ".jpg" + suffix, base + ".jpg")
+        with open(base + ".json" + suffix, "w", encoding="utf-8") as f:
+            json.dump(detections, f)
+        os.replace(base + ".json" + suffix, base + ".json")
+        with self._lock:
+            self._writes += 1
+            trim = self._writes % self.TRIM_EVERY_WRITES == 0
+        if trim:
+            self.trim()
+
+    def _read(self, key: str) -> Optional[tuple]:
+        model_dir = self._model_dir()
+        if not model_dir:
+            return None
+        base = os.path.join(model_dir, key)
+        try:
+            with open(base + ".json", encoding="utf-8") as f:
+                detections = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        try:
+            with open(base + ".jpg", "rb") as f:
+                return detections, f.read()
+        except FileNotFoundError:
+            return detections, None
+
+    def trim(self):
+        """Deletes the oldest results beyond `disk_entries`."""
+        model_dir = self._model_dir()
+        if not model_dir or not os.path.isdir(model_dir):
+            return
+        entries = []
+        for entry in os.scandir(model_dir):
+            if entry.name.endswith(".json"):
+                try:
+                    entries.append((entry.stat().st_mtime, entry.name[:-len(".json")]))
+                except FileNotFoundError:
+                    pass
+        entries.sort(reverse=True)
+        for _, key in entries[self.disk_entries:]:
+            for ext in (".json", ".jpg"):
+                try:
+                    os.remove(os.path.join(model_dir, key + ext))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.fingerprint,
+            "memory_entries": self._memory.stats()["entries"],
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+# --- Shared Instance ---
+prediction_cache = PredictionCache(
+    PREDICTION_CACHE_DIR,
+    memory_entries=PREDICTION_CACHE_MEMORY_ENTRIES,
+    disk_entries=PREDICTION_CACHE_DISK_ENTRIES,
+)
@@ -0,0 +1,156 @@
+# backend/app/services/rollups.py
+
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import text, func
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..database import SessionLocal
+
+# --- Configuration ---
+ROLLUP_REFRESH_SECONDS = float(os.getenv("ROLLUP_REFRESH_SECONDS", "60"))
+# Incremental refreshes can't see hard-deleted issues, so the table is also
+# rebuilt from scratch this often.
+ROLLUP_FULL_REBUILD_SECONDS = float(os.getenv("ROLLUP_FULL_REBUILD_SECONDS", "3600"))
+# Rows updated slightly before the previous refresh started are re-read, so a
+# transaction committing during a refresh is never missed.
+_WATERMARK_OVERLAP = timedelta(seconds=5)
+
+# pg advisory lock id shared by every process that rewrites issue_daily_rollups.
+ROLLUP_LOCK_KEY = 7_310_243_117
+
+_ROLLUP_SELECT = """
+    SELECT CAST(detected_at AS date) AS day,
+           CASE WHEN status = 'resolved' THEN CAST(resolved_at AS date) END AS resolved_day,
+           issue_type, status, priority, department,
+           COALESCE(address, '') AS area,
+           count(*) AS issue_count,
+           COALESCE(sum(EXTRACT(epoch FROM resolved_at - detected_at))
+                    FILTER (WHERE status = 'resolved' AND resolved_at IS NOT NULL), 0) AS resolution_seconds_sum,
+           timezone('utc', now()) AS refreshed_at
+    FROM infrastructure_issues
+    WHERE detected_at IS NOT NULL {where}
+    GROUP BY 1, 2, 3, 4, 5, 6, 7
+"""
+
+_ROLLUP_INSERT = """
+    INSERT INTO issue_daily_rollups
+        (day, resolved_day, issue_type, status, priority, department, area,
+         issue_count, resolution_seconds_sum, refreshed_at)
+"""
+
+
+def lock_rollups(db: Session, wait: bool = True) -> bool:
+    """
+    Takes the rollup advisory lock for the rest of the caller's transaction, so
+    refreshes from several workers never interleave their DELETE and INSERT.
+    With wait=False, returns False instead of blocking if another session has it.
+    """
+    if wait:
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY})
+        return True
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY}).scalar())
+
+
+def rebuild_all(db: Session) -> int:
+    """Recomputes the whole rollup table. Used on first start, periodically, and after a schema change."""
+    lock_rollups(db)
+    db.execute(text("DELETE FROM issue_daily_rollups"))
+    result = db.execute(text(_ROLLUP_INSERT + _ROLLUP_SELECT.format(where="")))
+    db.commit()
+    return result.rowcount
+
+
+def refresh_since(db: Session, since: datetime) -> int:
+    """
+    Recomputes only the detection days that contain an issue inserted or changed
+    since `since` (found through the updated_at index). Returns the number of days.
+    Hard-deleted issues are only dropped from the rollups by the next full rebuild.
+    """
+    lock_rollups(db)
+    days = [row[0] for row in db.execute(text(
+        "SELECT DISTINCT CAST(detected_at AS date) FROM infrastructure_issues "
+        "WHERE updated_at >= :since AND detected_at IS NOT NULL"
+    ), {"since": since})]
+    if not days:
+        return 0
+    db.execute(text("DELETE FROM issue_daily_rollups WHERE day = ANY(:days)"), {"days": days})
+    db.execute(
+        text(_ROLLUP_INSERT + _ROLLUP_SELECT.format(
+            where="AND detected_at >= :first_day AND detected_at < :last_day "
+                  "AND CAST(detected_at AS date) = ANY(:days)"
+        )),
+        {"days": days, "first_day": min(days), "last_day": max(days) + timedelta(days=1)}
+    )
+    db.commit()
+    return len(days)
+
+
+class RollupRefresher:
+    """
+    Keeps issue_daily_rollups current from a background thread. Every worker
+    process runs one; a round is skipped when another process holds the rollup
+    lock, since that refresh covers the same changes.
+    """
+
+    def __init__(self, interval: float = ROLLUP_REFRESH_SECONDS, session_factory=SessionLocal,
+                 full_rebuild_interval: float = ROLLUP_FULL_REBUILD_SECONDS):
+        self.interval = interval
+        self.full_rebuild_interval = full_rebuild_interval
+        self.session_factory = session_factory
+        self._last_full_rebuild = time.monotonic()
+        self._stop_event = threading.Event()
+        self._worker = None
+        self._watermark = None
+        self.last_refresh_seconds = None
+        self.last_refreshed_at = None
+
+    def start(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="rollup-refresher", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop_event.set()
+        if self._worker:
+            self._worker.join(timeout=timeout)
+
+    def refresh(self):
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            if not lock_rollups(db, wait=False):
+                return  # another worker is refreshing right now
+            if self._watermark is None:
+                # Resume from the last refresh that made it into the table, if any.
+                self._watermark = db.query(func.max(models.IssueDailyRollup.refreshed_at)).scalar()
+            if self._watermark is None or time.monotonic() - self._last_full_rebuild >= self.full_rebuild_interval:
+                rows = rebuild_all(db)
+                self._last_full_rebuild = time.monotonic()
+                print(f"[INFO] Rebuilt issue rollups ({rows} rows).")
+            else:
+                refresh_since(db, self._watermark - _WATERMARK_OVERLAP)
+            self._watermark = started_at
+        except Exception as e:
+            db.rollback()
+            print(f"[ERROR] Issue rollup refresh failed: {e}")
+        finally:
+            db.close()
+        self.last_refresh_seconds = round(time.perf_counter() - started, 3)
+        self.last_refreshed_at = started_at
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.refresh()
+            self._stop_event.wait(self.interval)
+
+
+# --- Shared Instance ---
+rollup_refresher = RollupRefresher()
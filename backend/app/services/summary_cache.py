@@ -0,0 +1,147 @@
+# backend/app/services/summary_cache.py
+
+import os
+import time
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+from .ttl_cache import TTLCache
+
+# --- Configuration ---
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "storage/summaries.sqlite3")
+SUMMARY_CACHE_MEMORY_ENTRIES = int(os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", "2048"))
+SUMMARY_CACHE_MAX_ROWS = int(os.getenv("SUMMARY_CACHE_MAX_ROWS", "100000"))
+
+
+def detection_signature(detections: list) -> str:
+    """
+    Canonical key for a set of detections: sorted class counts, e.g.
+    "garbage_piles:1|pothole:2". The summary prompt depends on nothing else.
+    """
+    counts = Counter(d["class_name"] for d in detections)
+    return "|".join(f"{name}:{count}" for name, count in sorted(counts.items()))
+
+
+def template_summary(signature: str) -> str:
+    """Local stand-in for the model's summary, used when the upstream can't answer in time."""
+    parts = []
+    for item in signature.split("|"):
+        name, count = item.rsplit(":", 1)
+        label = name.replace("_", " ")
+        if int(count) > 1 and not label.endswith("s"):
+            label += "s"
+        parts.append(f"{count} {label}")
+    listed = parts[0] if len(parts) == 1 else ", ".join(parts[:-1]) + f" and {parts[-1]}"
+    return (
+        f"An AI camera in Chennai detected {listed}. "
+        "These issues could pose risks to public safety and traffic flow and should be addressed promptly."
+    )
+
+
+class SummaryCache:
+    """
+    Summaries by detection signature: an in-process LRU in front of a SQLite
+    table, so they survive restarts and are shared by workers on the same host.
+    Entries never expire; the table is trimmed to `max_rows`, oldest first.
+
+    `get`, `put` and `trim` may touch the database and block; async callers use
+    `peek` for the memory tier and run the rest in a thread.
+    """
+
+    # The table is trimmed every this many writes rather than on every insert.
+    TRIM_EVERY_WRITES = 100
+
+    def __init__(self, path: str = None, memory_entries: int = 2048, max_rows: int = 100000):
+        self.path = path
+        self.max_rows = max_rows
+        self._memory = TTLCache(float("inf"), maxsize=memory_entries, name="ai_summaries")
+        self._writes = 0
+        self.disk_hits = 0
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _init_db(self):
+        """Creates the database on first use, so importing this module has no side effects."""
+        with self._init_lock:
+            if self._initialized:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+                with conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS summaries ("
+                        " signature TEXT PRIMARY KEY,"
+                        " summary TEXT NOT NULL,"
+                        " created_at REAL NOT NULL)"
+                    )
+            finally:
+                conn.close()
+            self._initialized = True
+
+    @contextmanager
+    def _connect(self):
+        if not self._initialized:
+            self._init_db()
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def peek(self, signature: str) -> Optional[str]:
+        """Memory tier only; never blocks."""
+        return self._memory.get(signature)
+
+    def get(self, signature: str) -> Optional[str]:
+        summary = self._memory.get(signature)
+        if summary is not None or not self.path:
+            return summary
+        with self._connect() as conn:
+            row = conn.execute("SELECT summary FROM summaries WHERE signature = ?", (signature,)).fetchone()
+        if row is None:
+            return None
+        self.disk_hits += 1
+        self._memory.set(signature, row[0])
+        return row[0]
+
+    def put(self, signature: str, summary: str):
+        self._memory.set(signature, summary)
+        if not self.path:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO summaries (signature, summary, created_at) VALUES (?, ?, ?)",
+                (signature, summary, time.time())
+            )
+        self._writes += 1
+        if self._writes % self.TRIM_EVERY_WRITES == 0:
+            self.trim()
+
+    def trim(self):
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM summaries WHERE signature NOT IN "
+                "(SELECT signature FROM summaries ORDER BY created_at DESC LIMIT ?)",
+                (self.max_rows,)
+            )
+
+    def stats(self) -> dict:
+        stats = self._memory.stats()
+        stats.pop("ttl_seconds")  # always infinite, and not valid JSON
+        return {**stats, "disk_hits": self.disk_hits}
+
+
+# --- Shared Instance ---
+summary_cache = SummaryCache(
+    SUMMARY_CACHE_PATH,
+    memory_entries=SUMMARY_CACHE_MEMORY_ENTRIES,
+    max_rows=SUMMARY_CACHE_MAX_ROWS,
+)
@@ -0,0 +1,226 @@
+# backend/app/services/summary_client.py
+
+import os
+import time
+import asyncio
+import threading
+from typing import Optional
+
+import httpx
+
+from .inference_executor import inference_executor
+from .summary_cache import SummaryCache, summary_cache, detection_signature, template_summary
+
+# --- Configuration ---
+SUMMARY_MODEL_URL = os.getenv(
+    "SUMMARY_MODEL_URL", "https://api-inference.huggingface.co/models/facebook/bart-large-cnn"
+)
+# Hard cap on how long a prediction waits for the model; past it a template summary is used.
+SUMMARY_LATENCY_BUDGET_SECONDS = float(os.getenv("SUMMARY_LATENCY_BUDGET_SECONDS", "3.0"))
+SUMMARY_POOL_SIZE = int(os.getenv("SUMMARY_POOL_SIZE", "20"))
+SUMMARY_BREAKER_FAILURES = int(os.getenv("SUMMARY_BREAKER_FAILURES", "3"))
+SUMMARY_BREAKER_COOLDOWN_SECONDS = float(os.getenv("SUMMARY_BREAKER_COOLDOWN_SECONDS", "30"))
+
+
+def summary_prompt(detections: list) -> str:
+    """Text sent to the summarization model; depends only on the detection signature."""
+    detection_names = sorted(d["class_name"].replace("_", " ") for d in detections)
+    return (
+        f"The following infrastructure issues were detected by an AI camera in Chennai: "
+        f"{', '.join(detection_names)}. These issues could pose risks to public safety and traffic flow. "
+        "A report should be generated to address these findings promptly."
+    )
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures (or immediately, for a
+    known cooldown such as a model that is still loading). While open, calls are
+    short-circuited; after the cooldown a single probe is let through.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._failures < self.failure_threshold and not self._open_until:
+            return "closed"
+        return "open" if self.clock() < self._open_until else "half_open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """Gives the half-open probe slot back when a call ends without an outcome (e.g. cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self, cooldown: float = None):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if cooldown is not None or self._failures >= self.failure_threshold:
+                self._open_until = self.clock() + (self.cooldown if cooldown is None else cooldown)
+
+
+class SummaryClient:
+    """
+    Calls the Hugging Face summarization endpoint over one shared, keep-alive
+    `httpx.AsyncClient`. Each call gets `latency_budget` seconds in total; on
+    timeout, upstream errors or an open circuit, `summarize` returns None.
+
+    `get_summary` is what request handlers use: it answers from `cache` by
+    detection signature, and falls back to a local template when the upstream
+    has no answer. Cache lookups that reach disk go through `run_io` (a thread
+    by default) so they never block the event loop.
+    """
+
+    def __init__(self, url: str, token: str = None, latency_budget: float = 3.0, pool_size: int = 20,
+                 breaker: CircuitBreaker = None, cache: SummaryCache = None, run_io=None):
+        self.url = url
+        self.token = token
+        self.latency_budget = latency_budget
+        self.pool_size = pool_size
+        self.breaker = breaker or CircuitBreaker()
+        self.cache = cache
+        self.run_io = run_io or asyncio.to_thread
+        self._client = None
+        self.template_fallbacks = 0
+        self.calls = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.short_circuited = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            self._client = httpx.AsyncClient(limits=limits, timeout=self.latency_budget)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, token: str, text: str) -> Optional[str]:
+        response = await self._get_client().post(
+            self.url, headers={"Authorization": f"Bearer {token}"}, json={"inputs": text}
+        )
+        if response.status_code == 503:
+            # The model is cold; HF says roughly how long it needs.
+            body = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+            self.breaker.record_failure(cooldown=float(body.get("estimated_time") or self.breaker.cooldown))
+            print(f"[HUGGING FACE API ERROR] Summary model unavailable: {body.get('error', response.text)}")
+            return None
+        response.raise_for_status()
+        result = response.json()
+        # Summarization models typically return [{'summary_text': ...}]
+        if (result and isinstance(result, list) and isinstance(result[0], dict)
+                and isinstance(result[0].get("summary_text"), str)):
+            self.breaker.record_success()
+            return result[0]["summary_text"].strip()
+        self.breaker.record_failure()
+        print(f"[HUGGING FACE API WARNING] Unexpected response format: {result}")
+        return None
+
+    def _token(self) -> Optional[str]:
+        return self.token or os.getenv("HUGGINGFACE_API_TOKEN")
+
+    async def get_summary(self, detections: list) -> str:
+        """Cached summary for these detections, else the model's, else a template."""
+        if not detections:
+            return "No issues were detected in the image."
+        signature = detection_signature(detections)
+        summary = None
+        if self.cache:
+            summary = self.cache.peek(signature)
+            if summary is None:
+                summary = await self.run_io(self.cache.get, signature)
+        if summary is not None:
+            return summary
+        summary = await self.summarize(detections) if self._token() else None
+        if summary is None:
+            self.template_fallbacks += 1
+            return template_summary(signature)
+        if self.cache:
+            await self.run_io(self.cache.put, signature, summary)
+        return summary
+
+    async def summarize(self, detections: list) -> Optional[str]:
+        token = self._token()
+        if not token:
+            return "Could not generate summary: Hugging Face API token not set."
+        if not detections:
+            return "No issues were detected in the image."
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            return None
+
+        self.calls += 1
+        try:
+            summary = await asyncio.wait_for(self._request(token, summary_prompt(detections)), self.latency_budget)
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            # httpx's own timeout (set to the same budget) can fire first.
+            self.timed_out += 1
+            self.breaker.record_failure()
+            print(f"[HUGGING FACE API ERROR] Summary exceeded the {self.latency_budget}s budget.")
+            return None
+        except (httpx.HTTPError, ValueError) as e:
+            self.failed += 1
+            self.breaker.record_failure()
+            print(f"[HUGGING FACE API ERROR] An error occurred: {e}")
+            return None
+        except BaseException:
+            # Cancelled (client gone, shutdown): no verdict on the upstream, but a
+            # half-open probe must not stay claimed or the circuit never closes.
+            self.breaker.release_probe()
+            raise
+        if summary is not None:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        return summary
+
+    def stats(self) -> dict:
+        return {
+            "circuit": self.breaker.state,
+            "calls": self.calls,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "short_circuited": self.short_circuited,
+            "template_fallbacks": self.template_fallbacks,
+            "cache": self.cache.stats() if self.cache else None,
+        }
+
+
+# --- Shared Instance ---
+summary_client = SummaryClient(
+    SUMMARY_MODEL_URL,
+    latency_budget=SUMMARY_LATENCY_BUDGET_SECONDS,
+    pool_size=SUMMARY_POOL_SIZE,
+    breaker=CircuitBreaker(SUMMARY_BREAKER_FAILURES, SUMMARY_BREAKER_COOLDOWN_SECONDS),
+    cache=summary_cache,
+    run_io=inference_executor.run_io,
+)
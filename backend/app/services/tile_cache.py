@@ -0,0 +1,158 @@
+# backend/app/services/tile_cache.py
+
+import os
+import math
+import time
+import shutil
+import threading
+
+from .ttl_cache import TTLCache
+
+# --- Configuration ---
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", "storage/tiles")
+TILE_CACHE_MEMORY_TILES = int(os.getenv("TILE_CACHE_MEMORY_TILES", "2048"))
+# Other worker processes only see invalidations through the disk tier, so the
+# memory tier also expires on its own.
+TILE_CACHE_MEMORY_TTL_SECONDS = float(os.getenv("TILE_CACHE_MEMORY_TTL_SECONDS", "60"))
+# Disk tiles are re-rendered after this long even if nothing invalidated them. This
+# bounds how long a tile rendered by one worker just before another worker's insert
+# (and written after that worker's invalidation) can stay stale.
+TILE_CACHE_DISK_TTL_SECONDS = float(os.getenv("TILE_CACHE_DISK_TTL_SECONDS", "600"))
+TILE_MAX_ZOOM = int(os.getenv("TILE_MAX_ZOOM", "20"))
+
+
+def tile_for(lon: float, lat: float, z: int) -> tuple:
+    """Web Mercator (slippy map) tile containing a WGS84 point at zoom z."""
+    n = 2 ** z
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = int((lon + 180.0) / 360.0 * n)
+    lat_rad = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_for_points(points, max_zoom: int) -> set:
+    """Every (z, x, y) tile, zoom 0..max_zoom, containing any of these (lon, lat) points."""
+    tiles = set()
+    for lon, lat in points:
+        if lon is None or lat is None:
+            continue
+        for z in range(max_zoom + 1):
+            tiles.add((z, *tile_for(float(lon), float(lat), z)))
+    return tiles
+
+
+class TileCache:
+    """
+    Two-tier cache for rendered vector tiles: a small in-process LRU in front of
+    `<directory>/<z>/<x>/<y>.mvt` files. Tiles are dropped when an issue inside
+    them changes (see `invalidate_points`) and expire on disk after `disk_ttl`.
+
+    Renderers take a `generation()` before querying and pass it to `put`; a tile
+    invalidated after that point is not stored, since it may predate the change.
+    """
+
+    # How long an invalidation is remembered for `put`; longer than any tile render.
+    INVALIDATION_MEMORY_SECONDS = 300
+    INVALIDATION_MEMORY_TILES = 200_000
+
+    def __init__(self, directory: str = None, memory_tiles: int = 2048, memory_ttl: float = 60.0,
+                 max_zoom: int = 20, disk_ttl: float = 600.0):
+        self.directory = directory
+        self.max_zoom = max_zoom
+        self.disk_ttl = disk_ttl
+        self._memory = TTLCache(memory_ttl, maxsize=memory_tiles, name="map_tiles")
+        # (z, x, y) -> generation at which the tile was last invalidated
+        self._invalidated = TTLCache(self.INVALIDATION_MEMORY_SECONDS, maxsize=self.INVALIDATION_MEMORY_TILES)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stale_puts = 0
+        self.disk_hits = 0
+        self.invalidations = 0
+
+    def _path(self, z: int, x: int, y: int) -> str:
+        return os.path.join(self.directory, str(z), str(x), f"{y}.mvt")
+
+    def get(self, z: int, x: int, y: int):
+        tile = self._memory.get((z, x, y))
+        if tile is not None or not self.directory:
+            return tile
+        try:
+            with open(self._path(z, x, y), "rb") as f:
+                if time.time() - os.fstat(f.fileno()).st_mtime > self.disk_ttl:
+                    return None
+                tile = f.read()
+        except FileNotFoundError:
+            return None
+        self.disk_hits += 1
+        self._memory.set((z, x, y), tile)
+        return tile
+
+    def generation(self) -> int:
+        """Token to take before rendering a tile and hand back to `put`."""
+        with self._lock:
+            return self._generation
+
+    def put(self, z: int, x: int, y: int, tile: bytes, generation: int = None):
+        if generation is not None and self._invalidated.get((z, x, y), -1) > generation:
+            with self._lock:
+                self.stale_puts += 1
+            return
+        self._memory.set((z, x, y), tile)
+        if not self.directory:
+            return
+        path = self._path(z, x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so readers never see a half-written tile.
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(tile)
+        os.replace(tmp_path, path)
+
+    def invalidate_tile(self, z: int, x: int, y: int):
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            generation = self._generation
+        self._invalidated.set((z, x, y), generation)
+        self._memory.invalidate((z, x, y))
+        if self.directory:
+            try:
+                os.remove(self._path(z, x, y))
+            except FileNotFoundError:
+                pass
+
+    def invalidate_points(self, points):
+        """
+        Drops every cached tile, at every zoom level, containing any of these
+        (lon, lat) points. Tiles shared by several points are only touched once,
+        so batches should be passed in one call.
+        """
+        for z, x, y in tiles_for_points(points, self.max_zoom):
+            self.invalidate_tile(z, x, y)
+
+    def invalidate_point(self, lon, lat):
+        self.invalidate_points([(lon, lat)])
+
+    def clear(self):
+        self._memory.invalidate()
+        if self.directory and os.path.isdir(self.directory):
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def stats(self) -> dict:
+        return {
+            **self._memory.stats(),
+            "disk_hits": self.disk_hits,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+        }
+
+
+# --- Shared Instance ---
+tile_cache = TileCache(
+    TILE_CACHE_DIR,
+    memory_tiles=TILE_CACHE_MEMORY_TILES,
+    memory_ttl=TILE_CACHE_MEMORY_TTL_SECONDS,
+    max_zoom=TILE_MAX_ZOOM,
+    disk_ttl=TILE_CACHE_DISK_TTL_SECONDS,
+)
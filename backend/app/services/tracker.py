@@ -0,0 +1,157 @@
+# backend/app/services/tracker.py
+
+import itertools
+
+
+def box_iou(a, b) -> float:
+    """Intersection-over-union of two (x_min, y_min, x_max, y_max) boxes."""
+    ix_min, iy_min = max(a[0], b[0]), max(a[1], b[1])
+    ix_max, iy_max = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix_max - ix_min) * max(0.0, iy_max - iy_min)
+    if inter == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / (area_a + area_b - inter)
+
+
+def _crop(frame, box):
+    if frame is None:
+        return None
+    height, width = frame.shape[:2]
+    x_min, y_min = max(0, int(box[0])), max(0, int(box[1]))
+    x_max, y_max = min(width, int(box[2])), min(height, int(box[3]))
+    if x_max <= x_min or y_max <= y_min:
+        return None
+    # Copy so the track doesn't keep the whole frame alive.
+    return frame[y_min:y_max, x_min:x_max].copy()
+
+
+def _centroid_distance(a, b) -> float:
+    ax, ay = (a[0] + a[2]) / 2, (a[1] + a[3]) / 2
+    bx, by = (b[0] + b[2]) / 2, (b[1] + b[3]) / 2
+    return ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5
+
+
+class Track:
+    """One physical object followed across frames, with its best sighting."""
+
+    def __init__(self, track_id: int, class_name: str, box, confidence: float, frame_idx: int, frame=None):
+        self.track_id = track_id
+        self.class_name = class_name
+        self.box = box
+        self.hits = 1
+        self.first_frame = frame_idx
+        self.last_frame = frame_idx
+        self.best_confidence = confidence
+        self.best_box = box
+        self.best_frame = frame_idx
+        self.best_crop = _crop(frame, box)
+
+    def update(self, box, confidence: float, frame_idx: int, frame=None):
+        self.box = box
+        self.hits += 1
+        self.last_frame = frame_idx
+        if confidence > self.best_confidence:
+            self.best_confidence = confidence
+            self.best_box = box
+            self.best_frame = frame_idx
+            self.best_crop = _crop(frame, box)
+
+    def to_dict(self) -> dict:
+        return {
+            "track_id": self.track_id,
+            "class_name": self.class_name,
+            "best_confidence": round(self.best_confidence, 4),
+            "best_frame": self.best_frame,
+            "first_frame": self.first_frame,
+            "last_frame": self.last_frame,
+            "hits": self.hits,
+            "bounding_box": {
+                "x_min": int(self.best_box[0]),
+                "y_min": int(self.best_box[1]),
+                "x_max": int(self.best_box[2]),
+                "y_max": int(self.best_box[3])
+            }
+        }
+
+
+class IoUTracker:
+    """
+    SORT-style tracker without the motion model: detections are greedily matched to
+    live tracks of the same class by IoU, falling back to centroid distance for
+    small or fast-moving boxes. A track is finished once it has not been matched for
+    `max_missed_frames` frames (measured in frame indices, so sampled-out frames count).
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_missed_frames: int = 30,
+                 min_hits: int = 2, centroid_factor: float = 0.5):
+        self.iou_threshold = iou_threshold
+        self.max_missed_frames = max_missed_frames
+        self.min_hits = min_hits
+        self.centroid_factor = centroid_factor
+        self._tracks = []
+        self._ids = itertools.count(1)
+
+    @property
+    def active_tracks(self) -> list:
+        return list(self._tracks)
+
+    def _match_score(self, track: Track, box) -> float:
+        iou = box_iou(track.box, box)
+        if iou >= self.iou_threshold:
+            return 1.0 + iou
+        # Centroid fallback: within a fraction of the track box's diagonal.
+        diagonal = ((track.box[2] - track.box[0]) ** 2 + (track.box[3] - track.box[1]) ** 2) ** 0.5
+        distance = _centroid_distance(track.box, box)
+        if diagonal and distance <= diagonal * self.centroid_factor:
+            return 1.0 - distance / diagonal
+        return 0.0
+
+    def update(self, frame_idx: int, detections: list, frame=None) -> list:
+        """
+        Feeds one analysed frame. `detections` are dicts with `box` (x_min, y_min, x_max, y_max),
+        `confidence` and `class_name`; `frame` is used to crop each track's best sighting.
+        Returns the tracks that finished.
+        """
+        # Close stale tracks first so a long-gone object can't absorb a new sighting.
+        finished, alive = [], []
+        for track in self._tracks:
+            if frame_idx - track.last_frame > self.max_missed_frames:
+                finished.append(track)
+            else:
+                alive.append(track)
+        self._tracks = alive
+
+        candidates = []
+        for d_idx, detection in enumerate(detections):
+            for t_idx, track in enumerate(self._tracks):
+                if track.class_name != detection["class_name"]:
+                    continue
+                score = self._match_score(track, detection["box"])
+                if score > 0:
+                    candidates.append((score, t_idx, d_idx))
+
+        matched_tracks, matched_detections = set(), set()
+        for score, t_idx, d_idx in sorted(candidates, reverse=True):
+            if t_idx in matched_tracks or d_idx in matched_detections:
+                continue
+            detection = detections[d_idx]
+            self._tracks[t_idx].update(detection["box"], detection["confidence"], frame_idx, frame)
+            matched_tracks.add(t_idx)
+            matched_detections.add(d_idx)
+
+        for d_idx, detection in enumerate(detections):
+            if d_idx not in matched_detections:
+                self._tracks.append(Track(
+                    next(self._ids), detection["class_name"], detection["box"],
+                    detection["confidence"], frame_idx, frame
+                ))
+
+        return [track for track in finished if track.hits >= self.min_hits]
+
+    def flush(self) -> list:
+        """Finishes every remaining track, e.g. at the end of a video."""
+        finished = [track for track in self._tracks if track.hits >= self.min_hits]
+        self._tracks = []
+        return finished
@@ -0,0 +1,100 @@
+# backend/app/services/ttl_cache.py
+
+import time
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire `ttl` seconds after being set.
+
+    `get_or_set(key, compute)` lets only one caller compute a missing key at a time,
+    so a burst of identical requests after expiry results in a single DB query.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024, name: str = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key, compute, ttl: float = None):
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            # Someone else may have filled it while we waited.
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.monotonic():
+                    return entry[1]
+            value = compute()
+            self.set(key, value, ttl)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, key=_MISSING):
+        """Drops one key, or everything when called without arguments."""
+        with self._lock:
+            if key is _MISSING:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "ttl_seconds": self.ttl,
+        }
+
+
+# --- Registry ---
+_caches = {}
+_registry_lock = threading.Lock()
+
+
+def get_cache(name: str, ttl: float, maxsize: int = 1024) -> TTLCache:
+    """Returns the named cache, creating it on first use, so stats can be reported in one place."""
+    with _registry_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TTLCache(ttl, maxsize=maxsize, name=name)
+        return cache
+
+
+def cache_stats() -> dict:
+    with _registry_lock:
+        return {name: cache.stats() for name, cache in _caches.items()}
@@ -0,0 +1,218 @@
+# backend/app/services/video_pipeline.py
+
+import time
+import queue
+import threading
+
+import cv2
+
+# Marks the end of a stream between stages.
+_END = object()
+
+
+class PipelineProgress:
+    """Frame counters shared between the pipeline stages and whoever is polling them."""
+
+    def __init__(self, total_frames: int = 0, sampler=None):
+        self.total_frames = total_frames
+        self.sampler = sampler
+        self.frames_decoded = 0
+        self.frames_inferred = 0
+        self.frames_reused = 0
+        self.frames_written = 0
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+    def to_dict(self) -> dict:
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        percent = (self.frames_decoded / self.total_frames * 100) if self.total_frames else 0.0
+        stats = {
+            "total_frames": self.total_frames,
+            "frames_decoded": self.frames_decoded,
+            "frames_inferred": self.frames_inferred,
+            "frames_reused": self.frames_reused,
+            "frames_written": self.frames_written,
+            "inference_ratio": round(self.frames_inferred / self.frames_decoded, 3) if self.frames_decoded else 0.0,
+            "percent_complete": round(min(percent, 100.0), 1),
+            "fps": round(self.frames_decoded / elapsed, 2) if elapsed > 0 else 0.0,
+            "elapsed_seconds": round(elapsed, 2),
+        }
+        if self.sampler is not None:
+            # Frames decoded past the one whose detections last reached the sampler.
+            stats["feedback_lag"] = self.sampler.feedback_lag
+            stats["max_feedback_lag"] = self.sampler.max_feedback_lag
+        return stats
+
+
+class VideoPipeline:
+    """
+    Decode -> infer -> encode, each stage on its own thread, linked by bounded queues.
+
+    `infer_batch(frames)` must return one result per frame, in order. `on_result(frame_idx,
+    frame, result)` is called from the inference stage for every analysed frame, and
+    `on_progress(progress)` at most once per `progress_interval` seconds.
+
+    Which frames are analysed is decided by `sampler` (see frame_sampler.py) when one is
+    given, otherwise by `frame_skip`. Frames that are not analysed are still written,
+    annotated with the most recent detections. With a sampler the decode queue is
+    capped at two batches, since the sampler's feedback from inference reaches the
+    decoder only after every frame queued in between.
+    """
+
+    def __init__(self, infer_batch, batch_size: int = 8, queue_size: int = 32,
+                 on_result=None, on_progress=None, progress_interval: float = 1.0, sampler=None):
+        self.infer_batch = infer_batch
+        self.sampler = sampler
+        self.batch_size = max(1, batch_size)
+        self.queue_size = queue_size
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+
+    def run(self, video_path: str, output_path: str = None, frame_skip: int = 0) -> dict:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise RuntimeError(f"Cannot open video file: {video_path}")
+
+        writer = None
+        if output_path:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+            writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+
+        progress = PipelineProgress(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), self.sampler)
+        decode_queue_size = self.queue_size
+        if self.sampler is not None:
+            decode_queue_size = min(self.queue_size, 2 * self.batch_size)
+        decoded_q = queue.Queue(maxsize=decode_queue_size)
+        inferred_q = queue.Queue(maxsize=self.queue_size)
+        stop_event = threading.Event()
+        errors = []
+
+        def _put(q, item):
+            # Bounded put that gives up once another stage has failed.
+            while not stop_event.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _get(q):
+            while not stop_event.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _END
+
+        def _stage(fn):
+            def wrapper():
+                try:
+                    fn()
+                except Exception as e:
+                    errors.append(e)
+                    stop_event.set()
+            return wrapper
+
+        def decode():
+            frame_idx = 0
+            try:
+                while not stop_event.is_set():
+                    success, frame = cap.read()
+                    if not success:
+                        break
+                    progress.frames_decoded += 1
+                    if self.sampler is not None:
+                        selected = self.sampler.should_infer(frame_idx, frame)
+                    else:
+                        selected = frame_idx % (frame_skip + 1) == 0
+                    if not _put(decoded_q, (frame_idx, frame, selected)):
+                        break
+                    frame_idx += 1
+            finally:
+                _put(decoded_q, _END)
+
+        def infer():
+            finished = False
+            last_report = 0.0
+            last_result = None
+            try:
+                while not finished:
+                    item = _get(decoded_q)
+                    if item is _END:
+                        break
+                    # Gather up to batch_size selected frames, keeping skipped ones in order.
+                    items = [item]
+                    selected_count = int(item[2])
+                    while selected_count < self.batch_size:
+                        try:
+                            item = decoded_q.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is _END:
+                            finished = True
+                            break
+                        items.append(item)
+                        selected_count += int(item[2])
+
+                    selected_frames = [frame for _, frame, selected in items if selected]
+                    results = iter(self.infer_batch(selected_frames) if selected_frames else [])
+                    for frame_idx, frame, selected in items:
+                        if selected:
+                            last_result = next(results)
+                            progress.frames_inferred += 1
+                            if self.sampler is not None:
+                                self.sampler.observe(last_result, frame_idx)
+                            if self.on_result:
+                                self.on_result(frame_idx, frame, last_result)
+                            reused = False
+                        else:
+                            progress.frames_reused += 1
+                            reused = True
+                        if writer is not None and not _put(inferred_q, (frame, last_result, reused)):
+                            return
+
+                    now = time.perf_counter()
+                    if self.on_progress and now - last_report >= self.progress_interval:
+                        last_report = now
+                        self.on_progress(progress)
+            finally:
+                _put(inferred_q, _END)
+
+        def encode():
+            while True:
+                item = _get(inferred_q)
+                if item is _END:
+                    break
+                frame, result, reused = item
+                # Reused detections are drawn onto the current frame, not the one they came from.
+                writer.write(result.plot(img=frame) if reused else result.plot())
+                progress.frames_written += 1
+
+        threads = [
+            threading.Thread(target=_stage(decode), name="video-decode", daemon=True),
+            threading.Thread(target=_stage(infer), name="video-infer", daemon=True),
+        ]
+        if writer is not None:
+            threads.append(threading.Thread(target=_stage(encode), name="video-encode", daemon=True))
+
+        try:
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        finally:
+            cap.release()
+            if writer is not None:
+                writer.release()
+
+        progress.finished_at = time.perf_counter()
+        if errors:
+            raise errors[0]
+        if self.on_progress:
+            self.on_progress(progress)
+        return progress.to_dict()
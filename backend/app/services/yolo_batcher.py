@@ -0,0 +1,187 @@
+# backend/app/services/yolo_batcher.py
+
+import threading
+import time
+import queue
+from collections import deque
+from concurrent.futures import Future
+
+# --- Latency Tracking ---
+class _StageLatency:
+    """Keeps running totals and a recent window of samples for one pipeline stage."""
+
+    def __init__(self, window: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def snapshot(self) -> dict:
+        recent = sorted(self._recent)
+        def _pct(p):
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(p * len(recent)))] * 1000
+        return {
+            "count": self.count,
+            "avg_ms": round((self.total / self.count) * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(_pct(0.50), 2),
+            "p95_ms": round(_pct(0.95), 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class InferenceMetrics:
+    """Thread-safe counters for the batching engine: batch sizes and per-stage latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batch_size_histogram = {}
+        self.frames_processed = 0
+        self.batches_processed = 0
+        self.stages = {}
+
+    def observe_stage(self, stage: str, seconds: float):
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = _StageLatency()
+            self.stages[stage].observe(seconds)
+
+    def observe_batch(self, size: int):
+        with self._lock:
+            self.batch_size_histogram[size] = self.batch_size_histogram.get(size, 0) + 1
+            self.batches_processed += 1
+            self.frames_processed += size
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_batch = (self.frames_processed / self.batches_processed) if self.batches_processed else 0.0
+            return {
+                "frames_processed": self.frames_processed,
+                "batches_processed": self.batches_processed,
+                "avg_batch_size": round(avg_batch, 2),
+                "batch_size_histogram": dict(sorted(self.batch_size_histogram.items())),
+                "stage_latency": {name: stat.snapshot() for name, stat in self.stages.items()},
+            }
+
+
+# --- Batching Engine ---
+class _PendingFrame:
+    __slots__ = ("image", "future", "enqueued_at")
+
+    def __init__(self, image):
+        self.image = image
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class YoloBatcher:
+    """
+    Dynamic micro-batching around a YOLO model.
+
+    Concurrent callers submit decoded frames; a single worker thread collects them
+    for up to `max_wait_ms` (or until `max_batch_size` frames are waiting), runs one
+    forward pass over the whole batch and resolves each caller's future with its own
+    `Results` object.
+    """
+
+    def __init__(self, model, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.metrics = InferenceMetrics()
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._worker = None
+
+    def start(self):
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="yolo-batcher", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        if self._worker:
+            self._worker.join(timeout=timeout)
+        # Fail anything still waiting so callers don't hang forever.
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.future.set_exception(RuntimeError("YOLO batcher stopped."))
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, image) -> Future:
+        """Queues a decoded frame and returns a future resolving to its YOLO result."""
+        if self._stop_event.is_set() or not (self._worker and self._worker.is_alive()):
+            raise RuntimeError("YOLO batcher is not running.")
+        pending = _PendingFrame(image)
+        self._queue.put(pending)
+        return pending.future
+
+    def infer(self, image, timeout: float = None):
+        """Blocking helper: submits a frame and waits for its result."""
+        return self.submit(image).result(timeout=timeout)
+
+    def stats(self) -> dict:
+        stats = self.metrics.snapshot()
+        stats.update({
+            "queue_depth": self.queue_depth,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        })
+        return stats
+
+    def _collect_batch(self, first: _PendingFrame) -> list:
+        batch = [first]
+        deadline = first.enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            batch = self._collect_batch(first)
+            started = time.perf_counter()
+            for pending in batch:
+                self.metrics.observe_stage("queue_wait", started - pending.enqueued_at)
+
+            try:
+                results = self.model([pending.image for pending in batch])
+            except Exception as e:
+                print(f"[ERROR] Batched YOLO inference failed: {e}")
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+
+            self.metrics.observe_stage("inference", time.perf_counter() - started)
+            self.metrics.observe_batch(len(batch))
+
+            for pending, result in zip(batch, results):
+                pending.future.set_result(result)
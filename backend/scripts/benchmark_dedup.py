@@ -0,0 +1,111 @@
+import sys
+import os
+import time
+import random
+import argparse
+from types import SimpleNamespace
+from datetime import datetime
+
+from sqlalchemy import text
+
+# Add the parent directory to the path to allow imports from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models import IssueTypeEnum
+from app.services import dedup
+
+# Rough Chennai bounding box, matching the fixed location used by the video processor.
+LAT_RANGE = (12.85, 13.25)
+LON_RANGE = (80.10, 80.32)
+BENCH_TITLE = "Dedup benchmark issue"
+
+ISSUE_TYPES = [t.value for t in IssueTypeEnum]
+
+
+def seed(db, rows: int, open_ratio: float):
+    """Generates `rows` issues server-side; open_ratio of them in an open status."""
+    print(f"[INFO] Seeding {rows} issues...")
+    started = time.perf_counter()
+    db.execute(text("""
+        INSERT INTO infrastructure_issues
+            (id, title, issue_type, status, priority, latitude, longitude, location,
+             detection_source, detection_count, detected_at, last_detected_at, created_at, updated_at)
+        SELECT gen_random_uuid(), :title,
+               CAST((CAST(:types AS text[]))[1 + floor(random() * cardinality(CAST(:types AS text[])))::int] AS issuetypeenum),
+               CAST(CASE WHEN random() < :open_ratio THEN 'detected' ELSE 'resolved' END AS issuestatusenum),
+               'low', p.lat, p.lon, ST_SetSRID(ST_MakePoint(p.lon, p.lat), 4326),
+               'ai_camera', 1, now() - random() * interval '48 hours', NULL, now(), now()
+        FROM (
+            SELECT :lat_min + random() * (:lat_max - :lat_min) AS lat,
+                   :lon_min + random() * (:lon_max - :lon_min) AS lon
+            FROM generate_series(1, :rows)
+        ) AS p
+    """), {
+        "title": BENCH_TITLE, "types": ISSUE_TYPES, "open_ratio": open_ratio, "rows": rows,
+        "lat_min": LAT_RANGE[0], "lat_max": LAT_RANGE[1], "lon_min": LON_RANGE[0], "lon_max": LON_RANGE[1],
+    })
+    db.commit()
+    db.execute(text("ANALYZE infrastructure_issues"))
+    print(f"[INFO] Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def random_detections(count: int) -> list:
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            issue_type=IssueTypeEnum(random.choice(ISSUE_TYPES)),
+            latitude=random.uniform(*LAT_RANGE),
+            longitude=random.uniform(*LON_RANGE),
+            detected_at=now,
+        )
+        for _ in range(count)
+    ]
+
+
+def main(args):
+    db = SessionLocal()
+    try:
+        if args.seed:
+            seed(db, args.rows, args.open_ratio)
+        total = db.execute(text("SELECT count(*) FROM infrastructure_issues")).scalar()
+        print(f"[INFO] infrastructure_issues has {total} rows")
+
+        timings = []
+        matched = 0
+        for _ in range(args.rounds):
+            batch = random_detections(args.batch_size)
+            started = time.perf_counter()
+            matched += len(dedup.find_open_duplicates(db, batch))
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        lookups = args.rounds * args.batch_size
+        print(f"Batch of {args.batch_size}: p50 {timings[len(timings) // 2] * 1000:.1f} ms, "
+              f"p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.1f} ms, "
+              f"{lookups / sum(timings):.0f} lookups/s, {matched}/{lookups} matched")
+
+        if args.explain:
+            plan = db.execute(text("EXPLAIN ANALYZE " + str(dedup._MATCH_SQL)), {
+                "idx": [0], "issue_types": ["pothole"], "lons": [80.2], "lats": [13.05],
+                "detected_at": [datetime.utcnow()], "window_seconds": dedup.DEDUP_WINDOW_HOURS * 3600,
+                "radius_m": dedup.DEDUP_RADIUS_METERS, "meters_per_degree": dedup._METERS_PER_DEGREE,
+            })
+            print("\n".join(row[0] for row in plan))
+
+        if args.cleanup:
+            db.execute(text("DELETE FROM infrastructure_issues WHERE title = :title"), {"title": BENCH_TITLE})
+            db.commit()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the dedup lookup against a large infrastructure_issues table.")
+    parser.add_argument("--seed", action="store_true", help="Insert --rows synthetic issues first")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--open_ratio", type=float, default=0.3)
+    parser.add_argument("--batch_size", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--explain", action="store_true", help="Print the query plan for a single lookup")
+    parser.add_argument("--cleanup", action="store_true", help="Delete the synthetic issues afterwards")
+    main(parser.parse_args())
@@ -0,0 +1,99 @@
+import sys
+import os
+import time
+import asyncio
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the parent directory to the path to allow imports from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passlib.context import CryptContext
+
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+def _summary(label: str, latencies: list, rejected: int, elapsed: float):
+    latencies = sorted(latencies)
+    if not latencies:
+        print(f"{label:>24}: every request rejected ({rejected})")
+        return
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(
+        f"{label:>24}: {len(latencies) / elapsed:7.1f} logins/s  "
+        f"p50={statistics.median(latencies) * 1000:7.1f}ms  p95={p95 * 1000:7.1f}ms  rejected={rejected}"
+    )
+
+
+async def bench_pool(rounds: int, workers: int, logins: int, max_queue: int):
+    """Fires `logins` concurrent verifications at a PasswordHasher, like a login burst."""
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+    stored_hash = context.hash(BENCH_PASSWORD)
+    hasher = PasswordHasher(context, max_workers=workers, max_queue=max_queue)
+
+    async def login():
+        started = time.perf_counter()
+        try:
+            await hasher.verify(BENCH_PASSWORD, stored_hash)
+        except PasswordHasherBusy:
+            return None
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    hasher.shutdown()
+    latencies = [r for r in results if r is not None]
+    _summary(f"rounds={rounds} workers={workers}", latencies, logins - len(latencies), elapsed)
+
+
+def bench_http(url: str, email: str, password: str, logins: int, concurrency: int):
+    """Hammers a running server's /auth/token endpoint."""
+    import requests
+
+    def login(_):
+        started = time.perf_counter()
+        response = requests.post(url, data={"username": email, "password": password}, timeout=60)
+        return response.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+    statuses = {}
+    for code, _ in results:
+        statuses[code] = statuses.get(code, 0) + 1
+    print(f"[INFO] Status codes: {statuses}")
+    _summary(f"http concurrency={concurrency}", [t for code, t in results if code == 200],
+             statuses.get(503, 0), elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure login (bcrypt verify) throughput.")
+    parser.add_argument("--logins", type=int, default=200, help="Logins per run.")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 12], help="bcrypt costs to try.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Pool sizes to try.")
+    parser.add_argument("--max-queue", type=int, default=10_000, help="Hasher queue bound (default: never reject).")
+    parser.add_argument("--url", help="Benchmark a running server instead, e.g. http://localhost:8000/api/v1/auth/token")
+    parser.add_argument("--email", help="Existing account for --url mode.")
+    parser.add_argument("--password", help="Password for --email.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Client threads in --url mode.")
+    args = parser.parse_args()
+
+    if args.url:
+        if not args.email or not args.password:
+            parser.error("--url needs --email and --password")
+        bench_http(args.url, args.email, args.password, args.logins, args.concurrency)
+        return
+
+    print(f"[INFO] {args.logins} concurrent logins per run, {os.cpu_count()} CPUs")
+    for rounds in args.rounds:
+        for workers in args.workers:
+            asyncio.run(bench_pool(rounds, workers, args.logins, args.max_queue))
+
+
+if __name__ == "__main__":
+    main()
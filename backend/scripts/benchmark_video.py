@@ -0,0 +1,73 @@
+import sys
+import os
+import time
+import argparse
+import tempfile
+
+import cv2
+
+# Add the parent directory to the path to allow imports from the app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ultralytics import YOLO
+from app.services.yolo_batcher import YoloBatcher
+from app.services.video_pipeline import VideoPipeline
+
+
+def run_serial(model, video_path: str, output_path: str) -> float:
+    """The original one-thread loop: read, infer, plot, write."""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+
+    frames = 0
+    started = time.perf_counter()
+    while True:
+        success, frame = cap.read()
+        if not success:
+            break
+        results = model(frame, verbose=False)
+        writer.write(results[0].plot())
+        frames += 1
+    elapsed = time.perf_counter() - started
+
+    cap.release()
+    writer.release()
+    return frames / elapsed if elapsed else 0.0
+
+
+def run_pipeline(model, video_path: str, output_path: str, batch_size: int) -> float:
+    """The staged decode/infer/encode pipeline used by VideoProcessor."""
+    batcher = YoloBatcher(lambda frames: model(frames, verbose=False), max_batch_size=batch_size, max_wait_ms=5)
+    batcher.start()
+    try:
+        def infer_batch(frames):
+            futures = [batcher.submit(frame) for frame in frames]
+            return [future.result() for future in futures]
+
+        stats = VideoPipeline(infer_batch, batch_size=batch_size).run(video_path, output_path)
+    finally:
+        batcher.stop()
+    return stats["fps"]
+
+
+def main(args):
+    model = YOLO(args.model_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        for video_path in args.videos:
+            if not os.path.exists(video_path):
+                print(f"[WARN] Skipping missing video: {video_path}")
+                continue
+            serial_fps = run_serial(model, video_path, os.path.join(tmp, "serial.mp4"))
+            pipeline_fps = run_pipeline(model, video_path, os.path.join(tmp, "pipeline.mp4"), args.batch_size)
+            speedup = pipeline_fps / serial_fps if serial_fps else 0.0
+            print(f"{video_path}: serial {serial_fps:.1f} fps, pipeline {pipeline_fps:.1f} fps ({speedup:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the serial video loop against the staged pipeline.")
+    parser.add_argument("videos", nargs="*", default=["videos/pothole.mp4", "videos/street.mp4"])
+    parser.add_argument("--model_path", type=str, default="models/best.pt")
+    parser.add_argument("--batch_size", type=int, default=8)
+    main(parser.parse_args())
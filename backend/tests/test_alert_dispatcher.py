@@ -0,0 +1,102 @@
+import os
+import importlib
+
+from backend.app.services.alert_dispatcher import AlertDispatcher, FakeTransport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _dispatcher(transport, clock, **kwargs):
+    return AlertDispatcher(
+        transport, ["+911111111111", "+922222222222"],
+        coalesce_seconds=10, min_interval=60, backoff_base=5, clock=clock, **kwargs
+    )
+
+
+def test_burst_is_coalesced_into_one_digest_per_recipient():
+    transport, clock = FakeTransport(), FakeClock()
+    dispatcher = _dispatcher(transport, clock)
+    for _ in range(14):
+        dispatcher.submit("pothole", "critical", "Adyar")
+        clock.now += 5
+    dispatcher.submit("debris", "high", "Velachery")
+
+    dispatcher.pump()
+    assert len(transport.sent) == 2
+    assert {to for to, _ in transport.sent} == {"+911111111111", "+922222222222"}
+    body = transport.sent[0][1]
+    assert "14 critical potholes in Adyar" in body
+    assert "1 high debris report in Velachery" in body
+    assert "Last 2 min" in body
+
+    # Rate limited: a new alert waits for the recipient's interval to pass.
+    dispatcher.submit("pothole", "critical", "Adyar")
+    clock.now += 30
+    dispatcher.pump()
+    assert len(transport.sent) == 2
+    clock.now += 30
+    dispatcher.pump()
+    assert len(transport.sent) == 4
+    assert dispatcher.stats()["alerts_sent"] == 32
+
+
+def test_failed_send_is_retried_with_backoff_then_dropped():
+    transport, clock = FakeTransport(fail_times=100), FakeClock()
+    dispatcher = AlertDispatcher(transport, ["+911111111111"], coalesce_seconds=0, max_retries=2,
+                                 backoff_base=5, clock=clock)
+    dispatcher.submit("street_flooding", "high", "T Nagar", "Street Flooding reported")
+    dispatcher.pump()
+    assert dispatcher.failed_attempts == 1
+    dispatcher.pump()
+    assert dispatcher.failed_attempts == 1  # still backing off
+
+    transport.fail_times = 0
+    clock.now += 5
+    dispatcher.pump()
+    assert transport.sent[0][1].startswith("[InfraSight AI Alert] High priority issue detected!")
+
+    transport.fail_times = 100
+    dispatcher.submit("street_flooding", "high", "T Nagar")
+    for _ in range(4):
+        clock.now += 600
+        dispatcher.pump()
+    assert dispatcher.stats()["dropped"] == 1
+    assert dispatcher.stats()["pending"] == {"+911111111111": 0}
+
+
+def test_disabled_without_transport_or_recipients():
+    dispatcher = AlertDispatcher(None, ["+911111111111"])
+    dispatcher.submit("pothole", "high", "Adyar")
+    assert dispatcher.stats()["submitted"] == 0
+
+
+def test_settings_are_read_from_dotenv(tmp_path, monkeypatch):
+    from backend.app.services import alert_dispatcher as module
+
+    keys = ["TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER", "ALERT_RECIPIENTS", "ALERT_MIN_INTERVAL_SECONDS"]
+    for key in keys:
+        monkeypatch.delenv(key, raising=False)
+    (tmp_path / ".env").write_text(
+        "TWILIO_ACCOUNT_SID=AC123\n"
+        "TWILIO_AUTH_TOKEN=secret\n"
+        "TWILIO_PHONE_NUMBER=+15550000000\n"
+        "ALERT_RECIPIENTS=+911111111111, +922222222222\n"
+        "ALERT_MIN_INTERVAL_SECONDS=120\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    try:
+        importlib.reload(module)
+        assert module.TWILIO_ACCOUNT_SID == "AC123"
+        assert module.alert_dispatcher.recipients == ["+911111111111", "+922222222222"]
+        assert module.alert_dispatcher.min_interval == 120
+    finally:
+        for key in keys:
+            os.environ.pop(key, None)
+        monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+        importlib.reload(module)
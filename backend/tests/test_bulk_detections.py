@@ -0,0 +1,127 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from backend.app import crud
+from backend.app.routers import detections
+from backend.app.services import dedup
+from backend.app.services.alert_dispatcher import alert_dispatcher
+
+EXISTING_ISSUE_ID = uuid.uuid4()
+
+ITEMS = [
+    # 0: next to an open issue -> merged into it, no alert even though it is high priority
+    {"title": "Flooding A", "issue_type": "street_flooding", "latitude": 13.0, "longitude": 80.2, "address": "A"},
+    # 1: out of range
+    {"title": "Bad latitude", "issue_type": "pothole", "latitude": 200, "longitude": 80.2},
+    # 2: new high-priority issue -> alert
+    {"title": "Flooding B", "issue_type": "street_flooding", "latitude": 13.1, "longitude": 80.3, "address": "B"},
+    # 3: same spot as 2 in the same batch -> merged into it
+    {"title": "Flooding C", "issue_type": "street_flooding", "latitude": 13.1, "longitude": 80.3, "address": "C"},
+    # 4: new medium-priority issue -> no alert
+    {"title": "Pothole D", "issue_type": "pothole", "latitude": 12.0, "longitude": 80.0, "address": "D"},
+]
+
+
+class FakeDB:
+    def __init__(self):
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class SimpleRecorder:
+    def __init__(self):
+        self.batches, self.alerts, self.fail = [], [], False
+
+
+@pytest.fixture
+def ingest(monkeypatch):
+    """Fakes the DB side of bulk ingestion; records batch sizes and alerts."""
+    calls = SimpleRecorder()
+
+    def find_open_duplicates(db, items):
+        return {i: EXISTING_ISSUE_ID for i, d in enumerate(items) if d.address == "A"}
+
+    def bulk_create_ai_detections(db, items, priorities, targets):
+        calls.batches.append(len(items))
+        if calls.fail:
+            raise RuntimeError("connection lost")
+        issue_ids = []
+        for target in targets:
+            # An int target is the batch index of the detection that opens the issue.
+            issue_ids.append(issue_ids[target] if isinstance(target, int) else target or uuid.uuid4())
+        return [(issue_id, uuid.uuid4(), target is not None) for issue_id, target in zip(issue_ids, targets)]
+
+    monkeypatch.setattr(detections, "BULK_INSERT_BATCH_SIZE", 2)
+    monkeypatch.setattr(dedup, "find_open_duplicates", find_open_duplicates)
+    monkeypatch.setattr(crud, "bulk_create_ai_detections", bulk_create_ai_detections)
+    monkeypatch.setattr(alert_dispatcher, "submit", lambda issue_type, priority, address, *a: calls.alerts.append(address))
+    return calls
+
+
+def _request(body: bytes, content_type: str, chunk_size: int = 7) -> Request:
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b""]
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {"type": "http", "method": "POST", "path": "/detections/bulk",
+             "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+def _post(body: bytes, content_type: str, db=None):
+    return asyncio.run(detections.create_ai_detections_bulk(_request(body, content_type), db=db or FakeDB()))
+
+
+def test_json_array_is_ingested_in_batches(ingest):
+    response = _post(json.dumps(ITEMS).encode(), "application/json")
+
+    assert (response.created, response.merged, response.failed) == (2, 2, 1)
+    assert [r.index for r in response.results] == [0, 1, 2, 3, 4]
+    assert [r.status for r in response.results] == ["merged", "error", "created", "merged", "created"]
+    assert response.results[0].issue_id == EXISTING_ISSUE_ID
+    assert response.results[3].issue_id == response.results[2].issue_id
+    assert "latitude" in response.results[1].error
+    # Batches of two items, minus the invalid one.
+    assert ingest.batches == [1, 2, 1]
+    # Only the new high-priority issue alerts; merged sightings don't.
+    assert ingest.alerts == ["B"]
+
+
+def test_ndjson_stream_reports_malformed_lines_by_index(ingest):
+    lines = [json.dumps(item).encode() for item in ITEMS] + [b"{not json"]
+    response = _post(b"\n".join(lines) + b"\n", "application/x-ndjson")
+
+    assert (response.created, response.merged, response.failed) == (2, 2, 2)
+    assert [r.status for r in response.results] == ["merged", "error", "created", "merged", "created", "error"]
+    assert response.results[5].index == 5
+    assert ingest.batches == [1, 2, 1]
+    assert ingest.alerts == ["B"]
+
+
+def test_failed_insert_marks_the_batch_as_errors(ingest):
+    ingest.fail = True
+    db = FakeDB()
+    response = _post(json.dumps(ITEMS[2:4]).encode(), "application/json", db=db)
+
+    assert (response.created, response.merged, response.failed) == (0, 0, 2)
+    assert {r.error for r in response.results} == {"Database insert failed."}
+    assert db.rollbacks == 1
+    assert ingest.alerts == []
+
+
+def test_body_must_be_a_json_array(ingest):
+    with pytest.raises(HTTPException) as exc:
+        _post(json.dumps(ITEMS[0]).encode(), "application/json")
+    assert exc.value.status_code == 400
@@ -0,0 +1,144 @@
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Response
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from backend.app import pagination
+from backend.app.models import IssueTypeEnum
+from backend.app.routers import community
+
+CACHES = [community.stats_cache, community.leaderboard_cache, community.spotlight_cache, community.issues_cache]
+
+
+class RecordingQuery:
+    """Builds the real SELECT from the ORM calls and answers .all() from the session's script."""
+
+    def __init__(self, session, entities):
+        self.session = session
+        self.stmt = select(*entities)
+
+    def __getattr__(self, name):
+        method = getattr(self.stmt, name)
+
+        def call(*args, **kwargs):
+            self.stmt = method(*args, **kwargs)
+            return self
+        return call
+
+    def subquery(self):
+        return self.stmt.subquery()
+
+    def all(self):
+        self.session.sql.append(str(self.stmt.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )))
+        return self.session.results.pop(0)
+
+
+class RecordingSession:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sql = []
+
+    def query(self, *entities):
+        return RecordingQuery(self, entities)
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    for cache in CACHES:
+        cache.invalidate()
+    yield
+    for cache in CACHES:
+        cache.invalidate()
+
+
+def _issue(i: int, detected_at: datetime):
+    return SimpleNamespace(
+        id=uuid.uuid4(), title=f"Pothole number {i}", description=None, issue_type="pothole",
+        latitude=13.0, longitude=80.2, address=None, priority="medium", status="detected",
+        detection_source="citizen_report", detection_count=1, detected_at=detected_at,
+        last_detected_at=None, updated_at=detected_at, reporter=None,
+    )
+
+
+def test_recent_issues_are_capped_and_continue_from_a_cursor():
+    start = datetime(2025, 1, 1)
+    rows = [_issue(i, start - timedelta(minutes=i)) for i in range(4)]
+    db = RecordingSession(rows)
+
+    issues, cursor = community.get_recent_issues(db, limit=3)
+    assert [issue.id for issue in issues] == [row.id for row in rows[:3]]
+    assert pagination.decode_cursor(cursor) == (rows[2].detected_at, rows[2].id)
+    assert db.sql[0].endswith("LIMIT 4")  # one extra row tells whether there is a next page
+
+    db.results.append(rows[3:])
+    issues, cursor = community.get_recent_issues(db, limit=3, cursor=cursor)
+    assert [issue.id for issue in issues] == [rows[3].id] and cursor is None
+    assert f"'{rows[2].id}'" in db.sql[1] and "'2024-12-31 23:58:00'" in db.sql[1]
+
+
+def test_only_the_first_full_page_is_cached(monkeypatch):
+    calls = []
+
+    def get_recent_issues(db, limit=community.COMMUNITY_ISSUES_LIMIT, cursor=None):
+        calls.append((limit, cursor))
+        return [], "next"
+
+    monkeypatch.setattr(community, "get_recent_issues", get_recent_issues)
+    limit = community.COMMUNITY_ISSUES_LIMIT
+    for _ in range(2):
+        response = Response()
+        community.get_community_issues(response, limit=limit, cursor=None, db=None)
+        assert response.headers[pagination.NEXT_CURSOR_HEADER] == "next"
+    community.get_community_issues(Response(), limit=limit, cursor="abc", db=None)
+    community.get_community_issues(Response(), limit=10, cursor=None, db=None)
+    assert calls == [(community.COMMUNITY_ISSUES_LIMIT, None), (limit, "abc"), (10, None)]
+
+
+def test_hub_sections_are_cached_separately(monkeypatch):
+    calls = []
+
+    def section(name, value):
+        def compute(db=None):
+            calls.append(name)
+            return value
+        return compute
+
+    monkeypatch.setattr(community, "get_community_stats", section("stats", {"activeReporters": 1}))
+    monkeypatch.setattr(community, "get_leaderboard", section("leaderboard", []))
+    monkeypatch.setattr(community, "get_spotlight", section("spotlight", []))
+    monkeypatch.setattr(community, "get_recent_issues", section("issues", ([], None)))
+
+    first = community.get_community_hub_data(db=None)
+    community.get_community_hub_data(db=None)
+    assert sorted(calls) == ["issues", "leaderboard", "spotlight", "stats"]
+    assert first["stats"] == {"activeReporters": 1} and first["issuesNextCursor"] is None
+
+    # Expiring one section leaves the others cached.
+    community.leaderboard_cache.invalidate()
+    community.get_community_hub_data(db=None)
+    assert calls.count("leaderboard") == 2 and calls.count("stats") == 1
+    assert len({cache.name for cache in CACHES}) == len(CACHES)
+
+
+def test_leaderboard_reads_the_reporter_counters():
+    asha, ravi = uuid.uuid4(), uuid.uuid4()
+    db = RecordingSession(
+        [(asha, "Asha", None, 7), (ravi, "Ravi", "ravi.png", 3)],
+        [(asha, IssueTypeEnum.pothole, 5), (ravi, IssueTypeEnum.street_flooding, 3), (asha, IssueTypeEnum.debris, 2)],
+    )
+    entries = community.get_leaderboard(db)
+
+    assert [(e.username, e.reportCount, e.mostReportedIssueType) for e in entries] == [
+        ("Asha", 7, "Pothole"), ("Ravi", 3, "Street Flooding"),
+    ]
+    assert entries[1].avatarUrl == "ravi.png"
+    top, types = db.sql
+    assert "sum(reporter_issue_counts.report_count)" in top and "LIMIT 5" in top
+    assert "infrastructure_issues" not in top + types
+    assert "reporter_issue_counts.reporter_id IN" in types
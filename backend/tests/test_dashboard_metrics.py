@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from backend.app.routers import issues
+
+
+class MetricsSession:
+    """Answers the dashboard aggregate with `row` and records the selected columns."""
+
+    def __init__(self, row):
+        self.row = row
+        self.queries = []
+
+    def query(self, *columns):
+        self.queries.append(columns)
+        return self
+
+    def one(self):
+        if isinstance(self.row, Exception):
+            raise self.row
+        return self.row
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    issues.dashboard_metrics_cache.invalidate()
+    yield
+    issues.dashboard_metrics_cache.invalidate()
+
+
+def _row(total=8, active=6, resolved=2, ai_today=3, avg_response_seconds=5400):
+    return SimpleNamespace(total=total, active=active, resolved=resolved,
+                           ai_today=ai_today, avg_response_seconds=avg_response_seconds)
+
+
+def test_metrics_come_from_one_filtered_aggregate():
+    db = MetricsSession(_row())
+    metrics = issues.get_dashboard_metrics(db=db)
+
+    assert metrics.model_dump() == {
+        "active_issues": 6,
+        "resolution_rate": 25.0,
+        "ai_detections_today": 3,
+        "avg_response_time_hours": 1.5,
+    }
+    (columns,) = db.queries
+    sql = str(select(*columns).compile(dialect=postgresql.dialect()))
+    assert sql.count("FILTER (WHERE") == 4
+    assert sql.count("SELECT") == 1 and sql.endswith("FROM infrastructure_issues")
+
+
+def test_empty_table_gives_zeroes():
+    metrics = issues.get_dashboard_metrics(db=MetricsSession(_row(0, 0, 0, 0, None)))
+    assert (metrics.resolution_rate, metrics.avg_response_time_hours) == (0, 0)
+
+
+def test_metrics_are_cached_until_invalidated():
+    db = MetricsSession(_row())
+    first = issues.get_dashboard_metrics(db=db)
+    db.row = _row(active=5, resolved=3)
+    assert issues.get_dashboard_metrics(db=db) is first
+    assert len(db.queries) == 1
+
+    # Resolving an issue drops the cached metrics.
+    issues.dashboard_metrics_cache.invalidate()
+    assert issues.get_dashboard_metrics(db=db).active_issues == 5
+    assert len(db.queries) == 2
+
+
+def test_query_failure_is_a_500_and_not_cached():
+    with pytest.raises(HTTPException) as exc:
+        issues.get_dashboard_metrics(db=MetricsSession(RuntimeError("db down")))
+    assert exc.value.status_code == 500
+    assert issues.get_dashboard_metrics(db=MetricsSession(_row())).active_issues == 6
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from backend.app.models import IssueTypeEnum
+from backend.app.services.dedup import assign_duplicates, haversine_m
+
+
+def _detection(lat, lon, issue_type=IssueTypeEnum.pothole, detected_at=None):
+    return SimpleNamespace(issue_type=issue_type, latitude=lat, longitude=lon, detected_at=detected_at)
+
+
+def test_haversine_m():
+    # 0.001 degrees of latitude is roughly 111 metres.
+    assert round(haversine_m(13.0, 80.0, 13.001, 80.0)) == 111
+
+
+def test_nearby_detections_in_a_batch_share_one_issue():
+    detections = [
+        _detection(13.0827, 80.2707),
+        _detection(13.08275, 80.27075),  # ~7 m away
+        _detection(13.0827, 80.2707, issue_type=IssueTypeEnum.debris),
+        _detection(13.0900, 80.2707),  # ~800 m away
+        _detection(None, None),
+    ]
+    assert assign_duplicates(detections, {}, radius_m=25) == [None, 0, None, None, None]
+
+
+def test_existing_matches_and_time_window():
+    now = datetime.utcnow()
+    detections = [
+        _detection(13.0827, 80.2707, detected_at=now),
+        _detection(13.0827, 80.2707, detected_at=now - timedelta(hours=48)),
+        _detection(13.0827, 80.2707, detected_at=now),
+    ]
+    targets = assign_duplicates(detections, {2: "existing-issue"}, radius_m=25, window_hours=24)
+    assert targets == [None, None, "existing-issue"]
+
+
+def test_open_location_index_is_declared_on_the_model():
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.schema import CreateIndex
+    from backend.app.models import InfrastructureIssue
+    from backend.app.services.dedup import OPEN_STATUSES
+
+    index = next(i for i in InfrastructureIssue.__table__.indexes if i.name == "ix_infrastructure_issues_open_location")
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert "USING gist (location)" in ddl
+    assert "WHERE status IN ('detected', 'verified', 'in_progress')" in ddl
+    assert all(f"'{status}'" in ddl for status in OPEN_STATUSES)
+
+
+class _RecordingSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def execute(self, statement, params):
+        self.calls.append((statement, params))
+        return self.rows
+
+
+def test_find_open_duplicates_sends_one_lateral_query_per_batch():
+    from sqlalchemy.dialects import postgresql
+    from backend.app.services import dedup
+
+    at = datetime(2025, 1, 1, 12, 0)
+    detections = [
+        _detection(13.0827, 80.2707, detected_at=at),
+        _detection(None, None),  # no location: never matched
+        _detection(13.09, 80.28, IssueTypeEnum.debris, detected_at=at),
+    ]
+    db = _RecordingSession([SimpleNamespace(idx=2, id="issue-1")])
+    assert dedup.find_open_duplicates(db, detections, radius_m=30, window_hours=2) == {2: "issue-1"}
+
+    (statement, params), = db.calls
+    assert params["idx"] == [0, 2]
+    assert params["issue_types"] == ["pothole", "debris"]
+    assert params["lons"] == [80.2707, 80.28] and params["lats"] == [13.0827, 13.09]
+    assert params["window_seconds"] == 7200 and params["radius_m"] == 30
+
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "CROSS JOIN LATERAL" in sql
+    assert sql.count("ST_DWithin") == 2
+    for status in dedup.OPEN_STATUSES:
+        assert f"'{status}'" in sql
+    # Every bind parameter the query uses is supplied.
+    assert set(statement.compile(dialect=postgresql.dialect()).params) <= set(params)
+    assert dedup.find_open_duplicates(db, [_detection(None, None)]) == {}
+    assert len(db.calls) == 1
+
+
+class _IssueSession:
+    """Answers the open-issue lookup in crud.add_detection_to_issue with `issue`."""
+
+    def __init__(self, issue):
+        self.issue = issue
+        self.criteria = []
+        self.added = []
+        self.commits = 0
+
+    def query(self, model):
+        return self
+
+    def filter(self, *criteria):
+        self.criteria.extend(criteria)
+        return self
+
+    def first(self):
+        return self.issue
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def commit(self):
+        self.commits += 1
+
+    def refresh(self, obj):
+        pass
+
+
+def test_sighting_of_a_gone_issue_falls_back_to_a_new_issue():
+    from sqlalchemy.dialects import postgresql
+    from backend.app import crud
+
+    detection = _detection(13.0827, 80.2707, detected_at=datetime(2025, 1, 1, 12, 0))
+    db = _IssueSession(None)  # deleted, or resolved since it was matched
+    assert crud.add_detection_to_issue(db, "issue-1", detection) is None
+    assert db.added == [] and db.commits == 0
+    sql = " ".join(str(c.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})) for c in db.criteria)
+    assert "status IN ('detected', 'verified', 'in_progress')" in sql
+
+    issue = SimpleNamespace(detection_count=1, last_detected_at=None, detected_at=datetime(2025, 1, 1, 9, 0))
+    db = _IssueSession(issue)
+    assert crud.add_detection_to_issue(db, "issue-1", detection) is issue
+    assert issue.detection_count == 2 and issue.last_detected_at == datetime(2025, 1, 1, 12, 0)
+    assert len(db.added) == 1 and db.commits == 1
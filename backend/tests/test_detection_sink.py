@@ -0,0 +1,100 @@
+import json
+import threading
+
+from backend.app.services.detection_sink import DetectionSink
+
+
+class FakeTransport:
+    """Records delivered batches; raises while `failing` is set and blocks while `gate` is closed."""
+
+    def __init__(self, failing: bool = False):
+        self.batches = []
+        self.failing = failing
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def send(self, batch: list):
+        self.gate.wait()
+        if self.failing:
+            raise ConnectionError("backend down")
+        self.batches.append(list(batch))
+
+
+def _sink(transport, spool_path=None, **kwargs):
+    kwargs.setdefault("batch_size", 3)
+    return DetectionSink(transport, flush_interval=0.05, max_retries=1, backoff_base=0,
+                         spool_path=spool_path, **kwargs)
+
+
+def _spooled(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_batches_respect_batch_size():
+    transport = FakeTransport()
+    sink = _sink(transport)
+    for i in range(7):
+        sink.submit({"n": i})
+    sink.start()
+    sink.stop()
+    assert [len(batch) for batch in transport.batches] == [3, 3, 1]
+    assert [d["n"] for batch in transport.batches for d in batch] == list(range(7))
+    assert sink.stats()["delivered"] == 7
+
+
+def test_failed_batches_are_spooled_and_replayed_on_restart(tmp_path):
+    spool = str(tmp_path / "spool.jsonl")
+    down = _sink(FakeTransport(failing=True), spool)
+    for i in range(4):
+        down.submit({"n": i})
+    down.start()
+    down.stop()
+    assert sorted(d["n"] for d in _spooled(spool)) == [0, 1, 2, 3]
+    assert down.stats()["spooled"] == 4
+
+    transport = FakeTransport()
+    restarted = _sink(transport, spool)
+    restarted.start()
+    restarted.stop()
+    assert sorted(d["n"] for batch in transport.batches for d in batch) == [0, 1, 2, 3]
+    assert all(len(batch) <= 3 for batch in transport.batches)
+    assert not (tmp_path / "spool.jsonl").exists()
+
+
+def test_stop_spools_items_the_worker_did_not_reach(tmp_path):
+    spool = str(tmp_path / "spool.jsonl")
+    transport = FakeTransport()
+    transport.gate.clear()  # the first send hangs
+    sink = _sink(transport, spool, batch_size=1)
+    sink.start()
+    for i in range(3):
+        sink.submit({"n": i})
+    sink.stop(timeout=0.3)
+    assert [d["n"] for d in _spooled(spool)] == [1, 2]
+    transport.gate.set()
+
+
+def test_corrupt_spool_lines_are_skipped(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    spool.write_text('{"n": 0}\n{"n": 1\nnot json\n\n{"n": 2}\n', encoding="utf-8")
+    transport = FakeTransport()
+    sink = _sink(transport, str(spool))
+    sink.start()
+    sink.submit({"n": 3})
+    sink.stop()
+    assert sorted(d["n"] for batch in transport.batches for d in batch) == [0, 2, 3]
+    assert not spool.exists()
+    assert not list(tmp_path.glob("*.replay"))
+
+
+def test_worker_survives_spool_errors(tmp_path):
+    # A directory where the spool file should be: the replay on start raises.
+    (tmp_path / "spool.jsonl").mkdir()
+    transport = FakeTransport()
+    sink = _sink(transport, str(tmp_path / "spool.jsonl"), batch_size=1)
+    sink.start()
+    sink.submit({"n": 0})
+    sink.submit({"n": 1})
+    sink.stop()
+    assert transport.batches == [[{"n": 0}], [{"n": 1}]]
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import numpy as np
+from backend.app.services.frame_sampler import AdaptiveFrameSampler
+
+
+def _frame(level: int) -> np.ndarray:
+    return np.full((72, 128, 3), level, dtype=np.uint8)
+
+
+def _result(objects: int):
+    return SimpleNamespace(boxes=[object()] * objects)
+
+
+def test_static_frames_are_skipped_up_to_max_interval():
+    sampler = AdaptiveFrameSampler(diff_threshold=6.0, max_interval=5, boost_frames=3)
+    selected = [sampler.should_infer(i, _frame(100)) for i in range(11)]
+    assert selected == [True, False, False, False, False, True, False, False, False, False, True]
+    assert sampler.inference_ratio == 3 / 11
+
+
+def test_motion_boosts_the_following_frames():
+    sampler = AdaptiveFrameSampler(diff_threshold=6.0, max_interval=100, boost_frames=3)
+    levels = [100, 100, 160, 160, 160, 160, 160, 160]
+    selected = [sampler.should_infer(i, _frame(level)) for i, level in enumerate(levels)]
+    # The jump at frame 2 is inferred, then the next 3 frames regardless of motion.
+    assert selected == [True, False, True, True, True, True, False, False]
+
+
+def test_object_count_change_boosts_from_the_first_undecided_frame():
+    sampler = AdaptiveFrameSampler(diff_threshold=6.0, max_interval=100, boost_frames=3)
+    sampler.should_infer(0, _frame(100))
+    sampler.observe(_result(1), 0)
+    # Decode runs ahead of inference: frames 1..5 are decided before the next
+    # inference result comes back.
+    assert [sampler.should_infer(i, _frame(100)) for i in range(1, 6)] == [False] * 5
+
+    sampler.observe(_result(2), 0)  # a new object appeared
+    assert sampler.feedback_lag == 5
+    assert [sampler.should_infer(i, _frame(100)) for i in range(6, 11)] == [True, True, True, False, False]
+
+
+def test_unchanged_object_count_does_not_boost():
+    sampler = AdaptiveFrameSampler(diff_threshold=6.0, max_interval=100, boost_frames=3)
+    sampler.should_infer(0, _frame(100))
+    sampler.observe(_result(2), 0)
+    sampler.observe(_result(2), 0)
+    assert [sampler.should_infer(i, _frame(100)) for i in range(1, 4)] == [False, False, False]
+
+
+def test_feedback_lag_is_reported_in_pipeline_progress():
+    from backend.app.services.video_pipeline import PipelineProgress
+
+    sampler = AdaptiveFrameSampler(diff_threshold=6.0, max_interval=100)
+    for i in range(4):
+        sampler.should_infer(i, _frame(100))
+    sampler.observe(_result(1), 0)
+    sampler.observe(_result(1), 3)
+
+    stats = PipelineProgress(total_frames=4, sampler=sampler).to_dict()
+    assert (stats["feedback_lag"], stats["max_feedback_lag"]) == (0, 3)
+    assert "feedback_lag" not in PipelineProgress(total_frames=4).to_dict()
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+
+import pytest
+from backend.app.services.inference_executor import InferenceExecutor, InferenceQueueFull
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(mode="thread", max_workers=1, max_queue=1, io_workers=2, retry_after=7)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+def test_full_executor_rejects_work_with_retry_after(executor):
+    gate = threading.Event()
+
+    async def run():
+        running = [asyncio.create_task(executor.run_inference(gate.wait, 5)) for _ in range(executor.capacity)]
+        await asyncio.sleep(0.05)
+        assert executor.stats()["in_flight"] == executor.capacity
+
+        with pytest.raises(InferenceQueueFull) as exc:
+            executor.check_capacity()
+        assert exc.value.retry_after == 7
+        with pytest.raises(InferenceQueueFull):
+            await executor.run_inference(gate.wait, 5)
+
+        gate.set()
+        assert await asyncio.gather(*running) == [True, True]
+
+    asyncio.run(run())
+    assert executor.stats()["in_flight"] == 0
+    assert executor.stats()["rejected"] == 2
+    executor.check_capacity()
+
+
+def test_run_io_uses_its_own_pool_while_inference_is_saturated(executor):
+    gate = threading.Event()
+
+    async def run():
+        running = [asyncio.create_task(executor.run_inference(gate.wait, 5)) for _ in range(executor.capacity)]
+        await asyncio.sleep(0.05)
+        name = await executor.run_io(lambda: threading.current_thread().name)
+        gate.set()
+        await asyncio.gather(*running)
+        return name
+
+    assert asyncio.run(run()).startswith("inference-io")
+
+
+def test_executor_must_be_started():
+    executor = InferenceExecutor()
+    with pytest.raises(RuntimeError):
+        asyncio.run(executor.run_io(print))
+
+
+def test_queue_full_maps_to_503_with_retry_after():
+    pytest.importorskip("ultralytics")
+    from backend.app.routers.cv_api import _queue_full_exception
+
+    exc = _queue_full_exception(InferenceQueueFull(retry_after=7))
+    assert exc.status_code == 503
+    assert exc.headers == {"Retry-After": "7"}
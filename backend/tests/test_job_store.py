@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from backend.app.services.job_store import BlobStore, JobStore, MemoryJobStore, SQLiteJobStore
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+def test_memory_store_evicts_least_recently_used_over_byte_budget(blobs):
+    store = MemoryJobStore(blobs, ttl_seconds=60, max_bytes=2500)
+    for job_id in ("a", "b", "c"):
+        blobs.put(f"{job_id}.jpg", b"x" * 1000)
+        store.set(job_id, {"status": "complete", "blob_id": f"{job_id}.jpg"})
+        if job_id == "b":
+            # Touch "a" so "b" becomes the eviction candidate.
+            assert store.get("a") is not None
+
+    assert store.get("b") is None
+    assert blobs.get("b.jpg") is None
+    assert store.get("a") is not None
+    assert store.get("c") is not None
+    assert store.stats()["bytes"] <= 2500
+
+
+def test_memory_store_expires_entries_and_blobs(blobs):
+    store = MemoryJobStore(blobs, ttl_seconds=0)
+    blobs.put("job.jpg", b"image")
+    store.set("job", {"status": "complete", "blob_id": "job.jpg"})
+    time.sleep(0.01)
+    assert store.get("job") is None
+    assert blobs.get("job.jpg") is None
+
+
+def test_sqlite_store_is_shared_between_instances(tmp_path, blobs):
+    path = str(tmp_path / "jobs.sqlite3")
+    writer = SQLiteJobStore(path, blobs, ttl_seconds=60)
+    reader = SQLiteJobStore(path, blobs, ttl_seconds=60)
+
+    writer.set("job", {"status": "processing"})
+    assert reader.get("job") == {"status": "processing"}
+
+    blobs.put("job.jpg", b"image")
+    writer.set("job", {"status": "complete", "blob_id": "job.jpg"})
+    record = reader.get("job")
+    assert record["blob_id"] == "job.jpg"
+    assert reader.blobs.get(record["blob_id"]) == b"image"
+
+
+def test_sqlite_store_purges_expired_jobs(tmp_path, blobs):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), blobs, ttl_seconds=0)
+    blobs.put("job.jpg", b"image")
+    store.set("job", {"status": "complete", "blob_id": "job.jpg"})
+    time.sleep(0.01)
+    assert store.purge_expired() == 1
+    assert store.get("job") is None
+    assert blobs.get("job.jpg") is None
+
+
+def test_sqlite_store_evicts_oldest_over_byte_budget(tmp_path, blobs):
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"), blobs, ttl_seconds=60, max_bytes=2500)
+    for job_id in ("a", "b", "c"):
+        blobs.put(f"{job_id}.jpg", b"x" * 1000)
+        store.set(job_id, {"status": "complete", "blob_id": f"{job_id}.jpg"})
+        time.sleep(0.01)
+
+    assert store.get("a") is None
+    assert blobs.get("a.jpg") is None
+    assert store.get("b") is not None
+    assert store.get("c") is not None
+    assert store.stats()["bytes"] <= 2500
+
+
+def test_job_store_interface_is_abstract(blobs):
+    with pytest.raises(TypeError):
+        JobStore(blobs, ttl_seconds=60)
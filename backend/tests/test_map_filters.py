@@ -0,0 +1,19 @@
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql
+
+from backend.app.routers.map import issue_filters
+
+
+def _compile(filters):
+    return and_(*filters).compile(dialect=postgresql.dialect())
+
+
+def test_area_filter_matches_wildcards_literally():
+    compiled = _compile(issue_filters(area="50%_off\\"))
+    assert "ESCAPE" in str(compiled)
+    assert "%50\\%\\_off\\\\%" in compiled.params.values()
+
+
+def test_default_filters_only_show_open_issues():
+    compiled = _compile(issue_filters())
+    assert "infrastructure_issues.status IN" in str(compiled)
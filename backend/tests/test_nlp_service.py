@@ -0,0 +1,105 @@
+import re
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from backend.app.models import IssueTypeEnum
+from backend.app.services import nlp_service
+
+KNOWN_PLACES = {"adyar", "t nagar", "velachery"}
+
+
+class StubToken:
+    def __init__(self, text):
+        self.text = text
+        self.lower_ = text.lower()
+
+
+class StubDoc:
+    """Regex tokens; any known place name becomes a GPE entity."""
+
+    def __init__(self, text):
+        self.tokens = [StubToken(t) for t in re.findall(r"\w+|[^\w\s]", text)]
+        self.ents = [SimpleNamespace(text=place, label_="GPE") for place in KNOWN_PLACES if place in text]
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+
+class StubNLP:
+    pipe_names = ["ner"]
+
+    def __init__(self):
+        self.calls = []
+
+    def pipe(self, texts, batch_size, n_process):
+        texts = list(texts)
+        self.calls.append((len(texts), batch_size, n_process))
+        return (StubDoc(text) for text in texts)
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    stub = StubNLP()
+    monkeypatch.setitem(nlp_service._nlp_cache, nlp_service.NLP_MODEL, stub)
+    return stub
+
+
+def test_keywords_match_inflected_forms(nlp):
+    texts = [
+        "Someone keeps dumping waste behind the market",
+        "Bags of trash were dumped in Adyar",
+        "Wastes piling up near the bus stop",
+        "The underpass flooded again after the rain",
+        "Huge potholes on the main road",
+        "A pipe bursting at the corner",
+        "Nice weather today",
+    ]
+    results = nlp_service.analyze_report_texts(texts)
+    assert [r["issue_type"] for r in results] == [
+        IssueTypeEnum.garbage_piles,
+        IssueTypeEnum.garbage_piles,
+        IssueTypeEnum.garbage_piles,
+        IssueTypeEnum.street_flooding,
+        IssueTypeEnum.pothole,
+        IssueTypeEnum.street_flooding,
+        None,
+    ]
+    assert results[1]["address"] == "Adyar"
+    assert results[1]["title"] == "Garbage Piles reported near Adyar"
+
+
+def test_small_batches_stay_in_process(nlp):
+    nlp_service.analyze_report_texts(["pothole"] * 3, batch_size=2, n_process=None)
+    nlp_service.analyze_report_text("pothole")
+    assert [n_process for _, _, n_process in nlp.calls] == [nlp_service.NLP_N_PROCESS, 1]
+
+
+def test_text_batch_endpoint_inserts_recognised_reports(nlp, monkeypatch):
+    from backend.app import crud
+    from backend.app.routers import nlp_reports
+
+    inserted = []
+
+    def bulk_create_issues(db, issues):
+        inserted.extend(issues)
+        return [uuid.uuid4() for _ in issues]
+
+    monkeypatch.setattr(crud, "bulk_create_issues", bulk_create_issues)
+    user = SimpleNamespace(id=uuid.uuid4())
+    batch = nlp_reports.TextReportBatch(reports=[
+        "Garbage overflowing in Velachery",
+        "Lovely park, nothing to report",
+        "Road is broken and full of craters near T Nagar",
+    ])
+
+    response = nlp_reports.create_issues_from_texts(batch, db=None, current_user=user)
+
+    assert (response.created, response.failed) == (2, 1)
+    assert [item.status for item in response.results] == ["created", "error", "created"]
+    assert response.results[1].error == "Could not determine the issue type."
+    assert [issue.issue_type for issue in inserted] == [IssueTypeEnum.garbage_piles, IssueTypeEnum.pothole]
+    assert all(issue.reported_by_id == user.id for issue in inserted)
+    assert inserted[1].address == "T Nagar"
+    # no coordinates in a text report, so nothing lands on POINT(0 0)
+    assert all(issue.latitude is None and issue.longitude is None for issue in inserted)
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import models, pagination
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.UserProfile.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2025, 1, 1)
+    for i in range(25):
+        # Pairs of users share a timestamp so the id tie-breaker matters.
+        session.add(models.UserProfile(
+            email=f"user{i}@example.com", full_name=f"User {i}", password="x",
+            created_at=start + timedelta(minutes=i // 2)
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_keyset_pages_cover_every_row_once(db):
+    user = models.UserProfile
+    seen, cursor = [], None
+    while True:
+        rows, cursor = pagination.keyset_page(db.query(user), user.created_at, user.id, cursor, limit=10)
+        seen += [row.email for row in rows]
+        if cursor is None:
+            break
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+    assert seen[0] == "user24@example.com"
+
+
+def test_invalid_cursor_and_fields_are_rejected():
+    with pytest.raises(HTTPException):
+        pagination.decode_cursor("not-a-cursor")
+    with pytest.raises(HTTPException):
+        pagination.parse_fields("id,password", models.UserProfile)
+    with pytest.raises(HTTPException):
+        pagination.parse_fields("reset_token", models.UserProfile)
+    columns = pagination.parse_fields("id, email", models.UserProfile)
+    assert [c.key for c in columns] == ["id", "email"]
+
+
+def test_rows_with_null_sort_values_are_paged_too(db):
+    user = models.UserProfile
+    for i in range(5):
+        db.add(models.UserProfile(email=f"undated{i}@example.com", full_name="Undated", password="x"))
+    db.commit()
+    db.query(user).filter(user.full_name == "Undated").update({user.created_at: None})
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = pagination.keyset_page(db.query(user), user.created_at, user.id, cursor, limit=3)
+        seen += [row.email for row in rows]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 30
+    assert all(email.startswith("undated") for email in seen[:5])
+
+
+def test_no_limit_returns_every_row(db):
+    user = models.UserProfile
+    rows, cursor = pagination.keyset_page(db.query(user), user.created_at, user.id, None, limit=None)
+    assert len(rows) == 25 and cursor is None
@@ -0,0 +1,68 @@
+from backend.app.services.prediction_cache import PredictionCache, model_fingerprint
+
+DETECTIONS = [{"class_name": "pothole", "confidence_score": 0.9,
+               "bounding_box": {"x_min": 1, "y_min": 2, "x_max": 3, "y_max": 4}}]
+
+
+def test_identical_bytes_hit_memory_then_disk(tmp_path):
+    cache = PredictionCache(str(tmp_path), memory_entries=1)
+    cache.set_model("model-a")
+    assert cache.get(b"image-1") is None
+    cache.put(b"image-1", DETECTIONS, b"annotated-1")
+    assert cache.get(b"image-1") == (DETECTIONS, b"annotated-1")
+
+    cache.put(b"image-2", [], b"annotated-2")  # evicts image-1 from memory
+    assert cache.get(b"image-1") == (DETECTIONS, b"annotated-1")
+    assert cache.stats()["disk_hits"] == 1
+
+    restarted = PredictionCache(str(tmp_path))
+    restarted.set_model("model-a")
+    assert restarted.get(b"image-2") == ([], b"annotated-2")
+    assert cache.stats()["hit_ratio"] == round(2 / 3, 3)
+
+
+def test_new_model_weights_invalidate_cached_results(tmp_path):
+    weights = tmp_path / "best.pt"
+    weights.write_bytes(b"weights v1")
+    first = model_fingerprint(str(weights))
+    weights.write_bytes(b"weights v2")
+    second = model_fingerprint(str(weights))
+    assert first != second
+    assert model_fingerprint(str(weights), {"conf": 0.5}) != second
+
+    cache = PredictionCache(str(tmp_path / "cache"))
+    cache.set_model(first)
+    cache.put(b"image", DETECTIONS, b"annotated")
+    cache.set_model(second)
+    assert cache.get(b"image") is None
+    assert not (tmp_path / "cache" / first).exists()
+
+
+def test_image_ids_resolve_to_cached_files_for_the_current_model_only(tmp_path):
+    cache = PredictionCache(str(tmp_path))
+    cache.set_model("0123456789abcdef")
+    cache.put(b"image", DETECTIONS, b"annotated")
+    image_id = cache.image_id(b"image")
+    with open(cache.image_path(image_id), "rb") as f:
+        assert f.read() == b"annotated"
+    assert cache.image_path("fedcba9876543210-" + image_id.split("-")[1]) is None
+    assert cache.image_path(cache.image_id(b"other image")) is None
+
+
+def test_detections_only_results_are_cached_without_an_image(tmp_path):
+    cache = PredictionCache(str(tmp_path))
+    cache.set_model("model-a")
+    cache.put(b"image-1", DETECTIONS, None)
+    assert cache.get(b"image-1", annotated=False) == (DETECTIONS, None)
+    assert cache.get(b"image-1") is None  # an annotated request still has to run the model
+
+    restarted = PredictionCache(str(tmp_path))
+    restarted.set_model("model-a")
+    assert restarted.get(b"image-1", annotated=False) == (DETECTIONS, None)
+    assert restarted.image_path(restarted.image_id(b"image-1")) is None
+
+    # Once the annotated image exists (e.g. written by another worker), it is found on disk.
+    writer = PredictionCache(str(tmp_path))
+    writer.set_model("model-a")
+    writer.put(b"image-1", DETECTIONS, b"annotated-1")
+    assert cache.get(b"image-1") == (DETECTIONS, b"annotated-1")
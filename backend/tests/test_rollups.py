@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from backend.app.services.rollups import RollupRefresher
+
+
+class FakeResult:
+    def __init__(self, value=None):
+        self.value = value
+        self.rowcount = 0
+
+    def scalar(self):
+        return self.value
+
+    def __iter__(self):
+        return iter([])
+
+
+class FakeSession:
+    """Records SQL; the try-lock returns `lock_free` and the rollup watermark is `watermark`."""
+
+    def __init__(self, log, lock_free=True, watermark=None):
+        self.log = log
+        self.lock_free = lock_free
+        self.watermark = watermark
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.log.append(sql)
+        return FakeResult(self.lock_free if "pg_try_advisory_xact_lock" in sql else None)
+
+    def query(self, *args):
+        return FakeResult(self.watermark)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _refresher(log, **session_kwargs):
+    return RollupRefresher(session_factory=lambda: FakeSession(log, **session_kwargs), full_rebuild_interval=3600)
+
+
+def test_round_is_skipped_while_another_worker_holds_the_lock():
+    log = []
+    refresher = _refresher(log, lock_free=False)
+    refresher.refresh()
+    assert len(log) == 1 and "pg_try_advisory_xact_lock" in log[0]
+    assert refresher.last_refreshed_at is None
+
+
+def test_writes_happen_under_the_lock_and_rebuild_is_periodic():
+    log = []
+    refresher = _refresher(log, watermark=datetime(2024, 1, 1))
+    refresher.refresh()
+    assert "DELETE FROM issue_daily_rollups" not in log  # incremental, not a rebuild
+    assert any("pg_advisory_xact_lock" in sql for sql in log)
+
+    log.clear()
+    refresher._last_full_rebuild -= 3600
+    refresher.refresh()
+    deletes = [i for i, sql in enumerate(log) if sql == "DELETE FROM issue_daily_rollups"]
+    locks = [i for i, sql in enumerate(log) if "pg_advisory_xact_lock" in sql]
+    assert deletes and locks and locks[0] < deletes[0]
@@ -8,3 +8,64 @@ def test_password_hashing():
     assert hashed_password != password
     assert verify_password(password, hashed_password)
     assert not verify_password("wrongpassword", hashed_password)
+
+
+def test_current_user_is_cached_and_invalidated_on_update():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from backend.app import models, security
+
+    engine = create_engine("sqlite://")
+    models.UserProfile.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(models.UserProfile(email="cached@example.com", full_name="Cached User", password="x"))
+    db.commit()
+    token = security.create_access_token(security.token_claims(db.query(models.UserProfile).one()))
+    security.user_cache.invalidate()
+
+    user = security.get_current_user(db, token)
+    assert not hasattr(user, "password")
+    hits = security.user_cache.hits
+    assert security.get_current_user(db, token) is user
+    assert security.user_cache.hits == hits + 1
+
+    db.query(models.UserProfile).one().full_name = "Renamed User"
+    db.commit()
+    assert security.get_current_user(db, token).full_name == "Renamed User"
+    db.close()
+
+
+def test_login_rehashes_when_bcrypt_cost_changes():
+    import asyncio
+    from passlib.context import CryptContext
+    from backend.app.services.password_hasher import PasswordHasher
+
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret")
+    hasher = PasswordHasher(CryptContext(schemes=["bcrypt"], bcrypt__rounds=5), max_workers=1)
+    valid, new_hash = asyncio.run(hasher.verify_and_update("secret", old_hash))
+    assert valid and new_hash.startswith("$2b$05$")
+    valid, new_hash = asyncio.run(hasher.verify_and_update("secret", new_hash))
+    assert valid and new_hash is None
+    assert asyncio.run(hasher.verify_and_update("wrong", old_hash)) == (False, None)
+    hasher.shutdown()
+
+
+def test_email_change_invalidates_the_old_address():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from backend.app import models, security
+
+    engine = create_engine("sqlite://")
+    models.UserProfile.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(models.UserProfile(email="old@example.com", full_name="Moving User", password="x"))
+    db.commit()
+    token = security.create_access_token(security.token_claims(db.query(models.UserProfile).one()))
+    security.user_cache.invalidate()
+    security.get_current_user(db, token)
+    assert security.user_cache.get("old@example.com") is not None
+
+    db.query(models.UserProfile).one().email = "new@example.com"
+    db.commit()
+    assert security.user_cache.get("old@example.com") is None
+    db.close()
@@ -0,0 +1,171 @@
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from backend.app.services.summary_client import CircuitBreaker, SummaryClient
+
+DETECTIONS = [{"class_name": "pothole"}, {"class_name": "garbage_piles"}]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Plays back the server's `script`: one (status, body, delay) per request, repeating the last."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        server.requests += 1
+        status, body, delay = server.script[min(server.requests, len(server.script)) - 1]
+        time.sleep(delay)
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (latency budget)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = 0
+    server.script = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def _summarize_many(client, n):
+    async def run():
+        try:
+            return [await client.summarize(DETECTIONS) for _ in range(n)]
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def _client(stub, **kwargs):
+    return SummaryClient(f"http://127.0.0.1:{stub.server_port}/", token="test", **kwargs)
+
+
+def test_returns_summary_text(stub):
+    stub.script = [(200, [{"summary_text": " Two issues found. "}], 0)]
+    assert _summarize_many(_client(stub), 2) == ["Two issues found.", "Two issues found."]
+
+
+def test_loading_model_opens_circuit_for_its_estimated_time(stub):
+    stub.script = [(503, {"error": "Model facebook/bart-large-cnn is currently loading", "estimated_time": 60}, 0)]
+    client = _client(stub)
+    assert _summarize_many(client, 3) == [None, None, None]
+    assert stub.requests == 1
+    assert client.stats()["short_circuited"] == 2
+    assert client.stats()["circuit"] == "open"
+
+
+def test_slow_upstream_is_cut_off_at_the_latency_budget(stub):
+    stub.script = [(200, [{"summary_text": "late"}], 1.0)]
+    client = _client(stub, latency_budget=0.2, breaker=CircuitBreaker(failure_threshold=2))
+    started = time.perf_counter()
+    assert _summarize_many(client, 3) == [None, None, None]
+    assert time.perf_counter() - started < 1.0
+    assert client.stats()["timed_out"] == 2
+    assert client.stats()["short_circuited"] == 1
+
+
+def test_half_open_probe_closes_circuit_on_success():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] = 10
+    assert breaker.allow() and not breaker.allow()  # one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_summaries_are_cached_by_signature_and_survive_restarts(stub, tmp_path):
+    from backend.app.services.summary_cache import SummaryCache
+
+    stub.script = [(200, [{"summary_text": "Potholes and garbage."}], 0)]
+    path = str(tmp_path / "summaries.sqlite3")
+
+    async def run(client, detections):
+        try:
+            return await client.get_summary(detections)
+        finally:
+            await client.aclose()
+
+    io_calls = []
+
+    async def run_io(fn, *args):
+        io_calls.append(fn.__name__)
+        return await asyncio.to_thread(fn, *args)
+
+    client = _client(stub, cache=SummaryCache(path), run_io=run_io)
+    assert asyncio.run(run(client, DETECTIONS)) == "Potholes and garbage."
+    assert asyncio.run(run(client, list(reversed(DETECTIONS)))) == "Potholes and garbage."
+    assert stub.requests == 1
+    # SQLite is only touched off the event loop; the second call is a memory hit.
+    assert io_calls == ["get", "put"]
+
+    restarted = _client(stub, cache=SummaryCache(path))
+    assert asyncio.run(run(restarted, DETECTIONS)) == "Potholes and garbage."
+    assert stub.requests == 1
+    assert restarted.cache.stats()["disk_hits"] == 1
+
+
+def test_template_fallback_when_upstream_is_over_budget(stub, tmp_path):
+    from backend.app.services.summary_cache import SummaryCache
+
+    stub.script = [(200, [{"summary_text": "late"}], 1.0)]
+    client = _client(stub, latency_budget=0.2, cache=SummaryCache(str(tmp_path / "s.sqlite3")))
+    detections = DETECTIONS + [{"class_name": "pothole"}]
+
+    async def run():
+        try:
+            return await client.get_summary(detections)
+        finally:
+            await client.aclose()
+
+    summary = asyncio.run(run())
+    assert summary.startswith("An AI camera in Chennai detected 1 garbage piles and 2 potholes.")
+    assert client.cache.get("garbage_piles:1|pothole:2") is None  # fallbacks aren't cached
+
+
+def test_cancelled_probe_releases_the_half_open_slot(stub):
+    stub.script = [(200, [{"summary_text": "slow"}], 1.0)]
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10
+    client = _client(stub, latency_budget=5, breaker=breaker)
+
+    async def run():
+        try:
+            probe = asyncio.create_task(client.summarize(DETECTIONS))
+            await asyncio.sleep(0.1)
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_unexpected_payload_counts_as_a_failure(stub):
+    stub.script = [(200, ["not", "a", "dict"], 0)]
+    client = _client(stub, breaker=CircuitBreaker(failure_threshold=1))
+    assert _summarize_many(client, 2) == [None, None]
+    assert stub.requests == 1
+    assert client.stats()["circuit"] == "open"
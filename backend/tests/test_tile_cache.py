@@ -0,0 +1,60 @@
+import os
+import time
+
+from backend.app.services.tile_cache import TileCache, tile_for
+
+
+def test_tile_for():
+    assert tile_for(0.0, 0.0, 0) == (0, 0)
+    assert tile_for(0.0, 0.0, 1) == (1, 1)
+    # Chennai at zoom 12
+    assert tile_for(80.2707, 13.0827, 12) == (2961, 1897)
+
+
+def test_disk_tier_and_point_invalidation(tmp_path):
+    cache = TileCache(str(tmp_path), max_zoom=14)
+    lon, lat = 80.2707, 13.0827
+    x, y = tile_for(lon, lat, 14)
+    cache.put(14, x, y, b"tile")
+    cache.put(14, x + 5, y, b"other")
+
+    # A fresh instance only has the disk tier.
+    cold = TileCache(str(tmp_path), max_zoom=14)
+    assert cold.get(14, x, y) == b"tile"
+    assert cold.stats()["disk_hits"] == 1
+
+    cache.invalidate_point(lon, lat)
+    assert cache.get(14, x, y) is None
+    assert TileCache(str(tmp_path), max_zoom=14).get(14, x, y) is None
+    assert cache.get(14, x + 5, y) == b"other"
+
+
+def test_batch_invalidation_touches_shared_tiles_once(tmp_path):
+    cache = TileCache(str(tmp_path), max_zoom=10)
+    # Two points a few metres apart share every tile up to zoom 10.
+    cache.invalidate_points([(80.2707, 13.0827), (80.2708, 13.0828), (None, None)])
+    assert cache.stats()["invalidations"] == 11
+
+
+def test_put_after_invalidation_is_dropped(tmp_path):
+    cache = TileCache(str(tmp_path), max_zoom=14)
+    lon, lat = 80.2707, 13.0827
+    x, y = tile_for(lon, lat, 14)
+
+    generation = cache.generation()
+    cache.invalidate_point(lon, lat)  # an insert lands while the tile is rendering
+    cache.put(14, x, y, b"stale", generation)
+    assert cache.get(14, x, y) is None
+    assert cache.stats()["stale_puts"] == 1
+
+    cache.put(14, x, y, b"fresh", cache.generation())
+    assert cache.get(14, x, y) == b"fresh"
+
+
+def test_disk_tiles_expire(tmp_path):
+    cache = TileCache(str(tmp_path), max_zoom=14, disk_ttl=60)
+    cache.put(14, 1, 2, b"tile")
+    path = tmp_path / "14" / "1" / "2.mvt"
+    old = time.time() - 120
+    os.utime(path, (old, old))
+    assert TileCache(str(tmp_path), max_zoom=14, disk_ttl=60).get(14, 1, 2) is None
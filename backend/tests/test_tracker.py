@@ -0,0 +1,50 @@
+import numpy as np
+from backend.app.services.tracker import IoUTracker, box_iou
+
+
+def _detection(box, confidence=0.8, class_name="pothole"):
+    return {"box": box, "confidence": confidence, "class_name": class_name}
+
+
+def test_box_iou():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (20, 20, 30, 30)) == 0.0
+    assert round(box_iou((0, 0, 10, 10), (5, 0, 15, 10)), 3) == 0.333
+
+
+def test_object_seen_in_many_frames_becomes_one_track():
+    tracker = IoUTracker(max_missed_frames=5)
+    frame = np.zeros((100, 100, 3), np.uint8)
+    finished = []
+    for frame_idx in range(300):
+        # A slowly drifting pothole whose confidence peaks at frame 150.
+        x = 10 + frame_idx * 0.1
+        confidence = 0.9 if frame_idx == 150 else 0.6
+        finished += tracker.update(frame_idx, [_detection((x, 10, x + 20, 30), confidence)], frame)
+    finished += tracker.flush()
+
+    assert len(finished) == 1
+    track = finished[0].to_dict()
+    assert track["first_frame"] == 0
+    assert track["last_frame"] == 299
+    assert track["best_frame"] == 150
+    assert track["best_confidence"] == 0.9
+    assert finished[0].best_crop.shape == (20, 20, 3)
+
+
+def test_classes_and_gaps_split_tracks():
+    tracker = IoUTracker(max_missed_frames=5, min_hits=1)
+    finished = []
+    finished += tracker.update(0, [_detection((0, 0, 10, 10)), _detection((0, 0, 10, 10), class_name="debris")])
+    finished += tracker.update(1, [_detection((0, 0, 10, 10))])
+    # Gap longer than max_missed_frames closes both tracks.
+    finished += tracker.update(20, [_detection((0, 0, 10, 10))])
+    finished += tracker.flush()
+
+    assert sorted(t.class_name for t in finished) == ["debris", "pothole", "pothole"]
+
+
+def test_single_sightings_are_dropped_below_min_hits():
+    tracker = IoUTracker(min_hits=2)
+    tracker.update(0, [_detection((0, 0, 10, 10))])
+    assert tracker.flush() == []
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+from backend.app.services.yolo_batcher import YoloBatcher
+
+
+class FakeModel:
+    """Stands in for a YOLO model: records batch sizes and echoes each input back."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, images):
+        self.calls.append(len(images))
+        time.sleep(self.delay)
+        return [f"result-{image}" for image in images]
+
+
+def test_concurrent_frames_share_one_batch():
+    model = FakeModel()
+    batcher = YoloBatcher(model, max_batch_size=4, max_wait_ms=200)
+    batcher.start()
+    try:
+        results = {}
+
+        def worker(i):
+            results[i] = batcher.infer(i, timeout=5)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        batcher.stop()
+
+    assert results == {i: f"result-{i}" for i in range(4)}
+    assert model.calls == [4]
+    stats = batcher.stats()
+    assert stats["batch_size_histogram"] == {4: 1}
+    assert stats["stage_latency"]["inference"]["count"] == 1
+    assert stats["stage_latency"]["queue_wait"]["count"] == 4
+
+
+def test_batch_is_flushed_after_max_wait():
+    model = FakeModel()
+    batcher = YoloBatcher(model, max_batch_size=8, max_wait_ms=5)
+    batcher.start()
+    try:
+        assert batcher.infer("solo", timeout=5) == "result-solo"
+    finally:
+        batcher.stop()
+    assert model.calls == [1]
+
+
+def test_model_errors_propagate_to_callers():
+    def broken_model(images):
+        raise ValueError("boom")
+
+    batcher = YoloBatcher(broken_model, max_batch_size=2, max_wait_ms=1)
+    batcher.start()
+    try:
+        with pytest.raises(ValueError):
+            batcher.infer("frame", timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_submit_requires_running_worker():
+    batcher = YoloBatcher(FakeModel())
+    with pytest.raises(RuntimeError):
+        batcher.submit("frame")